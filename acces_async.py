@@ -0,0 +1,142 @@
+"""
+Strat de acces asincron la Supabase pentru Proprieto
+Cererile independente ale unei pagini (numărători, liste, loturi) pornesc
+concurent pe clientul async supabase, într-un event loop de fundal partajat
+de proces; paginile Streamlit le apelează sincron prin aduna()
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, List, Optional
+
+import streamlit as st
+from supabase import AsyncClient, Client, acreate_client
+
+# Câte cereri rulează simultan în tot procesul (toate sesiunile)
+LIMITA_CONCURENTA = 8
+
+# Timpul maxim (secunde) al unei cereri, din momentul în care pornește
+TIMEOUT_CERERE = 15.0
+
+# O cerere primește un client (sync sau async) și întoarce builder-ul
+# PostgREST neexecutat, ex: lambda c: c.table("imobile").select("id")
+Cerere = Callable[[Any], Any]
+
+
+class AccesAsync:
+    """
+    Event loop-ul de fundal, clientul async și limita de concurență ale procesului
+
+    Clientul async e creat la prima cerere, dacă s-a apelat configureaza().
+    Pentru clienții care nu sunt supabase.Client (jurnalul de diagnostic,
+    FakeSupabase din benchmark-uri) sau dacă clientul async nu poate fi
+    creat, cererile rulează pe thread-uri din același loop, cu aceeași
+    limită și același timeout.
+    """
+
+    def __init__(self, limita: int = LIMITA_CONCURENTA, timeout: float = TIMEOUT_CERERE):
+        self.limita = limita
+        self.timeout = timeout
+        self.eroare: Optional[str] = None
+
+        self._url: Optional[str] = None
+        self._key: Optional[str] = None
+        self._client: Optional[AsyncClient] = None
+        self._lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        # Legate de self._loop la prima folosire (în thread-ul loop-ului)
+        self._semafor = asyncio.Semaphore(limita)
+        self._creare = asyncio.Lock()
+
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="supabase-async",
+            daemon=True
+        )
+        self._thread.start()
+
+    def configureaza(self, url: str, key: str):
+        """Datele de conectare ale clientului async (aceleași ca ale clientului sync)"""
+        with self._lock:
+            if (url, key) != (self._url, self._key):
+                self._url, self._key = url, key
+                self._client, self.eroare = None, None
+
+    async def _client_async(self) -> Optional[AsyncClient]:
+        async with self._creare:
+            with self._lock:
+                url, key, client = self._url, self._key, self._client
+            if client is None and url is not None and self.eroare is None:
+                try:
+                    client = await acreate_client(url, key)
+                    with self._lock:
+                        self._client = client
+                except Exception as e:
+                    # Rămânem pe clientul sync până la o nouă configurare
+                    self.eroare = str(e)
+            return client
+
+    async def _executa(self, supabase, cerere: Cerere, timeout: float):
+        async with self._semafor:
+            client = await self._client_async() if isinstance(supabase, Client) else None
+            if client is not None:
+                executie = cerere(client).execute()
+            else:
+                executie = asyncio.to_thread(lambda: cerere(supabase).execute())
+            try:
+                return await asyncio.wait_for(executie, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Cererea a depășit {timeout:g} s") from None
+
+    async def _aduna(self, supabase, cereri, timeout: float, return_exceptions: bool) -> List:
+        return await asyncio.gather(
+            *(self._executa(supabase, cerere, timeout) for cerere in cereri),
+            return_exceptions=return_exceptions
+        )
+
+    def aduna(
+        self,
+        supabase,
+        *cereri: Cerere,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> List:
+        """
+        Execută cererile concurent și întoarce răspunsurile în ordinea lor
+
+        Args:
+            supabase: Clientul paginii (sync); decide dacă se folosește clientul async
+            cereri: Funcții client -> builder PostgREST neexecutat
+            timeout: Secunde per cerere (implicit TIMEOUT_CERERE)
+            return_exceptions: True = erorile sunt întoarse în listă în locul
+                răspunsului, False = prima eroare e ridicată
+
+        Raises:
+            TimeoutError: O cerere a depășit timeout-ul
+        """
+        if not cereri:
+            return []
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("aduna() nu poate fi apelat din event loop-ul de fundal")
+
+        viitor = asyncio.run_coroutine_threadsafe(
+            self._aduna(supabase, cereri, timeout or self.timeout, return_exceptions),
+            self._loop
+        )
+        return viitor.result()
+
+
+@st.cache_resource(show_spinner=False)
+def get_acces() -> AccesAsync:
+    """Stratul async al procesului, creat o singură dată (partajat între sesiuni)"""
+    return AccesAsync()
+
+
+def configureaza(url: str, key: str):
+    get_acces().configureaza(url, key)
+
+
+def aduna(supabase, *cereri: Cerere, timeout: Optional[float] = None, return_exceptions: bool = False) -> List:
+    """Vezi AccesAsync.aduna"""
+    return get_acces().aduna(supabase, *cereri, timeout=timeout, return_exceptions=return_exceptions)
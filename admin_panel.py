@@ -2,94 +2,231 @@
 Panou de administrare pentru Proprieto ANAF 2026
 """
 
+import os
+import re
 import streamlit as st
 import pandas as pd
 from supabase import Client
+import acces_async
 import auth
+import coproprietate
+import curs_bnr
+import diagnostic
+import lucrari
+import motor_fiscal
+import parametri_fiscali
+import pdf_d212
 from datetime import datetime
-from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+PAGINA_UTILIZATORI = 50
+COLOANE_UTILIZATORI = "id, email, nume, role, active, created_at, last_login"
+
+def get_pagina_utilizatori(
+    supabase: Client,
+    cautare: str = "",
+    dupa: Optional[Tuple[str, str]] = None,
+    limita: int = PAGINA_UTILIZATORI
+) -> Tuple[List[Dict], bool]:
+    """
+    Obține o pagină de utilizatori, ordonată după (created_at, id) descrescător
+    Fără password_hash/salt; căutarea (ILIKE pe email/nume) se face pe server
+
+    Args:
+        dupa: (created_at, id) al ultimului rând din pagina anterioară
+
+    Returns:
+        (utilizatori, există pagina următoare)
+    """
+    query = supabase.table("users").select(COLOANE_UTILIZATORI)
+
+    # Caracterele cu rol în sintaxa filtrelor PostgREST nu pot apărea în termen
+    cautare = re.sub(r'[,()*"\\:]', ' ', cautare or '').strip()
+    if cautare:
+        query = query.or_(f"email.ilike.*{cautare}*,nume.ilike.*{cautare}*")
+
+    if dupa:
+        created_at, user_id = dupa
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{user_id})'
+        )
+
+    result = query.order("created_at", desc=True)\
+        .order("id", desc=True)\
+        .limit(limita + 1)\
+        .execute()
+
+    randuri = result.data or []
+    return randuri[:limita], len(randuri) > limita
+
+# Pagina de utilizatori afișată, păstrată între rerun-urile fragmentului listei
+CHEIE_PAGINA_UTILIZATORI = "admin_users_pagina"
+
+def _pagina_utilizatori(supabase: Client, cautare: str, cursor: Optional[Tuple[str, str]]) -> Dict:
+    """
+    Pagina curentă din sesiune; citită din Supabase doar dacă s-a schimbat
+    căutarea / pagina sau după un rerun complet al aplicației
+    """
+    pagina = st.session_state.get(CHEIE_PAGINA_UTILIZATORI)
+    if pagina is None or pagina["cheie"] != (cautare, cursor):
+        users, are_urmatoare = get_pagina_utilizatori(supabase, cautare, cursor)
+        pagina = {"cheie": (cautare, cursor), "users": users, "are_urmatoare": are_urmatoare, "versiune": 0}
+        st.session_state[CHEIE_PAGINA_UTILIZATORI] = pagina
+    return pagina
+
+def _comuta_activ(supabase: Client, user_id: str):
+    """
+    Activează / dezactivează un utilizator (callback): starea locală e
+    schimbată imediat, apoi o singură scriere; la eroare se revine
+    """
+    pagina = st.session_state.get(CHEIE_PAGINA_UTILIZATORI) or {"users": []}
+    user = next((u for u in pagina["users"] if u['id'] == user_id), None)
+    if user is None:
+        return
+
+    new_status = not user['active']
+    user['active'] = new_status
+    try:
+        supabase.table("users").update({
+            "active": new_status
+        }).eq("id", user_id).execute()
+        st.session_state.admin_users_mesaj = ("success", f"Utilizator {'activat' if new_status else 'dezactivat'}!")
+    except Exception as e:
+        user['active'] = not new_status
+        st.session_state.admin_users_mesaj = ("error", f"Eroare: {str(e)}")
+
+def _sterge_utilizator(supabase: Client, user_id: str):
+    """Șterge un utilizator (callback): rândul dispare imediat, revine la eroare"""
+    pagina = st.session_state.get(CHEIE_PAGINA_UTILIZATORI) or {"users": []}
+    index = next((i for i, u in enumerate(pagina["users"]) if u['id'] == user_id), None)
+    if index is None:
+        return
+
+    user = pagina["users"].pop(index)
+    # Tabel nou (fără selecție): indexul selectat ar indica acum alt utilizator
+    pagina["versiune"] += 1
+    try:
+        supabase.table("users").delete().eq("id", user_id).execute()
+        coproprietate.invalideaza_cache_user(user_id)
+        st.session_state.admin_users_mesaj = ("success", "Utilizator șters!")
+    except Exception as e:
+        pagina["users"].insert(index, user)
+        st.session_state.admin_users_mesaj = ("error", f"Eroare: {str(e)}")
+
+def _actiuni_utilizator(supabase: Client, user: Dict):
+    """Acțiunile pentru utilizatorul selectat în tabel"""
+    st.markdown(f"**{user['nume']}** · {user['email']}")
+
+    # Nu poți dezactiva/șterge propriul cont
+    if user['id'] == st.session_state.user_id:
+        st.caption("(Cont curent)")
+        return
+
+    col_a, col_b, _ = st.columns([1, 1, 3])
+
+    with col_a:
+        # Toggle active/inactive
+        action_label = "🔓 Activează" if not user['active'] else "🔒 Dezactivează"
+        st.button(action_label, key=f"toggle_{user['id']}", on_click=_comuta_activ, args=(supabase, user['id']))
+
+    with col_b:
+        # Șterge utilizator
+        st.button(
+            "🗑️ Șterge", key=f"del_{user['id']}", help="Șterge utilizator",
+            on_click=_sterge_utilizator, args=(supabase, user['id'])
+        )
+
+def _pagina_anterioara():
+    st.session_state.admin_users_cursori.pop()
+
+def _pagina_urmatoare():
+    ultimul = st.session_state[CHEIE_PAGINA_UTILIZATORI]["users"][-1]
+    st.session_state.admin_users_cursori.append((ultimul['created_at'], ultimul['id']))
+
+@st.fragment
+def _lista_utilizatori(supabase: Client):
+    """
+    Lista paginată cu acțiuni pe rând, ca fragment: căutarea, paginarea și
+    acțiunile re-rulează doar lista, nu toată aplicația
+    """
+    cautare = st.text_input("🔍 Caută după email sau nume", key="admin_users_cautare")
+
+    # Paginare keyset: stiva de cursori (None = prima pagină); resetată la căutare nouă
+    if st.session_state.get("admin_users_cautare_anterioara") != cautare:
+        st.session_state.admin_users_cursori = [None]
+        st.session_state.admin_users_cautare_anterioara = cautare
+    cursori = st.session_state.setdefault("admin_users_cursori", [None])
+
+    try:
+        pagina = _pagina_utilizatori(supabase, cautare, cursori[-1])
+        users = pagina["users"]
+
+        if not users:
+            st.info("Niciun utilizator găsit." if cautare else "Niciun utilizator înregistrat încă.")
+        else:
+            df = pd.DataFrame(users)
+            afisare = pd.DataFrame({
+                "Nume": df['nume'],
+                "Email": df['email'],
+                "Rol": df['role'].map({'admin': '👑 admin', 'user': '👤 user'}),
+                "Status": df['active'].map({True: '🟢 Activ', False: '🔴 Inactiv'}),
+                "Înregistrat": pd.to_datetime(df['created_at']).dt.strftime('%d-%m-%Y %H:%M'),
+                "Ultima auth": pd.to_datetime(df['last_login'], errors='coerce')
+                    .dt.strftime('%d-%m-%Y %H:%M').fillna('Niciodată')
+            })
+
+            # Un singur tabel (virtualizat); acțiunile se aplică rândului selectat
+            event = st.dataframe(
+                afisare,
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key=f"admin_users_tabel_{len(cursori)}_{cautare}_{pagina['versiune']}"
+            )
+
+            if event.selection.rows and event.selection.rows[0] < len(users):
+                _actiuni_utilizator(supabase, users[event.selection.rows[0]])
+            else:
+                st.caption("Selectează un utilizator din tabel pentru acțiuni.")
+
+        mesaj = st.session_state.pop("admin_users_mesaj", None)
+        if mesaj:
+            tip, text = mesaj
+            (st.success if tip == "success" else st.error)(text)
+
+        # Navigare pagini
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button(
+                "⬅️ Anterioară", disabled=len(cursori) == 1, key="admin_users_prev",
+                on_click=_pagina_anterioara
+            )
+        with col_info:
+            st.caption(f"Pagina {len(cursori)} · {PAGINA_UTILIZATORI} utilizatori / pagină")
+        with col_next:
+            st.button(
+                "Următoare ➡️", disabled=not (pagina["are_urmatoare"] and users), key="admin_users_next",
+                on_click=_pagina_urmatoare
+            )
+
+    except Exception as e:
+        st.error(f"❌ Eroare la încărcarea utilizatorilor: {str(e)}")
 
 def show_users_management(supabase: Client):
     """Gestionare utilizatori (doar pentru admini)"""
     st.header("👥 Gestionare Utilizatori")
 
+    # Rerun complet (navigare, alt widget din pagină): lista e recitită;
+    # rerun-urile fragmentului listei folosesc pagina din sesiune
+    st.session_state.pop(CHEIE_PAGINA_UTILIZATORI, None)
+
     # Tab-uri pentru funcții diferite
     tab1, tab2, tab3 = st.tabs(["Lista Utilizatori", "Adaugă Utilizator", "Statistici"])
 
     with tab1:
         st.subheader("📋 Utilizatori Înregistrați")
-
-        try:
-            # Preluare utilizatori
-            result = supabase.table("users").select("*").order("created_at", desc=True).execute()
-
-            if not result.data:
-                st.info("Niciun utilizator înregistrat încă.")
-            else:
-                df = pd.DataFrame(result.data)
-
-                # Formatare date
-                df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%d-%m-%Y %H:%M')
-                df['last_login'] = pd.to_datetime(df['last_login'], errors='coerce').dt.strftime('%d-%m-%Y %H:%M')
-
-                # Afișare tabel
-                for _, user in df.iterrows():
-                    with st.container():
-                        col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
-
-                        with col1:
-                            role_icon = "👑" if user['role'] == 'admin' else "👤"
-                            st.markdown(f"{role_icon} **{user['nume']}**")
-                            st.caption(f"📧 {user['email']}")
-
-                        with col2:
-                            status = "🟢 Activ" if user['active'] else "🔴 Inactiv"
-                            st.write(status)
-                            st.caption(f"Rol: {user['role']}")
-
-                        with col3:
-                            st.caption(f"Înregistrat: {user['created_at']}")
-                            if user['last_login']:
-                                st.caption(f"Ultima auth: {user['last_login']}")
-                            else:
-                                st.caption("Nu s-a autentificat niciodată")
-
-                        with col4:
-                            # Acțiuni (nu poți șterge propriul cont)
-                            if user['id'] != st.session_state.user_id:
-                                col_a, col_b = st.columns(2)
-
-                                with col_a:
-                                    # Toggle active/inactive
-                                    new_status = not user['active']
-                                    action_label = "🔓 Activează" if not user['active'] else "🔒 Dezactivează"
-
-                                    if st.button(action_label, key=f"toggle_{user['id']}"):
-                                        try:
-                                            supabase.table("users").update({
-                                                "active": new_status
-                                            }).eq("id", user['id']).execute()
-                                            st.success(f"Utilizator {'activat' if new_status else 'dezactivat'}!")
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"Eroare: {str(e)}")
-
-                                with col_b:
-                                    # Șterge utilizator
-                                    if st.button("🗑️", key=f"del_{user['id']}", help="Șterge utilizator"):
-                                        try:
-                                            supabase.table("users").delete().eq("id", user['id']).execute()
-                                            st.success("Utilizator șters!")
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"Eroare: {str(e)}")
-                            else:
-                                st.caption("(Cont curent)")
-
-                        st.divider()
-
-        except Exception as e:
-            st.error(f"❌ Eroare la încărcarea utilizatorilor: {str(e)}")
+        _lista_utilizatori(supabase)
 
     with tab2:
         st.subheader("➕ Adaugă Utilizator Nou")
@@ -130,123 +267,244 @@ def show_users_management(supabase: Client):
         st.subheader("📊 Statistici Utilizatori")
 
         try:
-            result = supabase.table("users").select("*").execute()
-
-            if result.data:
-                total = len(result.data)
-                admins = len([u for u in result.data if u['role'] == 'admin'])
-                users = total - admins
-                active = len([u for u in result.data if u.get('active', True)])
-                inactive = total - active
-
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Total Utilizatori", total)
-                col2.metric("Administratori", admins)
-                col3.metric("Utilizatori", users)
-                col4.metric("Activi / Inactivi", f"{active} / {inactive}")
-
-                # Activitate recentă
-                st.markdown("### 📅 Activitate Recentă")
-                recent = [u for u in result.data if u.get('last_login')]
-                recent.sort(key=lambda x: x['last_login'], reverse=True)
-
-                if recent[:5]:
-                    for user in recent[:5]:
-                        login_time = pd.to_datetime(user['last_login']).strftime('%d-%m-%Y %H:%M')
-                        st.text(f"• {user['nume']} ({user['email']}) - {login_time}")
-                else:
-                    st.info("Nicio activitate recentă.")
+            # Numărători exacte (HEAD) și ultimele 5 login-uri, trimise concurent
+            raspunsuri = acces_async.aduna(
+                supabase,
+                cerere_numarare("users"),
+                cerere_numarare("users", filtre={"role": "admin"}),
+                cerere_numarare("users", filtre={"active": True}),
+                lambda c: c.table("users")\
+                    .select("nume, email, last_login")\
+                    .order("last_login", desc=True, nullsfirst=False)\
+                    .limit(5)
+            )
+            total, admins, active = (r.count or 0 for r in raspunsuri[:3])
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Total Utilizatori", total)
+            col2.metric("Administratori", admins)
+            col3.metric("Utilizatori", total - admins)
+            col4.metric("Activi / Inactivi", f"{active} / {total - active}")
+
+            # Activitate recentă
+            st.markdown("### 📅 Activitate Recentă")
+            recent = [u for u in (raspunsuri[3].data or []) if u.get('last_login')]
+
+            if recent:
+                for user in recent:
+                    login_time = pd.to_datetime(user['last_login']).strftime('%d-%m-%Y %H:%M')
+                    st.text(f"• {user['nume']} ({user['email']}) - {login_time}")
+            else:
+                st.info("Nicio activitate recentă.")
 
         except Exception as e:
             st.error(f"❌ Eroare: {str(e)}")
 
 
+PAGINA_DATE = 50
+
+# (tabel, coloane proiectate, coloană normalizată -> titlu în tabelul afișat)
+TABELE_OVERVIEW = {
+    "imobile": (
+        "id, nume, adresa, procent_proprietate, created_at, users(nume, email)",
+        {"users.nume": "Proprietar", "users.email": "Email", "nume": "Imobil",
+         "adresa": "Adresă", "procent_proprietate": "Cotă"},
+    ),
+    "contracte": (
+        "id, locatar, chirie_lunara, moneda, data_inceput, data_sfarsit, created_at, imobile(nume), users(nume)",
+        {"users.nume": "Proprietar", "imobile.nume": "Imobil", "locatar": "Locatar",
+         "chirie_lunara": "Chirie", "data_inceput": "De la", "data_sfarsit": "Până la"},
+    ),
+}
+
+def cerere_numarare(
+    tabel: str,
+    user_id: Optional[str] = None,
+    filtre: Optional[Dict] = None
+) -> acces_async.Cerere:
+    """
+    Cererea HEAD care numără exact rândurile, opțional doar ale unui user
+
+    Args:
+        filtre: Condiții de egalitate suplimentare ({coloană: valoare})
+    """
+    def cerere(client):
+        query = client.table(tabel).select("id", count="exact", head=True)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        for coloana, valoare in (filtre or {}).items():
+            query = query.eq(coloana, valoare)
+        return query
+    return cerere
+
+def get_pagina_date(supabase: Client, tabel: str, pagina: int, marime: int = PAGINA_DATE) -> List[Dict]:
+    """O pagină din imobile/contracte, doar coloanele afișate, cele mai noi primele"""
+    coloane, _ = TABELE_OVERVIEW[tabel]
+    start = (pagina - 1) * marime
+    result = supabase.table(tabel)\
+        .select(coloane)\
+        .order("created_at", desc=True)\
+        .order("id", desc=True)\
+        .range(start, start + marime - 1)\
+        .execute()
+    return result.data or []
+
+def tabel_afisare(tabel: str, randuri: List[Dict]) -> pd.DataFrame:
+    """Tabelul afișat, construit pe coloane din join-urile aplatizate cu json_normalize"""
+    _, titluri = TABELE_OVERVIEW[tabel]
+    # Un join lipsă (None) nu produce coloana "users.nume": reindex o adaugă goală
+    df = pd.json_normalize(randuri).reindex(columns=[*titluri, "moneda"])
+
+    if tabel == "imobile":
+        df["procent_proprietate"] = df["procent_proprietate"].astype(str) + "%"
+    else:
+        df["chirie_lunara"] = df["chirie_lunara"].map("{:,.0f}".format) + " " + df["moneda"].fillna("RON")
+        df["data_sfarsit"] = df["data_sfarsit"].fillna("Nedeterminat")
+
+    return df[list(titluri)].rename(columns=titluri).fillna("N/A")
+
+def _afiseaza_pagina(supabase: Client, tabel: str, titlu: str, total: int):
+    """Tabelul paginat al unui tabel (imobile/contracte) cu selector de pagină"""
+    if not total:
+        return
+
+    st.markdown(f"### {titlu}")
+    nr_pagini = (total + PAGINA_DATE - 1) // PAGINA_DATE
+    pagina = 1
+    if nr_pagini > 1:
+        pagina = st.number_input(
+            f"Pagina (din {nr_pagini})", min_value=1, max_value=nr_pagini, value=1,
+            key=f"overview_pagina_{tabel}"
+        )
+
+    randuri = get_pagina_date(supabase, tabel, int(pagina))
+    st.dataframe(tabel_afisare(tabel, randuri), use_container_width=True, hide_index=True)
+    st.caption(f"{len(randuri)} din {total:,} rânduri")
+
+def _avertizare_cote(supabase: Client, imobile: Optional[List[Dict]] = None):
+    """
+    Avertizare pentru imobilele ale căror cote nu însumează 100%
+
+    Args:
+        imobile: Imobilele verificate ({id, nume}); None = toate (admin)
+    """
+    imobil_ids = None if imobile is None else [i['id'] for i in imobile]
+    cote_invalide = coproprietate.get_imobile_cote_invalide(supabase, imobil_ids)
+    if not cote_invalide:
+        return
+
+    primele = list(cote_invalide.items())[:10]
+    if imobile is None:
+        imobile = supabase.table("imobile")\
+            .select("id, nume")\
+            .in_("id", [imobil_id for imobil_id, _ in primele])\
+            .execute().data or []
+    nume_imobile = {i['id']: i['nume'] for i in imobile}
+    st.warning(
+        f"⚠️ {len(cote_invalide)} imobile au cote care nu însumează 100%: " +
+        ", ".join(f"{nume_imobile.get(i, i)} ({p:g}%)" for i, p in primele) +
+        (" …" if len(cote_invalide) > 10 else "")
+    )
+
 def show_data_overview(supabase: Client, user_id: str, is_admin: bool):
     """Prezentare generală date (contracte, imobile) pentru toți utilizatorii"""
     st.header("📊 Prezentare Generală Date")
 
     try:
         # Filtrare: adminii văd tot, userii doar propriile date
-        if is_admin:
-            imobile_result = supabase.table("imobile").select("*, users(nume, email)").execute()
-            contracte_result = supabase.table("contracte").select("*, imobile(nume), users(nume, email)").execute()
-        else:
-            imobile_result = supabase.table("imobile").select("*").eq("user_id", user_id).execute()
-            contracte_result = supabase.table("contracte").select("*, imobile(nume)").eq("user_id", user_id).execute()
+        filtru_user = None if is_admin else user_id
+
+        # Statistici generale (numărători exacte, fără a citi rândurile) și,
+        # pentru useri, lista imobilelor: cereri independente, trimise concurent
+        cereri = [cerere_numarare("imobile", filtru_user), cerere_numarare("contracte", filtru_user)]
+        if not is_admin:
+            cereri.append(lambda c: c.table("imobile").select("id, nume").eq("user_id", user_id))
+        raspunsuri = acces_async.aduna(supabase, *cereri)
+        nr_imobile = raspunsuri[0].count or 0
+        nr_contracte = raspunsuri[1].count or 0
 
-        # Statistici generale
         col1, col2, col3 = st.columns(3)
-        col1.metric("Imobile Totale", len(imobile_result.data) if imobile_result.data else 0)
-        col2.metric("Contracte Active", len(contracte_result.data) if contracte_result.data else 0)
-
-        # Calculare venit total estimat (doar pentru anul curent)
-        if contracte_result.data:
-            venit_total = 0
-            for contract in contracte_result.data:
-                venit_total += contract.get('chirie_lunara', 0) * 12
-
-            col3.metric("Venit Anual Estimat", f"{venit_total:,.0f} RON")
-
-        # Tabel imobile
-        if is_admin and imobile_result.data:
-            st.markdown("### 🏠 Imobile (Toți Utilizatorii)")
-            df_imobile = pd.DataFrame(imobile_result.data)
-
-            display_data = []
-            for _, row in df_imobile.iterrows():
-                display_data.append({
-                    'Proprietar': row['users']['nume'] if row.get('users') else 'N/A',
-                    'Email': row['users']['email'] if row.get('users') else 'N/A',
-                    'Imobil': row['nume'],
-                    'Adresă': row.get('adresa', '-'),
-                    'Cotă': f"{row['procent_proprietate']}%"
-                })
-
-            st.dataframe(pd.DataFrame(display_data), use_container_width=True, hide_index=True)
-
-        # Tabel contracte
-        if is_admin and contracte_result.data:
-            st.markdown("### 📄 Contracte (Toți Utilizatorii)")
-            df_contracte = pd.DataFrame(contracte_result.data)
-
-            display_data = []
-            for _, row in df_contracte.iterrows():
-                display_data.append({
-                    'Proprietar': row['users']['nume'] if row.get('users') else 'N/A',
-                    'Imobil': row['imobile']['nume'] if row.get('imobile') else 'N/A',
-                    'Locatar': row['locatar'],
-                    'Chirie': f"{row['chirie_lunara']:,.0f} {row['moneda']}",
-                    'De la': row['data_inceput'],
-                    'Până la': row.get('data_sfarsit', 'Nedeterminat')
-                })
-
-            st.dataframe(pd.DataFrame(display_data), use_container_width=True, hide_index=True)
+        col1.metric("Imobile Totale", nr_imobile)
+        col2.metric("Contracte Active", nr_contracte)
+
+        # Venitul anului curent din totalurile precalculate (venituri_anuale)
+        an_curent = datetime.now().year
+        venituri = motor_fiscal.brut_ron_din_totaluri(
+            coproprietate.get_venituri_anuale(supabase, an_curent, None if is_admin else [user_id]),
+            motor_fiscal.curs_pentru_an(an_curent, curs_bnr.get_cursuri())
+        )
+        col3.metric("Venit Anual Estimat", f"{sum(venituri.values()):,.0f} RON")
+
+        # Imobile ale căror cote de proprietate nu însumează 100%
+        if is_admin:
+            _avertizare_cote(supabase)
+        elif nr_imobile:
+            _avertizare_cote(supabase, raspunsuri[2].data or [])
+
+        # Tabele paginate
+        if is_admin:
+            _afiseaza_pagina(supabase, "imobile", "🏠 Imobile (Toți Utilizatorii)", nr_imobile)
+            _afiseaza_pagina(supabase, "contracte", "📄 Contracte (Toți Utilizatorii)", nr_contracte)
 
     except Exception as e:
         st.error(f"❌ Eroare la încărcarea datelor: {str(e)}")
 
 
+def ghiduri_d212_utilizatori(
+    supabase: Client,
+    an_fiscal: int,
+    user_ids: Optional[List[str]] = None,
+    ridica: bool = False
+) -> List[Tuple[str, Dict]]:
+    """
+    Datele fiscale ale utilizatorilor cu venituri într-un an
+    (totaluri precalculate din venituri_anuale, taxe din motor_fiscal)
+
+    Args:
+        user_ids: Doar acești utilizatori (None = toți)
+        ridica: True = eroarea de citire a veniturilor e ridicată (lucrări în
+            fundal), în loc de st.error și listă goală
+
+    Returns:
+        Listă (nume fișier PDF, fisc) pentru pdf_d212.genereaza_zip_d212
+    """
+    venituri = motor_fiscal.brut_ron_din_totaluri(
+        coproprietate.get_venituri_anuale(supabase, an_fiscal, user_ids, ridica=ridica),
+        motor_fiscal.curs_pentru_an(an_fiscal, curs_bnr.get_cursuri())
+    )
+    if not venituri:
+        return []
+
+    query = supabase.table("users").select("id, nume")
+    if user_ids is not None:
+        query = query.in_("id", list(venituri))
+    users = query.execute()
+    nume = {u['id']: u['nume'] for u in (users.data or [])}
+    parametri = parametri_fiscali.get_parametri(supabase, an_fiscal)
+
+    return [
+        (
+            pdf_d212.nume_fisier_pdf(nume.get(user_id, ''), user_id, an_fiscal),
+            motor_fiscal.calculeaza_taxe(venit, parametri=parametri)
+        )
+        for user_id, venit in venituri.items()
+    ]
+
+
 def show_system_settings(supabase: Client):
     """Setări sistem (pentru admini)"""
     st.header("⚙️ Setări Sistem")
 
-    tab1, tab2 = st.tabs(["Configurare", "Backup & Export"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["Configurare", "Simulator Fiscal", "Backup & Export", "Import Contracte", "Diagnostic"]
+    )
 
     with tab1:
         st.subheader("🔧 Configurare Aplicație")
 
-        # Salariu minim
-        st.markdown("### 💰 Salariu Minim Brut")
-        new_salariu = st.number_input(
-            "Salariu minim brut (RON)",
-            value=4050,
-            step=50,
-            help="Folosit pentru calculul pragurilor CASS"
-        )
-
-        if st.button("💾 Salvează Salariu Minim"):
-            st.info("Această setare trebuie actualizată în cod (app.py linia 30)")
-            st.code(f"SALARIU_MINIM = {new_salariu}", language="python")
+        # Parametri fiscali pe ani (salariu minim, cote, praguri CASS)
+        st.markdown("### 💰 Parametri Fiscali")
+        show_parametri_fiscali(supabase)
 
         # Curs BNR default
         st.markdown("### 💱 Curs BNR Default")
@@ -258,37 +516,397 @@ def show_system_settings(supabase: Client):
         )
 
         if st.button("💾 Salvează Curs Default"):
-            st.info("Această setare trebuie actualizată în cod (app.py linia 31)")
+            st.info("Această setare trebuie actualizată în cod (motor_fiscal.py)")
             st.code(f"CURS_BNR_DEFAULT = {new_curs}", language="python")
 
+        # Cursuri BNR încărcate din fișierele XML locale
+        st.markdown("### 🏦 Cursuri BNR")
+        cursuri = curs_bnr.get_cursuri()
+        if not cursuri.monede:
+            st.info(
+                f"Nu există cursuri BNR încărcate. Copiază fișierele nbrfxrates*.xml în "
+                f"directorul '{curs_bnr.DIRECTOR_IMPLICIT}' (sau setează CURS_BNR_DIR în secrets); "
+                f"până atunci se folosesc cursurile implicite."
+            )
+        else:
+            an_curent = datetime.now().year
+            st.dataframe(pd.DataFrame([
+                {
+                    "Monedă": moneda,
+                    "De la": cursuri.interval(moneda)[0],
+                    "Până la": cursuri.interval(moneda)[1],
+                    f"Medie {an_curent - 1}": cursuri.medie_anuala(moneda, an_curent - 1),
+                    f"Medie {an_curent}": cursuri.medie_anuala(moneda, an_curent),
+                }
+                for moneda in cursuri.monede
+                if moneda in motor_fiscal.CURSURI_DEFAULT
+            ]), use_container_width=True, hide_index=True)
+
     with tab2:
+        show_simulator_fiscal(supabase)
+
+    with tab3:
         st.subheader("💾 Backup & Export Date")
 
         st.markdown("### 📥 Export Complet")
         st.info("Exportă toate datele din baza de date pentru backup.")
 
         if st.button("📊 Export Toate Datele (Excel)"):
-            try:
-                # Export toate tabelele
-                users_data = supabase.table("users").select("email, nume, role, active, created_at").execute()
-                imobile_data = supabase.table("imobile").select("*").execute()
-                contracte_data = supabase.table("contracte").select("*").execute()
-
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    if users_data.data:
-                        pd.DataFrame(users_data.data).to_excel(writer, sheet_name='Utilizatori', index=False)
-                    if imobile_data.data:
-                        pd.DataFrame(imobile_data.data).to_excel(writer, sheet_name='Imobile', index=False)
-                    if contracte_data.data:
-                        pd.DataFrame(contracte_data.data).to_excel(writer, sheet_name='Contracte', index=False)
-
-                st.download_button(
-                    "📥 Descarcă Backup Complet",
-                    buffer.getvalue(),
-                    f"Backup_Proprieto_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            trimite_lucrare("backup_excel", "Backup complet (Excel)", {})
+
+        st.markdown("### 📑 Ghiduri D212 pentru Toți Utilizatorii")
+        st.info("Generează ghidul D212 pentru fiecare utilizator cu venituri în anul ales, într-o arhivă ZIP.")
+
+        an_ghiduri = st.number_input(
+            "An fiscal",
+            value=datetime.now().year - 1,
+            step=1,
+            key="admin_d212_an"
+        )
+
+        if st.button("📦 Generează Pachet D212 (ZIP)"):
+            trimite_lucrare("pachet_d212", f"Pachet D212 {int(an_ghiduri)}", {"an_fiscal": int(an_ghiduri)})
+
+        show_lucrari(None, ("backup_excel", "pachet_d212"), cheie="admin_export")
+
+    with tab4:
+        show_import_contracte(supabase)
+
+    with tab5:
+        show_diagnostics()
+
+
+def _formular_parametri(prefix: str, initiali: Dict) -> Dict:
+    """Câmpurile unui set de parametri fiscali (procentele afișate ca %)"""
+    col1, col2, col3, col4 = st.columns(4)
+    salariu = col1.number_input(
+        "Salariu minim brut (RON)", value=float(initiali['salariu_minim']), step=50.0,
+        key=f"{prefix}_salariu", help="Folosit pentru calculul pragurilor CASS"
+    )
+    forfetara = col2.number_input(
+        "Cotă forfetară (%)", value=initiali['cota_forfetara'] * 100, step=1.0, key=f"{prefix}_forfetara"
+    )
+    impozit = col3.number_input(
+        "Impozit (%)", value=initiali['cota_impozit'] * 100, step=1.0, key=f"{prefix}_impozit"
+    )
+    cass = col4.number_input(
+        "CASS (%)", value=initiali['cota_cass'] * 100, step=1.0, key=f"{prefix}_cass"
+    )
+    praguri = st.text_input(
+        "Praguri CASS (număr de salarii minime)",
+        value=", ".join(str(n) for n in initiali['praguri_cass']),
+        key=f"{prefix}_praguri"
+    )
+
+    try:
+        praguri = tuple(int(n) for n in praguri.replace(";", ",").split(","))
+    except ValueError:
+        praguri = ()
+
+    return {
+        "salariu_minim": salariu,
+        "cota_forfetara": forfetara / 100,
+        "cota_impozit": impozit / 100,
+        "cota_cass": cass / 100,
+        "praguri_cass": praguri,
+    }
+
+
+def show_parametri_fiscali(supabase: Client):
+    """Registrul parametrilor fiscali: tabel pe ani + editare pentru un an"""
+    registru = parametri_fiscali.get_registru(supabase)
+    if registru:
+        st.dataframe(pd.DataFrame([
+            {
+                "An": an,
+                "Salariu minim": p['salariu_minim'],
+                "Forfetar": f"{p['cota_forfetara']:.0%}",
+                "Impozit": f"{p['cota_impozit']:.0%}",
+                "CASS": f"{p['cota_cass']:.0%}",
+                "Praguri CASS": " / ".join(str(n) for n in p['praguri_cass']),
+            }
+            for an, p in sorted(registru.items())
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nu există parametri salvați (rulează migration_parametri_fiscali.sql); se folosesc valorile 2026 din cod.")
+
+    an = int(st.number_input("An fiscal", value=datetime.now().year, step=1, key="admin_parametri_an"))
+    parametri = _formular_parametri(f"parametri_{an}", motor_fiscal.parametri_pentru_an(registru, an))
+
+    if st.button("💾 Salvează Parametrii"):
+        success, message = parametri_fiscali.salveaza_parametri(supabase, an, parametri)
+        if success:
+            st.success(f"✅ {message}")
+        else:
+            st.error(f"❌ {message}")
+
+
+def show_simulator_fiscal(supabase: Client):
+    """Simulare: taxele tuturor utilizatorilor cu parametri alternativi"""
+    st.subheader("🧪 Simulator Fiscal")
+    st.info("Recalculează taxele întregului portofoliu pentru un an, cu parametri alternativi, fără a-i salva.")
+
+    an = int(st.number_input("An fiscal", value=datetime.now().year, step=1, key="admin_simulator_an"))
+    actuali = parametri_fiscali.get_parametri(supabase, an)
+    alternativi = _formular_parametri(f"simulator_{an}", actuali)
+
+    if not st.button("▶️ Simulează"):
+        return
+
+    valid, mesaj = parametri_fiscali.valideaza_parametri(alternativi)
+    if not valid:
+        st.error(f"❌ {mesaj}")
+        return
+
+    try:
+        venituri = motor_fiscal.brut_ron_din_totaluri(
+            coproprietate.get_venituri_anuale(supabase, an),
+            motor_fiscal.curs_pentru_an(an, curs_bnr.get_cursuri())
+        )
+        if not venituri:
+            st.info("Niciun utilizator cu venituri în acest an.")
+            return
+
+        # Un singur calcul vectorizat: 2 scenarii × toți utilizatorii
+        taxe = motor_fiscal.simuleaza_scenarii(list(venituri.values()), [actuali, alternativi])
+        actual, simulat = motor_fiscal.rezumat_scenarii(taxe)
+
+        col1, col2, col3 = st.columns(3)
+        for col, cheie, eticheta in (
+            (col1, "impozit", "Impozit total"),
+            (col2, "cass", "CASS total"),
+            (col3, "total_taxe", "Total taxe"),
+        ):
+            col.metric(
+                eticheta,
+                f"{simulat[cheie]:,.0f} RON",
+                f"{simulat[cheie] - actual[cheie]:+,.0f} RON"
+            )
+
+        st.dataframe(pd.DataFrame({
+            "Prag CASS": ["Fără CASS", "Prag 1", "Prag 2", "Prag 3"],
+            "Utilizatori (actual)": actual['useri_per_prag'],
+            "Utilizatori (simulat)": simulat['useri_per_prag'],
+        }), use_container_width=True, hide_index=True)
+
+        # Utilizatorii cu taxe modificate
+        diferente = taxe['total_taxe'][1] - taxe['total_taxe'][0]
+        afectati = int((diferente != 0).sum())
+        st.caption(f"{len(venituri):,} utilizatori simulați, {afectati:,} cu taxe modificate")
+
+    except Exception as e:
+        st.error(f"❌ Eroare la simulare: {str(e)}")
+
+
+def show_import_contracte(supabase: Client):
+    """Import în masă de contracte (CSV / XLSX) pentru un proprietar"""
+    st.subheader("📤 Import Contracte")
+    st.info(
+        "Coloane recunoscute: imobil (numele imobilului) sau imobil_id, nr_contract, locatar, "
+        "cnp_cui, chirie_lunara, moneda, frecventa_plata, data_inceput, data_sfarsit, email, telefon. "
+        "Contractele cu același număr pe același imobil sunt actualizate la reimport."
+    )
+
+    email = st.text_input("Email proprietar", key="import_email_proprietar")
+    fisier = st.file_uploader("Fișier contracte", type=["csv", "xlsx"], key="import_fisier")
+
+    if st.button("📤 Importă Contracte", disabled=not (email and fisier)):
+        try:
+            result = supabase.table("users")\
+                .select("id, nume")\
+                .eq("email", email.strip().lower())\
+                .execute()
+
+            if not result.data:
+                st.error(f"❌ Nu există niciun utilizator cu emailul {email}")
+                return
+
+            proprietar = result.data[0]
+            trimite_lucrare(
+                "import_contracte",
+                f"Import {fisier.name} → {proprietar['nume']}",
+                {"user_id": proprietar['id'], "nume_fisier": os.path.basename(fisier.name)},
+                {fisier.name: fisier.getvalue()}
+            )
+
+        except Exception as e:
+            st.error(f"❌ Eroare la import: {str(e)}")
+
+    show_lucrari(None, ("import_contracte",), cheie="admin_import")
+
+
+def _afiseaza_raport_import(raport: Dict):
+    """Metricile și erorile unui import de contracte terminat"""
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rânduri", f"{raport['procesate']:,}")
+    col2.metric("Importate", f"{raport['importate']:,}")
+    col3.metric("Erori", f"{raport['nr_erori']:,}")
+
+    if raport['erori']:
+        if raport['nr_erori'] > len(raport['erori']):
+            st.warning(f"Sunt afișate primele {len(raport['erori']):,} erori din {raport['nr_erori']:,}.")
+        st.dataframe(
+            pd.DataFrame(raport['erori'], columns=["Rând", "Eroare"]),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.success("✅ Toate contractele au fost importate")
+
+
+# ==================== LUCRĂRI ÎN FUNDAL ====================
+
+ETICHETE_STARE = {
+    "in_asteptare": "⏳ În așteptare",
+    "in_lucru": "⚙️ În lucru",
+    "finalizata": "✅ Finalizată",
+    "esuata": "❌ Eșuată",
+    "anulata": "🚫 Anulată",
+}
+
+def trimite_lucrare(tip: str, titlu: str, parametri: Dict, fisiere: Optional[Dict[str, bytes]] = None) -> Optional[str]:
+    """Pune o lucrare în coada din fundal în numele userului curent"""
+    try:
+        lucrare_id = lucrari.trimite(tip, titlu, parametri, st.session_state.get("user_id"), fisiere)
+        st.success(f"✅ {titlu}: lucrarea rulează în fundal. Poți naviga în altă parte; rezultatul apare mai jos.")
+        return lucrare_id
+    except Exception as e:
+        st.error(f"❌ Lucrarea nu a putut fi pornită: {str(e)}")
+        return None
+
+def show_lucrari(user_id: Optional[str], tipuri: Optional[Tuple[str, ...]] = None, cheie: str = "lucrari"):
+    """
+    Ultimele lucrări din fundal: stare, progres, anulare și descărcare
+
+    Args:
+        user_id: Doar lucrările acestui user (None = toate, pentru admini)
+        tipuri: Doar aceste tipuri de lucrări (None = toate)
+        cheie: Prefixul cheilor widget-urilor (secțiunea din pagină)
+    """
+    col1, col2 = st.columns([4, 1])
+    col1.markdown("### 🗂️ Lucrări în Fundal")
+    col2.button("🔄 Actualizează", key=f"{cheie}_actualizeaza")
+
+    try:
+        lucrari.reporneste_pentru_coada()
+        lista = lucrari.lucrari_recente(user_id, tipuri)
+    except Exception as e:
+        st.error(f"❌ Eroare la citirea lucrărilor: {str(e)}")
+        return
+
+    if not lista:
+        st.caption("Nicio lucrare pornită.")
+        return
+
+    for lucrare in lista:
+        with st.container(border=True):
+            st.markdown(
+                f"**{lucrare['titlu']}** · {ETICHETE_STARE[lucrare['stare']]} · "
+                f"{datetime.fromtimestamp(lucrare['creata']).strftime('%d.%m.%Y %H:%M')}"
+            )
+
+            if lucrare['stare'] in ("in_asteptare", "in_lucru"):
+                st.progress(min(lucrare['progres'], 1.0), text=lucrare['mesaj'] or "")
+                if st.button("🚫 Anulează", key=f"{cheie}_anuleaza_{lucrare['id']}"):
+                    succes, mesaj = lucrari.anuleaza(lucrare['id'])
+                    (st.success if succes else st.warning)(mesaj)
+            elif lucrare['stare'] == "esuata":
+                st.error(lucrare['mesaj'])
+            elif lucrare['stare'] == "finalizata":
+                cale = lucrari.cale_artefact(lucrare)
+                if cale:
+                    with open(cale, "rb") as f:
+                        st.download_button(
+                            f"📥 Descarcă {lucrare['fisier']}",
+                            f.read(),
+                            lucrare['fisier'],
+                            lucrare['mime'],
+                            key=f"{cheie}_descarca_{lucrare['id']}"
+                        )
+                elif lucrare['tip'] == "import_contracte":
+                    _afiseaza_raport_import(lucrare['rezultat'])
+                else:
+                    st.info("Niciun rezultat de descărcat (niciun utilizator cu venituri).")
+
+def show_ghid_d212_fundal(user_id: str, an_fiscal: int):
+    """Ghidul D212 al userului generat în fundal (pentru Dashboard Fiscal)"""
+    if st.button("📄 Generează Ghid D212 (PDF)", key="dashboard_ghid_d212"):
+        trimite_lucrare("ghid_d212", f"Ghid D212 {an_fiscal}", {"user_id": user_id, "an_fiscal": an_fiscal})
+    show_lucrari(user_id, ("ghid_d212",), cheie="dashboard")
+
+
+def show_metrici_hash():
+    """Latența hash-urilor de parolă (login, creare useri) în acest proces"""
+    st.subheader("🔐 Hash-uri Parole (proces curent)")
+
+    metrici = auth.get_metrici_hash()
+    if not metrici['nr_hash'] and not metrici['respinse']:
+        st.caption("Niciun hash calculat de la pornirea serverului.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hash-uri măsurate", metrici['nr_hash'])
+    col2.metric(
+        "Așteptare în coadă p50 / p95",
+        f"{metrici['asteptare_p50'] * 1000:,.0f} / {metrici['asteptare_p95'] * 1000:,.0f} ms"
+    )
+    col3.metric(
+        "Calcul p50 / p95",
+        f"{metrici['calcul_p50'] * 1000:,.0f} / {metrici['calcul_p95'] * 1000:,.0f} ms",
+        help=f"Maxim: {metrici['calcul_max'] * 1000:,.0f} ms"
+    )
+    col4.metric("Respinse (server ocupat)", metrici['respinse'])
+
+def show_diagnostics():
+    """Cererile Supabase înregistrate în ultimele rerun-uri ale sesiunii"""
+    show_metrici_hash()
+    st.divider()
+
+    st.subheader("🩺 Diagnostic Cereri Supabase")
+
+    st.toggle(
+        "Înregistrează cererile (sesiunea curentă)",
+        key="diagnostic_activ",
+        help="Fiecare rerun primește un jurnal cu tabel, filtre, latență și dimensiunea răspunsului"
+    )
+
+    jurnale = diagnostic.jurnale()
+    if not jurnale:
+        st.info("Nicio cerere înregistrată. Activează înregistrarea și navighează prin aplicație.")
+        return
+
+    st.download_button(
+        "📥 Export JSON",
+        diagnostic.exporta_json(),
+        f"Diagnostic_Proprieto_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
+        "application/json"
+    )
+
+    for jurnal in jurnale:
+        rezumat = jurnal.rezumat()
+        avertizare = f" · ⚠️ {rezumat['n_plus_1']} tipare N+1" if rezumat['n_plus_1'] else ""
+        titlu = (
+            f"{rezumat['inceput']} · {rezumat['eticheta'] or 'rerun'} · "
+            f"{rezumat['nr_cereri']} cereri · {rezumat['ms_total']:,.0f} ms{avertizare}"
+        )
+
+        with st.expander(titlu):
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Cereri", rezumat['nr_cereri'])
+            col2.metric("Timp total", f"{rezumat['ms_total']:,.0f} ms")
+            col3.metric("Date primite", f"{rezumat['octeti_total'] / 1024:,.1f} KB")
+
+            for tipar in jurnal.n_plus_1():
+                st.warning(
+                    f"N+1: `{tipar['forma']}` repetată de {tipar['repetari']} ori "
+                    f"({tipar['ms_total']:,.0f} ms)"
                 )
 
-            except Exception as e:
-                st.error(f"❌ Eroare la export: {str(e)}")
+            if jurnal.cereri:
+                df = pd.DataFrame(jurnal.cereri)
+                df['filtre'] = df['filtre'].str.join(", ")
+                st.dataframe(
+                    df[['tabel', 'operatie', 'filtre', 'ms', 'randuri', 'octeti', 'eroare']],
+                    use_container_width=True,
+                    hide_index=True
+                )
@@ -6,21 +6,96 @@ Gestionează login, logout și verificarea sesiunii utilizatorilor
 import streamlit as st
 from supabase import Client
 import hashlib
+import math
+import os
 import secrets
-from datetime import datetime, timedelta
-
-def hash_password(password: str, salt: str = None) -> tuple:
-    """Hash password cu salt pentru securitate"""
-    if salt is None:
-        salt = secrets.token_hex(16)
-
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TimeoutHash
+from datetime import datetime
+from typing import Optional
+from limitare import LimitatorMemorie, LimitatorSQLite
+import coproprietate
+
+# --- POOL PENTRU HASH-URI PBKDF2 ---
+# pbkdf2_hmac eliberează GIL-ul, deci thread-urile rulează hash-urile în paralel
+# fără să blocheze thread-ul scriptului Streamlit
+HASH_WORKERS = max(2, os.cpu_count() or 2)
+HASH_MAX_IN_COADA = HASH_WORKERS * 4  # Cereri care pot aștepta un worker liber
+HASH_TIMEOUT = 10  # secunde
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pbkdf2")
+_hash_sloturi = threading.BoundedSemaphore(HASH_WORKERS + HASH_MAX_IN_COADA)
+_hash_metrici_lock = threading.Lock()
+_hash_latente = deque(maxlen=1000)  # (așteptare în coadă, calcul) în secunde
+_hash_respinse = 0
+
+class ServerOcupat(Exception):
+    """Coada de hash-uri e plină; cererea e respinsă imediat"""
+
+def _pbkdf2(password: str, salt: str, trimis_la: float) -> str:
+    inceput = time.perf_counter()
     pwd_hash = hashlib.pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt.encode('utf-8'),
         100000
     )
-    return pwd_hash.hex(), salt
+    with _hash_metrici_lock:
+        _hash_latente.append((inceput - trimis_la, time.perf_counter() - inceput))
+    return pwd_hash.hex()
+
+def hash_password(password: str, salt: str = None) -> tuple:
+    """
+    Hash password cu salt pentru securitate
+    Calculul rulează în pool-ul de hash-uri; ridică ServerOcupat dacă e plin
+    sau dacă hash-ul nu e gata în HASH_TIMEOUT secunde
+    """
+    global _hash_respinse
+
+    if salt is None:
+        salt = secrets.token_hex(16)
+
+    # Admitere: respinge imediat dacă toți workerii și coada sunt ocupați
+    if not _hash_sloturi.acquire(blocking=False):
+        with _hash_metrici_lock:
+            _hash_respinse += 1
+        raise ServerOcupat("Serverul este ocupat. Încearcă din nou în câteva secunde.")
+
+    future = _hash_pool.submit(_pbkdf2, password, salt, time.perf_counter())
+    future.add_done_callback(lambda _: _hash_sloturi.release())
+
+    try:
+        return future.result(timeout=HASH_TIMEOUT), salt
+    except TimeoutHash:
+        with _hash_metrici_lock:
+            _hash_respinse += 1
+        raise ServerOcupat("Serverul este ocupat. Încearcă din nou în câteva secunde.")
+
+def get_metrici_hash() -> dict:
+    """Statistici de latență pentru ultimele hash-uri (secunde)"""
+    with _hash_metrici_lock:
+        latente = list(_hash_latente)
+        respinse = _hash_respinse
+
+    def percentila(valori, p):
+        if not valori:
+            return 0.0
+        valori = sorted(valori)
+        return valori[min(len(valori) - 1, int(p * len(valori)))]
+
+    asteptare = [a for a, _ in latente]
+    calcul = [c for _, c in latente]
+    return {
+        "nr_hash": len(latente),
+        "respinse": respinse,
+        "asteptare_p50": percentila(asteptare, 0.50),
+        "asteptare_p95": percentila(asteptare, 0.95),
+        "calcul_p50": percentila(calcul, 0.50),
+        "calcul_p95": percentila(calcul, 0.95),
+        "calcul_max": max(calcul, default=0.0),
+    }
 
 def verify_password(password: str, pwd_hash: str, salt: str) -> bool:
     """Verifică dacă parola este corectă"""
@@ -39,22 +114,85 @@ def init_session_state():
         st.session_state.user_name = None
     if 'user_role' not in st.session_state:
         st.session_state.user_role = None
-    if 'login_attempts' not in st.session_state:
-        st.session_state.login_attempts = 0
-    if 'last_login_attempt' not in st.session_state:
-        st.session_state.last_login_attempt = None
-
-def check_rate_limit() -> bool:
-    """Verifică rate limiting pentru login (max 5 încercări / 15 min)"""
-    if st.session_state.login_attempts >= 5:
-        if st.session_state.last_login_attempt:
-            time_diff = datetime.now() - st.session_state.last_login_attempt
-            if time_diff < timedelta(minutes=15):
-                return False
+
+# --- RATE LIMITING LOGIN (partajat între sesiuni/tab-uri) ---
+LOGIN_MAX_INCERCARI = 5          # per email
+LOGIN_MAX_INCERCARI_CLIENT = 20  # per client (IP), mai permisiv pentru NAT
+LOGIN_FEREASTRA = 15 * 60        # secunde
+
+_limitator = None
+_limitator_lock = threading.Lock()
+
+def _get_limitator() -> LimitatorMemorie:
+    """
+    Limitatorul de login (găleți "email:" și "client:"), creat o singură
+    dată per proces. Cu RATE_LIMIT_DB în secrets, starea e ținută într-un
+    fișier SQLite partajat între procese; altfel în memorie
+    """
+    global _limitator
+
+    with _limitator_lock:
+        if _limitator is None:
+            try:
+                cale = st.secrets.get("RATE_LIMIT_DB")
+            except Exception:
+                cale = None
+
+            capacitati = {"client": LOGIN_MAX_INCERCARI_CLIENT}
+            if cale:
+                _limitator = LimitatorSQLite(LOGIN_MAX_INCERCARI, LOGIN_FEREASTRA, cale, capacitati)
             else:
-                # Reset după 15 minute
-                st.session_state.login_attempts = 0
-    return True
+                _limitator = LimitatorMemorie(LOGIN_MAX_INCERCARI, LOGIN_FEREASTRA, capacitati)
+        return _limitator
+
+def _proxy_de_incredere() -> bool:
+    """TRUSTED_PROXY = true în secrets: aplicația e accesibilă doar printr-un reverse proxy"""
+    try:
+        return bool(st.secrets.get("TRUSTED_PROXY", False))
+    except Exception:
+        return False
+
+def _client_id() -> Optional[str]:
+    """
+    Identificatorul clientului: adresa conexiunii sau, în spatele unui proxy
+    de încredere (TRUSTED_PROXY), ultima adresă din X-Forwarded-For, adăugată
+    de proxy (primele intrări le poate trimite oricine)
+
+    Fără proxy, antetul vine direct de la client și ar putea schimba cheia
+    găleții la fiecare încercare, deci e ignorat.
+    """
+    try:
+        if _proxy_de_incredere():
+            forwarded = st.context.headers.get("X-Forwarded-For")
+            if forwarded:
+                return forwarded.split(",")[-1].strip() or None
+        return getattr(st.context, "ip_address", None)
+    except Exception:
+        return None
+
+def asteptare_login(email: str) -> float:
+    """
+    Rate limiting pentru login (max 5 încercări / 15 min per email, max 20 /
+    15 min per client): consumă o încercare din ambele găleți deodată
+
+    Returns:
+        0 dacă încercarea e permisă; altfel secundele până la următoarea
+        încercare permisă (nimic consumat)
+    """
+    chei = [f"email:{email.strip().lower()}"]
+    client = _client_id()
+    if client:
+        chei.append(f"client:{client}")
+    return _get_limitator().incearca(chei)
+
+def check_rate_limit(email: str) -> bool:
+    """Verifică rate limiting pentru login și consumă o încercare (vezi asteptare_login)"""
+    return asteptare_login(email) == 0
+
+def _durata(secunde: float) -> str:
+    """Durata rotunjită în sus la minute (ex: '3 minute', '1 minut')"""
+    minute = max(1, math.ceil(secunde / 60))
+    return "1 minut" if minute == 1 else f"{minute} minute"
 
 def login_user(supabase: Client, email: str, password: str) -> tuple:
     """
@@ -62,16 +200,15 @@ def login_user(supabase: Client, email: str, password: str) -> tuple:
     Returns: (success: bool, message: str, user_data: dict)
     """
     try:
-        # Rate limiting
-        if not check_rate_limit():
-            return False, "Prea multe încercări de login. Așteaptă 15 minute.", None
+        # Rate limiting (înainte de orice query sau hash)
+        asteptare = asteptare_login(email)
+        if asteptare > 0:
+            return False, f"Prea multe încercări de login. Așteaptă {_durata(asteptare)}.", None
 
         # Caută utilizatorul în baza de date
-        result = supabase.table("users").select("*").eq("email", email.lower()).execute()
+        result = supabase.table("users").select("*").eq("email", email.strip().lower()).execute()
 
         if not result.data:
-            st.session_state.login_attempts += 1
-            st.session_state.last_login_attempt = datetime.now()
             return False, "Email sau parolă incorectă.", None
 
         user = result.data[0]
@@ -82,8 +219,8 @@ def login_user(supabase: Client, email: str, password: str) -> tuple:
 
         # Verifică parola
         if verify_password(password, user['password_hash'], user['salt']):
-            # Reset login attempts
-            st.session_state.login_attempts = 0
+            # Reset încercări pentru acest email
+            _get_limitator().reseteaza(f"email:{email.strip().lower()}")
 
             # Actualizează last_login
             supabase.table("users").update({
@@ -97,12 +234,17 @@ def login_user(supabase: Client, email: str, password: str) -> tuple:
             st.session_state.user_name = user.get('nume', user['email'])
             st.session_state.user_role = user.get('role', 'user')
 
+            # Permisiunile de editare, o singură dată per sesiune
+            st.session_state.pop(coproprietate.CHEIE_ACL, None)
+            if st.session_state.user_role != 'admin':
+                coproprietate.incarca_acl(supabase, user['id'])
+
             return True, "Autentificare reușită!", user
         else:
-            st.session_state.login_attempts += 1
-            st.session_state.last_login_attempt = datetime.now()
             return False, "Email sau parolă incorectă.", None
 
+    except ServerOcupat as e:
+        return False, str(e), None
     except Exception as e:
         return False, f"Eroare la autentificare: {str(e)}", None
 
@@ -113,7 +255,7 @@ def logout_user():
     st.session_state.user_email = None
     st.session_state.user_name = None
     st.session_state.user_role = None
-    st.session_state.login_attempts = 0
+    st.session_state.pop(coproprietate.CHEIE_ACL, None)
 
 def register_user(supabase: Client, email: str, password: str, nume: str, role: str = 'user') -> tuple:
     """
@@ -152,6 +294,8 @@ def register_user(supabase: Client, email: str, password: str, nume: str, role:
 
         return True, "Cont creat cu succes! Poți să te autentifici acum."
 
+    except ServerOcupat as e:
+        return False, str(e)
     except Exception as e:
         return False, f"Eroare la înregistrare: {str(e)}"
 
@@ -187,6 +331,8 @@ def change_password(supabase: Client, user_id: str, old_password: str, new_passw
 
         return True, "Parolă schimbată cu succes!"
 
+    except ServerOcupat as e:
+        return False, str(e)
     except Exception as e:
         return False, f"Eroare la schimbarea parolei: {str(e)}"
 
@@ -0,0 +1,100 @@
+"""
+Modul de export backup pentru Proprieto
+Parcurge tabelele pe pagini (keyset pe id) și scrie rândurile direct într-un
+fișier Excel în modul write-only, deci memoria rămâne constantă
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional
+
+from supabase import Client
+
+# (tabel, foaie Excel, coloane exportate)
+TABELE_BACKUP = [
+    ("users", "Utilizatori", "email, nume, role, active, created_at"),
+    ("imobile", "Imobile", "*"),
+    ("contracte", "Contracte", "*"),
+]
+
+# Limita implicită de rânduri per răspuns în PostgREST (Supabase)
+MARIME_PAGINA = 1000
+
+
+def numara_randuri(supabase: Client, tabel: str, user_id: Optional[str] = None) -> int:
+    """Numărul exact de rânduri dintr-un tabel (cerere HEAD, fără date), opțional doar ale unui user"""
+    query = supabase.table(tabel).select("id", count="exact", head=True)
+    if user_id is not None:
+        query = query.eq("user_id", user_id)
+    return query.execute().count or 0
+
+
+def pagini_tabel(
+    supabase: Client,
+    tabel: str,
+    coloane: str = "*",
+    marime: int = MARIME_PAGINA
+) -> Iterator[List[Dict]]:
+    """
+    Generează rândurile unui tabel în pagini ordonate după id
+
+    Paginarea e keyset (id > ultimul id), deci fiecare pagină costă la fel
+    indiferent cât de departe e în tabel.
+    """
+    selectie = coloane if coloane == "*" else f"id, {coloane}"
+    ultimul_id = None
+
+    while True:
+        query = supabase.table(tabel).select(selectie).order("id").limit(marime)
+        if ultimul_id is not None:
+            query = query.gt("id", ultimul_id)
+
+        randuri = query.execute().data or []
+        if not randuri:
+            return
+
+        yield randuri
+
+        if len(randuri) < marime:
+            return
+        ultimul_id = randuri[-1]['id']
+
+
+def exporta_backup_excel(
+    supabase: Client,
+    cale: str,
+    progres: Optional[Callable[[float, str], None]] = None
+) -> int:
+    """
+    Exportă toate tabelele din TABELE_BACKUP într-un fișier .xlsx
+
+    Args:
+        cale: Fișierul în care se scrie
+        progres: Apelat cu (fracțiune 0-1, text) după fiecare pagină
+
+    Returns:
+        Numărul total de rânduri exportate
+    """
+    from openpyxl import Workbook  # doar pe calea de export
+
+    total = sum(numara_randuri(supabase, tabel) for tabel, _, _ in TABELE_BACKUP)
+    exportate = 0
+
+    wb = Workbook(write_only=True)
+    for tabel, foaie, coloane in TABELE_BACKUP:
+        ws = wb.create_sheet(foaie)
+        antet = None
+
+        for pagina in pagini_tabel(supabase, tabel, coloane):
+            if antet is None:
+                # id-ul e cerut doar pentru paginare când nu e exportat explicit
+                antet = [k for k in pagina[0] if coloane == "*" or k != "id"]
+                ws.append(antet)
+
+            for rand in pagina:
+                ws.append([rand.get(k) for k in antet])
+
+            exportate += len(pagina)
+            if progres:
+                progres(min(exportate / total, 1.0) if total else 1.0, f"{foaie}: {exportate:,} / {total:,} rânduri")
+
+    wb.save(cale)
+    return exportate
@@ -0,0 +1,3 @@
+"""
+Benchmark-uri offline pentru Proprieto (fără Supabase)
+"""
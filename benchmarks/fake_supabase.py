@@ -0,0 +1,406 @@
+"""
+Înlocuitor în memorie pentru clientul Supabase, folosit de benchmark-uri
+Implementează lanțul table().select().eq().in_().insert()...execute() pe
+care îl folosesc modulele aplicației și numără fiecare cerere (round trip)
+"""
+
+import re
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import motor_fiscal
+
+# Embed-uri PostgREST many-to-one: nume tabel -> coloana FK din tabelul părinte
+CHEI_STRAINE = {
+    "users": "user_id",
+    "imobile": "imobil_id",
+    "contracte": "contract_id",
+}
+
+# Constrângeri UNIQUE din setup.sql
+CHEI_UNICE = {
+    "users": [("email",)],
+    "imobile_proprietari": [("imobil_id", "user_id")],
+    "contracte_proprietari": [("contract_id", "user_id")],
+}
+
+
+class EroareFake(Exception):
+    """Echivalentul unei erori PostgREST (ex: încălcarea unei chei unice)"""
+
+
+class Raspuns:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _parseaza_select(coloane: str) -> List[Any]:
+    """'*, imobile(*, users(nume))' -> ['*', ('imobile', [...])]"""
+    rezultat, curent, adancime = [], "", 0
+    for ch in coloane + ",":
+        if ch == "," and adancime == 0:
+            camp = curent.strip()
+            curent = ""
+            if not camp:
+                continue
+            potrivire = re.match(r"^(\w+)\((.*)\)$", camp, re.S)
+            if potrivire:
+                rezultat.append((potrivire.group(1), _parseaza_select(potrivire.group(2))))
+            else:
+                rezultat.append(camp)
+            continue
+        adancime += ch == "("
+        adancime -= ch == ")"
+        curent += ch
+    return rezultat
+
+
+class CerereFake:
+    """Un lanț de tip PostgREST asupra unui tabel din FakeSupabase"""
+
+    def __init__(self, client: "FakeSupabase", tabel: str):
+        self._client = client
+        self._tabel = tabel
+        self._operatie = "select"
+        self._coloane = _parseaza_select("*")
+        self._filtre = []
+        self._ordine = []
+        self._limita = None
+        self._offset = 0
+        self._count = None
+        self._head = False
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+
+    # --- operații ---
+    def select(self, coloane: str = "*", count: Optional[str] = None, head: bool = False):
+        self._coloane = _parseaza_select(coloane)
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json):
+        self._operatie, self._payload = "insert", json
+        return self
+
+    def upsert(self, json, on_conflict: str = "", ignore_duplicates: bool = False, **_):
+        self._operatie, self._payload = "upsert", json
+        self._on_conflict = tuple(c.strip() for c in on_conflict.split(",") if c.strip())
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json):
+        self._operatie, self._payload = "update", json
+        return self
+
+    def delete(self):
+        self._operatie = "delete"
+        return self
+
+    # --- filtre ---
+    def _filtru(self, coloana, functie):
+        self._filtre.append((coloana, functie))
+        return self
+
+    def eq(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v == valoare)
+
+    def neq(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v != valoare)
+
+    def gt(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v is not None and v > valoare)
+
+    def gte(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v is not None and v >= valoare)
+
+    def lt(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v is not None and v < valoare)
+
+    def lte(self, coloana, valoare):
+        return self._filtru(coloana, lambda v: v is not None and v <= valoare)
+
+    def in_(self, coloana, valori):
+        valori = set(valori)
+        return self._filtru(coloana, lambda v: v in valori)
+
+    def is_(self, coloana, valoare):
+        asteptat = None if valoare in (None, "null") else valoare
+        return self._filtru(coloana, lambda v: v is asteptat or v == asteptat)
+
+    def ilike(self, coloana, model):
+        regex = re.compile("^" + re.escape(model).replace("%", ".*").replace(r"\*", ".*") + "$", re.I)
+        return self._filtru(coloana, lambda v: v is not None and bool(regex.match(str(v))))
+
+    def or_(self, filtre: str):
+        """Doar forma simplă 'col.op.valoare,col.op.valoare' (fără and/or imbricate)"""
+        operatori = {
+            "eq": lambda v, x: v is not None and str(v) == x,
+            "gt": lambda v, x: v is not None and str(v) > x,
+            "gte": lambda v, x: v is not None and str(v) >= x,
+            "lt": lambda v, x: v is not None and str(v) < x,
+            "lte": lambda v, x: v is not None and str(v) <= x,
+            "is": lambda v, x: v is None if x == "null" else str(v).lower() == x,
+        }
+        conditii = [c.split(".", 2) for c in filtre.split(",")]
+        self._filtre.append((None, lambda _, rand: any(
+            operatori[op](rand.get(coloana), valoare) for coloana, op, valoare in conditii
+        )))
+        return self
+
+    # --- modificatori ---
+    def order(self, coloana, desc: bool = False, **_):
+        self._ordine.append((coloana, desc))
+        return self
+
+    def limit(self, n: int, **_):
+        self._limita = n
+        return self
+
+    def range(self, start: int, end: int, **_):
+        self._offset, self._limita = start, end - start + 1
+        return self
+
+    # --- execuție ---
+    def _potriviri(self) -> List[Dict]:
+        return [
+            r for r in self._client.randuri(self._tabel)
+            if all(f(None, r) if c is None else f(r.get(c)) for c, f in self._filtre)
+        ]
+
+    def _proiecteaza(self, rand: Dict, coloane: List[Any]) -> Dict:
+        rezultat = {}
+        for camp in coloane:
+            if camp == "*":
+                rezultat.update(rand)
+            elif isinstance(camp, tuple):
+                tabel, sub = camp
+                fk = CHEI_STRAINE[tabel]
+                parinte = self._client.index(tabel).get(rand.get(fk))
+                rezultat[tabel] = self._proiecteaza(parinte, sub) if parinte else None
+            else:
+                rezultat[camp] = rand.get(camp)
+        return rezultat
+
+    def execute(self) -> Raspuns:
+        self._client.inregistreaza(self._tabel, self._operatie)
+
+        if self._operatie == "select":
+            randuri = self._potriviri()
+            for coloana, desc in reversed(self._ordine):
+                randuri.sort(key=lambda r: (r.get(coloana) is None, r.get(coloana)), reverse=desc)
+            count = len(randuri) if self._count else None
+            if self._head:
+                return Raspuns([], count)
+            sfarsit = None if self._limita is None else self._offset + self._limita
+            randuri = randuri[self._offset:sfarsit]
+            return Raspuns([self._proiecteaza(r, self._coloane) for r in randuri], count)
+
+        if self._operatie in ("insert", "upsert"):
+            randuri = self._payload if isinstance(self._payload, list) else [self._payload]
+            return Raspuns(self._client.scrie(
+                self._tabel, randuri,
+                on_conflict=self._on_conflict if self._operatie == "upsert" else None,
+                ignore_duplicates=self._ignore_duplicates
+            ))
+
+        tinte = self._potriviri()
+        if self._operatie == "update":
+            for rand in tinte:
+                rand.update(self._payload)
+        else:
+            ids = {id(r) for r in tinte}
+            self._client.tabele[self._tabel] = [
+                r for r in self._client.tabele[self._tabel] if id(r) not in ids
+            ]
+        self._client.invalideaza_index(self._tabel)
+        return Raspuns([dict(r) for r in tinte])
+
+
+class CerereRpc:
+    """Apelul unei funcții; filtrele, ordinea și limita se aplică rezultatului (ca în PostgREST)"""
+
+    def __init__(self, client: "FakeSupabase", functie: str, parametri: Dict):
+        self._client, self._functie, self._parametri = client, functie, parametri
+        self._filtre, self._ordine, self._limita = [], [], None
+
+    def gte(self, coloana: str, valoare):
+        self._filtre.append(lambda r: r.get(coloana) is not None and str(r[coloana]) >= str(valoare))
+        return self
+
+    def gt(self, coloana: str, valoare):
+        self._filtre.append(lambda r: r.get(coloana) is not None and str(r[coloana]) > str(valoare))
+        return self
+
+    def order(self, coloana, desc: bool = False, **_):
+        self._ordine.append((coloana, desc))
+        return self
+
+    def limit(self, n: int, **_):
+        self._limita = n
+        return self
+
+    def execute(self) -> Raspuns:
+        self._client.inregistreaza(f"rpc:{self._functie}", "rpc")
+        randuri = [r for r in getattr(self._client, f"_rpc_{self._functie}")(**self._parametri)
+                   if all(f(r) for f in self._filtre)]
+        for coloana, desc in reversed(self._ordine):
+            randuri.sort(key=lambda r: (r.get(coloana) is None, str(r.get(coloana))), reverse=desc)
+        return Raspuns(randuri[:self._limita] if self._limita is not None else randuri)
+
+
+class FakeSupabase:
+    """
+    Bază de date în memorie cu interfața clientului Supabase
+
+    Args:
+        latenta: Secunde adăugate la fiecare cerere, pentru a simula rețeaua
+    """
+
+    def __init__(self, latenta: float = 0.0):
+        self.latenta = latenta
+        self.tabele: Dict[str, List[Dict]] = {}
+        self.cereri: List[tuple] = []
+        self._indexuri: Dict[str, Dict[str, Dict]] = {}
+        self._derivate: Dict[str, List[Dict]] = {}
+
+    # --- interfața Supabase ---
+    def table(self, nume: str) -> CerereFake:
+        return CerereFake(self, nume)
+
+    def rpc(self, functie: str, parametri: Optional[Dict] = None) -> CerereRpc:
+        return CerereRpc(self, functie, parametri or {})
+
+    # --- contorizare ---
+    def inregistreaza(self, tabel: str, operatie: str):
+        self.cereri.append((tabel, operatie))
+        if self.latenta:
+            time.sleep(self.latenta)
+
+    @property
+    def nr_cereri(self) -> int:
+        return len(self.cereri)
+
+    def reseteaza_contor(self):
+        self.cereri = []
+
+    # --- stocare ---
+    def randuri(self, tabel: str) -> List[Dict]:
+        """Rândurile unui tabel; venituri_anuale e calculat ca și cum triggerele l-ar ține la zi"""
+        if tabel == "venituri_anuale":
+            if tabel not in self._derivate:
+                self._derivate[tabel] = self._venituri_anuale_rollup()
+            return self._derivate[tabel]
+        return self.tabele.setdefault(tabel, [])
+
+    def index(self, tabel: str) -> Dict[str, Dict]:
+        if tabel not in self._indexuri:
+            self._indexuri[tabel] = {r['id']: r for r in self.tabele.get(tabel, [])}
+        return self._indexuri[tabel]
+
+    def invalideaza_index(self, tabel: str):
+        self._indexuri.pop(tabel, None)
+        self._derivate.clear()
+
+    def scrie(self, tabel: str, randuri: List[Dict], on_conflict=None, ignore_duplicates=False) -> List[Dict]:
+        """Insert (sau upsert cu on_conflict) cu verificarea cheilor unice"""
+        existente = self.tabele.setdefault(tabel, [])
+        chei = CHEI_UNICE.get(tabel, [])
+        ocupate = {k: {tuple(r.get(c) for c in k): r for r in existente} for k in chei}
+        if on_conflict and on_conflict not in ocupate:
+            ocupate[on_conflict] = {tuple(r.get(c) for c in on_conflict): r for r in existente}
+
+        scrise = []
+        for rand in randuri:
+            # Ca în Postgres, NULL nu intră în conflict cu nimic
+            if on_conflict and all(rand.get(c) is not None for c in on_conflict):
+                vechi = ocupate[on_conflict].get(tuple(rand.get(c) for c in on_conflict))
+                if vechi is not None:
+                    if not ignore_duplicates:
+                        vechi.update(rand)
+                        scrise.append(dict(vechi))
+                    continue
+
+            for k in chei:
+                if tuple(rand.get(c) for c in k) in ocupate[k]:
+                    raise EroareFake(f"duplicate key value violates unique constraint on {tabel}{k}")
+
+            nou = {"id": str(uuid.uuid4()), "created_at": datetime.now().isoformat(), **rand}
+            existente.append(nou)
+            for k in ocupate:
+                ocupate[k][tuple(nou.get(c) for c in k)] = nou
+            scrise.append(dict(nou))
+
+        self.invalideaza_index(tabel)
+        return scrise
+
+    def _venituri_anuale_rollup(self) -> List[Dict]:
+        """Conținutul tabelului venituri_anuale (migration_venituri_rollup.sql)"""
+        contracte = self.tabele.get("contracte", [])
+        if not contracte:
+            return []
+        prim = min(int(c['data_inceput'][:4]) for c in contracte)
+        ultim = max(
+            int(c['data_sfarsit'][:4]) if c.get('data_sfarsit') else max(int(c['data_inceput'][:4]), date.today().year + 1)
+            for c in contracte
+        )
+        return [r for an in range(prim, ultim + 1) for r in self._rpc_venituri_anuale(an)]
+
+    # --- funcții RPC (echivalentele celor din migrațiile SQL) ---
+    def _rpc_venituri_anuale(self, p_an_fiscal: int, p_user_ids: Optional[List[str]] = None) -> List[Dict]:
+        contracte = self.index("contracte")
+        procente = {
+            (r['imobil_id'], r['user_id']): r['procent_proprietate']
+            for r in self.tabele.get("imobile_proprietari", [])
+        }
+        useri = set(p_user_ids) if p_user_ids is not None else None
+
+        randuri = [
+            (cp['user_id'], contracte[cp['contract_id']])
+            for cp in self.tabele.get("contracte_proprietari", [])
+            if (useri is None or cp['user_id'] in useri) and cp['contract_id'] in contracte
+        ]
+        if not randuri:
+            return []
+
+        luni = motor_fiscal.luni_active_vector(
+            [c['data_inceput'] for _, c in randuri],
+            [c.get('data_sfarsit') for _, c in randuri],
+            p_an_fiscal
+        )
+
+        totaluri: Dict[tuple, List[float]] = {}
+        for (user_id, c), n in zip(randuri, luni):
+            if n == 0:
+                continue
+            procent = procente.get((c['imobil_id'], user_id), 100)
+            t = totaluri.setdefault((user_id, c['moneda']), [0.0, 0])
+            t[0] += c['chirie_lunara'] * int(n) * procent / 100
+            t[1] += 1
+
+        return [
+            {"user_id": u, "an_fiscal": p_an_fiscal, "moneda": m, "venit_brut": v, "nr_contracte": n}
+            for (u, m), (v, n) in totaluri.items()
+        ]
+
+
+    def _rpc_procente_imobile(self, p_imobil_ids: Optional[List[str]] = None) -> List[Dict]:
+        imobile = set(p_imobil_ids) if p_imobil_ids is not None else None
+        totaluri: Dict[str, List[float]] = {}
+        for r in self.tabele.get("imobile_proprietari", []):
+            if imobile is None or r['imobil_id'] in imobile:
+                t = totaluri.setdefault(r['imobil_id'], [0.0, 0])
+                t[0] += r['procent_proprietate']
+                t[1] += 1
+
+        return [
+            {"imobil_id": i, "procent_total": p, "nr_proprietari": n}
+            for i, (p, n) in totaluri.items()
+        ]
+
+    def _rpc_imobile_cote_invalide(self, p_toleranta: float = 0.01) -> List[Dict]:
+        return [r for r in self._rpc_procente_imobile() if abs(r['procent_total'] - 100) > p_toleranta]
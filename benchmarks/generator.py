@@ -0,0 +1,144 @@
+"""
+Generator de portofolii sintetice pentru benchmark-uri
+Useri, imobile, co-proprietăți și contracte cu perioade și monede realiste,
+reproductibile pentru același seed
+"""
+
+import datetime
+import random
+import uuid
+from typing import Dict, List
+
+from benchmarks.fake_supabase import FakeSupabase
+
+GREUTATI_CNP = [2, 7, 9, 1, 4, 6, 3, 5, 8, 2, 7, 9]
+
+# (monedă, pondere, chirie minimă, chirie maximă)
+MONEDE = [("RON", 0.70, 1200, 6000), ("EUR", 0.25, 300, 1500), ("USD", 0.05, 400, 1600)]
+
+# (număr de proprietari, pondere, procente)
+IMPARTIRI = [
+    (1, 0.70, [100]),
+    (2, 0.20, [50, 50]),
+    (2, 0.05, [60, 40]),
+    (3, 0.05, [50, 25, 25]),
+]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def genereaza_cnp(rng: random.Random) -> str:
+    """CNP valid (cifră de control corectă) pentru date de test"""
+    baza = (
+        str(rng.choice("1256"))
+        + f"{rng.randint(50, 99):02d}"
+        + f"{rng.randint(1, 12):02d}"
+        + f"{rng.randint(1, 28):02d}"
+        + f"{rng.randint(1, 46):02d}"
+        + f"{rng.randint(1, 999):03d}"
+    )
+    control = sum(int(c) * g for c, g in zip(baza, GREUTATI_CNP)) % 11
+    return baza + str(1 if control == 10 else control)
+
+
+def _alege(rng: random.Random, optiuni: List[tuple]):
+    return rng.choices(optiuni, weights=[o[1] for o in optiuni])[0]
+
+
+def genereaza_portofoliu(
+    n_useri: int,
+    seed: int = 2026,
+    imobile_per_user: int = 3,
+    contracte_per_imobil: int = 2
+) -> Dict[str, List[Dict]]:
+    """
+    Generează tabelele users, imobile, imobile_proprietari, contracte,
+    contracte_proprietari
+
+    Args:
+        n_useri: Numărul de utilizatori
+        seed: Seed-ul generatorului (aceleași date pentru același seed)
+        imobile_per_user: Media imobilelor deținute ca proprietar principal
+        contracte_per_imobil: Media contractelor (succesive) per imobil
+    """
+    rng = random.Random(seed)
+    tabele = {t: [] for t in ("users", "imobile", "imobile_proprietari", "contracte", "contracte_proprietari")}
+
+    user_ids = []
+    for i in range(n_useri):
+        user_id = _uuid(rng)
+        user_ids.append(user_id)
+        tabele["users"].append({
+            "id": user_id,
+            "email": f"user{i}@proprieto.test",
+            "nume": f"Utilizator {i}",
+            "role": "user",
+            "active": True,
+            "cnp": genereaza_cnp(rng),
+            "created_at": (datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i)).isoformat(),
+        })
+
+    for principal in user_ids:
+        for _ in range(max(1, int(rng.expovariate(1 / imobile_per_user)))):
+            imobil_id = _uuid(rng)
+            tabele["imobile"].append({
+                "id": imobil_id,
+                "nume": f"Imobil {len(tabele['imobile'])}",
+                "adresa": f"Str. Test nr. {rng.randint(1, 200)}",
+                "procent_proprietate": 100,
+                "user_id": principal,
+            })
+
+            n_proprietari, _, procente = _alege(rng, IMPARTIRI)
+            proprietari = [principal] + rng.sample([u for u in user_ids if u != principal], min(n_proprietari - 1, len(user_ids) - 1))
+            for user_id, procent in zip(proprietari, procente):
+                tabele["imobile_proprietari"].append({
+                    "id": _uuid(rng),
+                    "imobil_id": imobil_id,
+                    "user_id": user_id,
+                    "procent_proprietate": procent,
+                })
+
+            # Contracte succesive, ultimul eventual pe durată nedeterminată
+            start = datetime.date(2022, 1, 1) + datetime.timedelta(days=rng.randint(0, 1400))
+            for k in range(max(1, int(rng.expovariate(1 / contracte_per_imobil)))):
+                moneda, _, minim, maxim = _alege(rng, MONEDE)
+                durata = rng.randint(180, 1100)
+                nedeterminat = rng.random() < 0.3
+                sfarsit = None if nedeterminat else start + datetime.timedelta(days=durata)
+
+                contract_id = _uuid(rng)
+                tabele["contracte"].append({
+                    "id": contract_id,
+                    "imobil_id": imobil_id,
+                    "nr_contract": f"C-{len(tabele['contracte'])}",
+                    "locatar": f"Locatar {len(tabele['contracte'])}",
+                    "cnp_cui": genereaza_cnp(rng),
+                    "chirie_lunara": float(rng.randrange(minim, maxim, 50)),
+                    "moneda": moneda,
+                    "frecventa_plata": rng.choice(["lunar", "lunar", "lunar", "trimestrial", "semestrial", "anual"]),
+                    "data_inceput": start.isoformat(),
+                    "data_sfarsit": sfarsit.isoformat() if sfarsit else None,
+                    "user_id": principal,
+                })
+                for user_id in proprietari:
+                    tabele["contracte_proprietari"].append({
+                        "id": _uuid(rng),
+                        "contract_id": contract_id,
+                        "user_id": user_id,
+                    })
+
+                if sfarsit is None:
+                    break
+                start = sfarsit + datetime.timedelta(days=rng.randint(1, 60))
+
+    return tabele
+
+
+def client_fake(n_useri: int, seed: int = 2026, latenta: float = 0.0, **optiuni) -> FakeSupabase:
+    """FakeSupabase populat cu un portofoliu sintetic"""
+    client = FakeSupabase(latenta=latenta)
+    client.tabele = genereaza_portofoliu(n_useri, seed, **optiuni)
+    return client
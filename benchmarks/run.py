@@ -0,0 +1,499 @@
+"""
+Benchmark-uri offline pentru căile critice din Proprieto
+Rulează fără Supabase (FakeSupabase) și raportează timpi și număr de cereri
+
+Utilizare (din rădăcina repository-ului):
+    python -m benchmarks.run --useri 2000 --latenta 0.02
+"""
+
+import argparse
+import datetime
+import io
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+import acces_async
+import admin_panel
+import backup
+import coproprietate
+import import_contracte
+import motor_fiscal
+import pdf_d212
+import plati
+import validari
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.generator import client_fake, genereaza_cnp
+
+RADACINA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Funcțiile memorate cu st.cache_* apelate în afara unei sesiuni ("bare
+# mode") avertizează la fiecare apel; în benchmark-uri e comportamentul dorit.
+# Filtru, nu nivel: Streamlit resetează nivelul loggerelor la încărcarea config-ului
+for _nume, _mesaj in (
+    ("streamlit.runtime.scriptrunner_utils.script_run_context", "missing ScriptRunContext"),
+    ("streamlit.runtime.state.session_state_proxy", "Session state does not function"),
+):
+    logging.getLogger(_nume).addFilter(lambda inregistrare, mesaj=_mesaj: mesaj not in inregistrare.getMessage())
+
+# Bugetele de latență pentru pornire și rerun (ms)
+BUGET_PORNIRE_MS = 1000
+BUGET_RERUN_MS = 50
+
+# Modulele importate de app.py la fiecare pornire
+MODULE_APP = ("streamlit", "performanta", "auth", "coproprietate", "validari",
+              "motor_fiscal", "conexiune", "acces_async", "lucrari", "pdf_d212", "diagnostic")
+
+# Dependențe folosite doar la export / import: nu trebuie încărcate la pornire
+MODULE_GRELE = ("pandas", "fpdf", "openpyxl")
+
+
+def masoara(
+    nume: str,
+    functie: Callable[[], object],
+    n: int,
+    client: Optional[FakeSupabase] = None,
+    repetari: int = 3
+) -> Dict:
+    """Cel mai bun timp din `repetari` rulări și numărul de cereri al ultimei rulări"""
+    cel_mai_bun = float("inf")
+    cereri = None
+    for _ in range(repetari):
+        if client is not None:
+            client.reseteaza_contor()
+        inceput = time.perf_counter()
+        functie()
+        cel_mai_bun = min(cel_mai_bun, time.perf_counter() - inceput)
+        if client is not None:
+            cereri = client.nr_cereri
+    return {"benchmark": nume, "n": n, "ms": cel_mai_bun * 1000, "cereri": cereri}
+
+
+# ==================== FISCAL ====================
+
+def _luni_active_relativedelta(data_start, data_end, an_fiscal):
+    """Implementarea inițială din app.py, păstrată ca referință"""
+    start_fiscal = datetime.date(an_fiscal, 1, 1)
+    end_fiscal = datetime.date(an_fiscal, 12, 31)
+    start = max(data_start, start_fiscal)
+    end = min(data_end if data_end else end_fiscal, end_fiscal)
+    if start > end:
+        return 0
+    delta = relativedelta(end, start)
+    luni = delta.years * 12 + delta.months + (1 if delta.days > 0 else 0)
+    return min(luni, 12)
+
+
+def _randuri_fiscale(client: FakeSupabase) -> List[Dict]:
+    """Câte un rând per (contract, co-proprietar), cu procentul de proprietate"""
+    contracte = client.index("contracte")
+    procente = {
+        (r['imobil_id'], r['user_id']): r['procent_proprietate']
+        for r in client.tabele["imobile_proprietari"]
+    }
+    randuri = []
+    for cp in client.tabele["contracte_proprietari"]:
+        c = contracte[cp['contract_id']]
+        randuri.append({
+            **c,
+            "user_id": cp['user_id'],
+            "procent_proprietate": procente.get((c['imobil_id'], cp['user_id']), 100),
+        })
+    return randuri
+
+
+def benchmark_fiscal(client: FakeSupabase, an_fiscal: int) -> List[Dict]:
+    randuri = _randuri_fiscale(client)
+    curs = {"EUR": motor_fiscal.CURS_BNR_DEFAULT}
+
+    def per_contract(luni_active):
+        venituri = {}
+        for r in randuri:
+            luni = luni_active(
+                datetime.date.fromisoformat(r['data_inceput']),
+                datetime.date.fromisoformat(r['data_sfarsit']) if r['data_sfarsit'] else None,
+                an_fiscal
+            )
+            venit = r['chirie_lunara'] * luni * curs.get(r['moneda'], 1.0) * r['procent_proprietate'] / 100
+            venituri[r['user_id']] = venituri.get(r['user_id'], 0) + venit
+        return {u: motor_fiscal.calculeaza_taxe(v) for u, v in venituri.items()}
+
+    def vectorizat():
+        coloane = motor_fiscal.coloane_contracte(randuri)
+        coloane.pop("user_ids")
+        return motor_fiscal.calculeaza_portofoliu(**coloane, ani=[an_fiscal], curs=curs)
+
+    n = len(randuri)
+    return [
+        masoara("fiscal: per contract (relativedelta, inițial)", lambda: per_contract(_luni_active_relativedelta), n, repetari=1),
+        masoara("fiscal: per contract (motor_fiscal.luni_active)", lambda: per_contract(motor_fiscal.luni_active), n, repetari=1),
+        masoara("fiscal: portofoliu vectorizat", vectorizat, n),
+        masoara("fiscal: venituri_anuale (rollup) + praguri", lambda: [
+            motor_fiscal.calculeaza_taxe(v) for v in motor_fiscal.brut_ron_din_totaluri(
+                coproprietate.get_venituri_anuale(client, an_fiscal), curs
+            ).values()
+        ], n, client=client),
+    ] + benchmark_simulator(len(client.tabele["users"]))
+
+
+def benchmark_simulator(n_useri: int, n_scenarii: int = 10) -> List[Dict]:
+    """Simulatorul fiscal: n_scenarii seturi de parametri × toți userii"""
+    venituri = np.random.default_rng(2026).uniform(0, 400_000, n_useri)
+    scenarii = [{"salariu_minim": 4050 + 50 * k} for k in range(n_scenarii)]
+
+    def per_user():
+        return [[motor_fiscal.calculeaza_taxe(v, parametri=s) for v in venituri] for s in scenarii]
+
+    n = n_useri * n_scenarii
+    return [
+        masoara("fiscal: simulator (per user, calculeaza_taxe)", per_user, n, repetari=1),
+        masoara("fiscal: simulator (vectorizat)", lambda: motor_fiscal.simuleaza_scenarii(venituri, scenarii), n),
+    ]
+
+
+# ==================== PLĂȚI ====================
+
+def benchmark_plati(client: FakeSupabase) -> List[Dict]:
+    """Încasările așteptate într-o lună: fereastră directă vs tot scadențarul filtrat"""
+    contracte = client.tabele["contracte"]
+    de_la, pana_la = datetime.date(2026, 3, 1), datetime.date(2026, 3, 31)
+    inceput = min(datetime.date.fromisoformat(c['data_inceput']) for c in contracte)
+
+    def scadentar_complet():
+        toate = list(plati.plati_asteptate(contracte, inceput, pana_la, ordonat=False))
+        return plati.totaluri_lunare(p for p in toate if p["data"] >= de_la)
+
+    return [
+        masoara("plăți: lună (scadențar complet)", scadentar_complet, len(contracte), repetari=1),
+        masoara("plăți: lună (fereastră, generator)", lambda: plati.totaluri_lunare(
+            plati.plati_asteptate(contracte, de_la, pana_la, ordonat=False)
+        ), len(contracte)),
+        masoara("plăți: 12 luni ordonate (fereastră)", lambda: sum(
+            1 for _ in plati.plati_asteptate(contracte, de_la, datetime.date(2027, 2, 28))
+        ), len(contracte)),
+    ]
+
+
+# ==================== CO-PROPRIETATE ====================
+
+def benchmark_coproprietate(client: FakeSupabase, contracte_imobil: int) -> List[Dict]:
+    useri = [u['id'] for u in client.tabele["users"]]
+    rezultate = []
+
+    # Imobil cu multe contracte (bloc cu multe chirii)
+    _, _, imobil_id = coproprietate.creaza_imobil_cu_proprietari(
+        client, "Bloc Benchmark", None, [{"user_id": useri[0], "procent": 100}]
+    )
+    for k in range(contracte_imobil):
+        contract = client.scrie("contracte", [{
+            "imobil_id": imobil_id,
+            "locatar": f"Locatar bloc {k}",
+            "chirie_lunara": 1500.0,
+            "moneda": "RON",
+            "data_inceput": "2026-01-01",
+            "data_sfarsit": None,
+            "user_id": useri[0],
+        }])[0]
+        client.scrie("contracte_proprietari", [{"contract_id": contract['id'], "user_id": useri[0]}])
+
+    rezultate.append(masoara(
+        "coproprietate: adaugă co-proprietar",
+        lambda: coproprietate.adauga_coproprietar_imobil(client, imobil_id, useri[1], 50),
+        contracte_imobil, client=client, repetari=1
+    ))
+    rezultate.append(masoara(
+        "coproprietate: șterge co-proprietar",
+        lambda: coproprietate.sterge_coproprietar_imobil(client, imobil_id, useri[1]),
+        contracte_imobil, client=client, repetari=1
+    ))
+
+    def citire_rece():
+        coproprietate.invalideaza_cache_user(useri[0])
+        coproprietate.get_imobile_user(client, useri[0])
+        coproprietate.get_contracte_user(client, useri[0])
+
+    def citire_calda():
+        coproprietate.get_imobile_user(client, useri[0])
+        coproprietate.get_contracte_user(client, useri[0])
+
+    rezultate.append(masoara("coproprietate: portofoliu user (rece)", citire_rece, 1, client=client))
+    rezultate.append(masoara("coproprietate: portofoliu user (cache)", citire_calda, 1, client=client))
+
+    # Butoane de editare pe o listare: o verificare per rând, din index-ul ACL
+    contract_ids = [c['id'] for c in client.tabele["contracte"] if c['imobil_id'] == imobil_id]
+
+    def permisiuni_rece():
+        coproprietate.invalideaza_cache_user(useri[0])
+        return [coproprietate.user_poate_edita_contract(client, useri[0], cid) for cid in contract_ids]
+
+    rezultate.append(masoara("coproprietate: permisiuni listare (rece)", permisiuni_rece, len(contract_ids), client=client))
+    rezultate.append(masoara(
+        "coproprietate: permisiuni listare (filter_editable)",
+        lambda: coproprietate.filter_editable(client, useri[0], contract_ids, "contracte"),
+        len(contract_ids), client=client
+    ))
+
+    # Validarea cotelor pentru tot portofoliul
+    imobil_ids = [i['id'] for i in client.tabele["imobile"]]
+    rezultate.append(masoara(
+        "coproprietate: cote imobile (per imobil)",
+        lambda: [coproprietate.get_coproprietari_imobil(client, i) for i in imobil_ids],
+        len(imobil_ids), client=client, repetari=1
+    ))
+    rezultate.append(masoara(
+        "coproprietate: cote imobile (RPC agregat)",
+        lambda: coproprietate.get_imobile_cote_invalide(client, imobil_ids),
+        len(imobil_ids), client=client
+    ))
+    rezultate.append(masoara(
+        "coproprietate: cote imobile (admin, doar invalide)",
+        lambda: coproprietate.get_imobile_cote_invalide(client),
+        len(imobil_ids), client=client
+    ))
+    return rezultate
+
+
+# ==================== ADMIN ====================
+
+def _prezentare_initiala(client: FakeSupabase):
+    """Implementarea inițială din admin_panel.show_data_overview (select * + iterrows), păstrată ca referință"""
+    import pandas as pd
+
+    imobile = client.table("imobile").select("*, users(nume, email)").execute().data
+    contracte = client.table("contracte").select("*, imobile(nume), users(nume, email)").execute().data
+    tabele = []
+    for df, linie in (
+        (pd.DataFrame(imobile), lambda row: {
+            'Proprietar': row['users']['nume'] if row.get('users') else 'N/A',
+            'Email': row['users']['email'] if row.get('users') else 'N/A',
+            'Imobil': row['nume'],
+            'Adresă': row.get('adresa', '-'),
+            'Cotă': f"{row['procent_proprietate']}%"
+        }),
+        (pd.DataFrame(contracte), lambda row: {
+            'Proprietar': row['users']['nume'] if row.get('users') else 'N/A',
+            'Imobil': row['imobile']['nume'] if row.get('imobile') else 'N/A',
+            'Locatar': row['locatar'],
+            'Chirie': f"{row['chirie_lunara']:,.0f} {row['moneda']}",
+            'De la': row['data_inceput'],
+            'Până la': row.get('data_sfarsit', 'Nedeterminat')
+        }),
+    ):
+        tabele.append(pd.DataFrame([linie(row) for _, row in df.iterrows()]))
+    return len(imobile), len(contracte), tabele
+
+
+def _prezentare_paginata(client: FakeSupabase):
+    total = {t: backup.numara_randuri(client, t) for t in admin_panel.TABELE_OVERVIEW}
+    tabele = [admin_panel.tabel_afisare(t, admin_panel.get_pagina_date(client, t, 1)) for t in total]
+    return total, tabele
+
+
+def benchmark_admin(client: FakeSupabase) -> List[Dict]:
+    n = len(client.tabele["imobile"]) + len(client.tabele["contracte"])
+    return [
+        masoara("admin: prezentare date (select * + iterrows)", lambda: _prezentare_initiala(client), n, client=client),
+        masoara("admin: prezentare date (count + pagină)", lambda: _prezentare_paginata(client), n, client=client),
+    ]
+
+
+def benchmark_acces_async(client: FakeSupabase) -> List[Dict]:
+    """Cererile independente ale prezentării admin: una după alta vs concurent (aduna)"""
+    cereri = [admin_panel.cerere_numarare(t) for t in ("imobile", "contracte", "users", "imobile_proprietari")]
+    imobil_ids = [i['id'] for i in client.tabele["imobile"]]
+    return [
+        masoara("async: 4 numărători (secvențial)", lambda: [c(client).execute() for c in cereri],
+                len(cereri), client=client),
+        masoara("async: 4 numărători (aduna)", lambda: acces_async.aduna(client, *cereri),
+                len(cereri), client=client),
+        masoara("async: cote pe loturi (aduna)", lambda: coproprietate._procente_din_tabel(client, imobil_ids),
+                len(imobil_ids), client=client),
+    ]
+
+
+# ==================== VALIDĂRI ====================
+
+def benchmark_validari(n: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    cnp_uri = [genereaza_cnp(rng) for _ in range(n)]
+    telefoane = [f"07{rng.randint(20, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}" for _ in range(n)]
+    emailuri = [f"locatar{i}@exemplu.ro" for i in range(n)]
+    cui_uri = [rng.choice(["RO", "RO ", ""]) + str(rng.randint(10**5, 10**9)) for _ in range(n)]
+
+    return [
+        masoara("validări: CNP", lambda: [validari.valideaza_cnp(c) for c in cnp_uri], n),
+        masoara("validări: telefon", lambda: [validari.valideaza_telefon(t) for t in telefoane], n),
+        masoara("validări: email", lambda: [validari.valideaza_email(e) for e in emailuri], n),
+        masoara("validări: CUI", lambda: [validari.valideaza_cui(c) for c in cui_uri], n),
+        masoara("validări: CNP (bulk)", lambda: validari.valideaza_cnp_bulk(cnp_uri), n),
+        masoara("validări: telefon (bulk)", lambda: validari.valideaza_telefon_bulk(telefoane), n),
+        masoara("validări: email (bulk)", lambda: validari.valideaza_email_bulk(emailuri), n),
+        masoara("validări: CUI (bulk)", lambda: validari.valideaza_cui_bulk(cui_uri), n),
+    ]
+
+
+# ==================== IMPORT ====================
+
+def benchmark_import(client: FakeSupabase, n: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    user_id = client.tabele["users"][0]['id']
+    imobile = [i['nume'] for i in client.tabele["imobile"] if i['user_id'] == user_id]
+
+    linii = ["imobil;nr_contract;locatar;cnp_cui;chirie_lunara;moneda;frecventa_plata;data_inceput;data_sfarsit"]
+    for k in range(n):
+        linii.append(
+            f"{rng.choice(imobile)};IMP-{k};Locatar import {k};{genereaza_cnp(rng)};"
+            f"{rng.randrange(1200, 6000, 50)},00;lei;Lunară;01.0{rng.randint(1, 9)}.2026;"
+        )
+    continut = "\n".join(linii).encode("utf-8")
+
+    return [masoara(
+        "import: contracte CSV",
+        lambda: import_contracte.importa_contracte(client, io.BytesIO(continut), "import.csv", user_id),
+        n, client=client, repetari=1
+    )]
+
+
+# ==================== PDF ====================
+
+def benchmark_pdf(n: int) -> List[Dict]:
+    fiscuri = [motor_fiscal.calculeaza_taxe(1000.0 * (i + 1)) for i in range(n)]
+
+    def cu_cache():
+        for fisc in fiscuri:
+            pdf_d212.genereaza_pdf_d212_cached(fisc, 2026)
+
+    cu_cache()  # încălzire
+    return [
+        masoara("pdf: D212 fără cache", lambda: [pdf_d212.genereaza_pdf_d212(f, 2026) for f in fiscuri], n, repetari=1),
+        masoara("pdf: D212 din cache", cu_cache, n),
+    ]
+
+
+# ==================== PORNIRE / RERUN ====================
+
+_SCRIPT_PORNIRE = """
+import sys, time
+inceput = time.perf_counter()
+for modul in {module!r}:
+    __import__(modul)
+print((time.perf_counter() - inceput) * 1000)
+print(",".join(m for m in {grele!r} if m in sys.modules))
+"""
+
+
+def benchmark_pornire(repetari: int = 3) -> List[Dict]:
+    """
+    Pornire rece: importurile din app.py într-un interpretor nou (cel mai
+    bun timp din `repetari`); dependențele de export nu trebuie încărcate
+    """
+    script = _SCRIPT_PORNIRE.format(module=MODULE_APP, grele=MODULE_GRELE)
+    cel_mai_bun, incarcate = float("inf"), ""
+    for _ in range(repetari):
+        iesire = subprocess.run(
+            [sys.executable, "-c", script], cwd=RADACINA,
+            capture_output=True, text=True, check=True
+        ).stdout.split("\n")
+        cel_mai_bun = min(cel_mai_bun, float(iesire[0]))
+        incarcate = iesire[1]
+
+    if incarcate:
+        print(f"⚠️ Module de export încărcate la pornire: {incarcate}")
+    return [{
+        "benchmark": "pornire: importuri app.py (rece)", "n": 1, "ms": cel_mai_bun,
+        "cereri": None, "buget_ms": BUGET_PORNIRE_MS, "depasit": bool(incarcate),
+    }]
+
+
+def benchmark_rerun(n: int) -> List[Dict]:
+    """
+    Rerun-uri ale app.py prin AppTest, cu secrets spre un port local închis
+    (independent de secrets.toml al mașinii): conexiunea e refuzată, scriptul
+    se oprește la verificarea ei, deci se măsoară partea comună tuturor
+    paginilor (importuri, configurare, stil, sesiune, conexiune memorată)
+    """
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(RADACINA, "app.py"), default_timeout=60)
+    app.secrets["SUPABASE_URL"] = "http://127.0.0.1:9"
+    app.secrets["SUPABASE_KEY"] = "benchmark"
+    rezultate = [masoara("rerun: app.py primul run", app.run, 1, repetari=1)]
+
+    timpi = []
+    for _ in range(n):
+        inceput = time.perf_counter()
+        app.run()
+        timpi.append((time.perf_counter() - inceput) * 1000)
+    timpi.sort()
+    rezultate.append({
+        "benchmark": "rerun: app.py cald (median)", "n": n, "ms": timpi[len(timpi) // 2],
+        "cereri": None, "buget_ms": BUGET_RERUN_MS,
+    })
+    return rezultate
+
+
+def afiseaza(rezultate: List[Dict]) -> int:
+    """Tabelul de rezultate; întoarce numărul de bugete depășite"""
+    latime = max(len(r["benchmark"]) for r in rezultate)
+    print(f"{'benchmark':<{latime}}  {'n':>8}  {'timp (ms)':>11}  {'cereri':>7}  {'buget':>12}")
+    print("-" * (latime + 46))
+    depasite = 0
+    for r in rezultate:
+        cereri = "-" if r["cereri"] is None else str(r["cereri"])
+        buget = ""
+        if r.get("buget_ms") is not None:
+            depasit = r.get("depasit", False) or r["ms"] > r["buget_ms"]
+            depasite += depasit
+            buget = f"{'✗' if depasit else '✓'} {r['buget_ms']:,} ms"
+        print(f"{r['benchmark']:<{latime}}  {r['n']:>8,}  {r['ms']:>11.2f}  {cereri:>7}  {buget:>12}")
+    return depasite
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark-uri offline Proprieto")
+    parser.add_argument("--useri", type=int, default=1000, help="numărul de utilizatori generați")
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--an", type=int, default=2026, help="anul fiscal calculat")
+    parser.add_argument("--latenta", type=float, default=0.0, help="secunde simulate per cerere")
+    parser.add_argument("--contracte-imobil", type=int, default=200, help="contracte în imobilul de test")
+    parser.add_argument("--validari", type=int, default=100_000, help="rânduri validate")
+    parser.add_argument("--import-randuri", type=int, default=5000, help="rânduri CSV importate")
+    parser.add_argument("--pdf", type=int, default=50, help="ghiduri D212 generate")
+    parser.add_argument("--reruns", type=int, default=20, help="rerun-uri app.py măsurate")
+    parser.add_argument("--strict", action="store_true", help="cod de ieșire 1 dacă un buget e depășit")
+    args = parser.parse_args(argv)
+
+    client = client_fake(args.useri, args.seed, latenta=args.latenta)
+    print(
+        f"Portofoliu: {len(client.tabele['users']):,} useri, {len(client.tabele['imobile']):,} imobile, "
+        f"{len(client.tabele['contracte']):,} contracte (latență {args.latenta * 1000:.0f} ms/cerere)\n"
+    )
+
+    rezultate = []
+    rezultate += benchmark_pornire()
+    rezultate += benchmark_rerun(args.reruns)
+    rezultate += benchmark_fiscal(client, args.an)
+    rezultate += benchmark_coproprietate(client, args.contracte_imobil)
+    rezultate += benchmark_admin(client)
+    rezultate += benchmark_acces_async(client)
+    rezultate += benchmark_plati(client)
+    rezultate += benchmark_validari(args.validari, args.seed)
+    rezultate += benchmark_import(client, args.import_randuri, args.seed)
+    rezultate += benchmark_pdf(args.pdf)
+    depasite = afiseaza(rezultate)
+
+    if depasite:
+        print(f"\n⚠️ {depasite} benchmark-uri peste buget")
+        if args.strict:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
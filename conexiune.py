@@ -0,0 +1,95 @@
+"""
+Modul pentru conexiunea la Supabase în Proprieto
+Un singur client per proces (partajat între sesiuni), cu verificare
+periodică a stării în fundal și reconectare automată
+"""
+
+import threading
+import time
+from typing import Optional
+
+import streamlit as st
+from supabase import Client, create_client
+
+# Intervalul (secunde) dintre verificările de stare făcute în fundal
+INTERVAL_VERIFICARE = 60
+
+# Cât timp (secunde) un rerun folosește o verificare eșuată în loc să
+# reîncerce inline (fiecare reîncercare = client nou + o cerere)
+INTERVAL_REINCERCARE = 5
+
+
+class ConexiuneSupabase:
+    """
+    Clientul Supabase partajat și starea lui de sănătate
+
+    Verificarea se face o dată la creare, apoi periodic dintr-un thread
+    daemon; rerun-urile Streamlit citesc doar starea memorată.
+    """
+
+    def __init__(self, url: str, key: str, interval: float = INTERVAL_VERIFICARE):
+        self._url = url
+        self._key = key
+        self._interval = interval
+        self._lock = threading.Lock()
+
+        self.client: Optional[Client] = None
+        self.sanatos = False
+        self.eroare: Optional[str] = None
+        self.ultima_verificare: Optional[float] = None
+
+        self.verifica()
+
+        self._thread = threading.Thread(
+            target=self._bucla_verificare,
+            name="supabase-health",
+            daemon=True
+        )
+        self._thread.start()
+
+    def verifica(self) -> bool:
+        """
+        Testează conexiunea; dacă ultima verificare a eșuat, creează un
+        client nou și îl folosește doar dacă răspunde
+        """
+        with self._lock:
+            try:
+                client = self.client
+                if client is None or not self.sanatos:
+                    client = create_client(self._url, self._key)
+
+                # Test conexiune
+                client.table("imobile").select("id").limit(1).execute()
+
+                self.client = client
+                self.sanatos = True
+                self.eroare = None
+            except Exception as e:
+                self.sanatos = False
+                self.eroare = str(e)
+            finally:
+                self.ultima_verificare = time.time()
+
+            return self.sanatos
+
+    def stare(self, interval_reincercare: float = INTERVAL_REINCERCARE) -> bool:
+        """
+        Starea pentru un rerun: cea memorată, iar după o verificare eșuată o
+        reîncercare inline cel mult o dată la `interval_reincercare` secunde
+        """
+        if self.sanatos:
+            return True
+        if self.ultima_verificare is not None and time.time() - self.ultima_verificare < interval_reincercare:
+            return False
+        return self.verifica()
+
+    def _bucla_verificare(self):
+        while True:
+            time.sleep(self._interval)
+            self.verifica()
+
+
+@st.cache_resource(show_spinner=False)
+def get_conexiune(url: str, key: str) -> ConexiuneSupabase:
+    """Returnează conexiunea partajată pentru (url, key), creată o singură dată per proces"""
+    return ConexiuneSupabase(url, key)
@@ -3,15 +3,89 @@ Modul pentru gestionarea co-proprietății în Proprieto
 Permite mai multor utilizatori să dețină același imobil/contract
 """
 
+import datetime
+import threading
+import time
 import streamlit as st
 from supabase import Client
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+
+import acces_async
+
+# --- CACHE PER USER (partajat între sesiuni în același proces) ---
+CACHE_TTL = 300  # secunde
+
+_cache: Dict[tuple, Tuple[float, List[Dict]]] = {}
+_versiuni: Dict[str, int] = {}
+_cache_lock = threading.Lock()
+
+# Număr maxim de id-uri într-un filtru in_ (limitează lungimea URL-ului)
+MARIME_LOT = 100
+
+# Limita implicită de rânduri per răspuns în PostgREST (Supabase)
+MARIME_PAGINA = 1000
+
+# Toleranță la suma cotelor unui imobil (erori de rotunjire)
+TOLERANTA_PROCENT = 0.01
+
+# Tabelul venituri_anuale acoperă contractele nedeterminate până la anul
+# ultimei reconstrucții + 1 (venituri_anuale_acoperire); fără acel tabel
+# (migrare veche) presupunem anul curent + 1
+AN_ROLLUP_DUPA_CURENT = 1
+
+_acoperire: Optional[Tuple[float, int]] = None  # (expiră la, an_maxim)
+
+def _cheie_cache(tip: str, user_id: str, include_shared: bool) -> tuple:
+    return (tip, user_id, include_shared, _versiuni.get(user_id, 0))
+
+def _copie(date: List[Dict]) -> List[Dict]:
+    """
+    Listă și rânduri noi pentru apelant: rândurile memorate sunt partajate
+    între sesiuni, deci nu trebuie modificate pe loc (obiectele imbricate,
+    ex: imobile(*), rămân comune)
+    """
+    return [dict(r) for r in date]
+
+def _citeste_cache(cheie: tuple) -> Optional[List[Dict]]:
+    with _cache_lock:
+        intrare = _cache.get(cheie)
+        if intrare is None:
+            return None
+        expira, date = intrare
+        if expira < time.monotonic():
+            del _cache[cheie]
+            return None
+        return date
+
+def _scrie_cache(cheie: tuple, date: List[Dict]):
+    with _cache_lock:
+        # Nu memora un rezultat citit înaintea unei invalidări concurente
+        if _versiuni.get(cheie[1], 0) == cheie[3]:
+            _cache[cheie] = (time.monotonic() + CACHE_TTL, date)
+
+def invalideaza_cache_user(*user_ids: str):
+    """
+    Invalidează imobilele/contractele memorate pentru userii dați
+    (de apelat după orice scriere care le schimbă portofoliul); index-urile
+    ACL din sesiuni (vezi incarca_acl) devin învechite la următoarea verificare
+    """
+    with _cache_lock:
+        for user_id in user_ids:
+            _versiuni[user_id] = _versiuni.get(user_id, 0) + 1
+        for cheie in [c for c in _cache if c[1] in user_ids]:
+            del _cache[cheie]
 
 def get_imobile_user(supabase: Client, user_id: str, include_shared: bool = True) -> List[Dict]:
     """
     Obține toate imobilele la care un user are acces
     (atât cele personale cât și co-proprietățile)
+    Rezultatul e memorat per user (TTL + versiune, vezi invalideaza_cache_user)
     """
+    cheie = _cheie_cache("imobile", user_id, include_shared)
+    date = _citeste_cache(cheie)
+    if date is not None:
+        return _copie(date)
+
     try:
         if include_shared:
             # Folosește tabelul de legătură pentru co-proprietăți
@@ -19,8 +93,6 @@ def get_imobile_user(supabase: Client, user_id: str, include_shared: bool = True
                 .select("*, imobile(*), users(nume, email)")\
                 .eq("user_id", user_id)\
                 .execute()
-
-            return result.data if result.data else []
         else:
             # Doar imobilele unde e proprietar unic
             result = supabase.table("imobile")\
@@ -28,7 +100,9 @@ def get_imobile_user(supabase: Client, user_id: str, include_shared: bool = True
                 .eq("user_id", user_id)\
                 .execute()
 
-            return result.data if result.data else []
+        date = result.data if result.data else []
+        _scrie_cache(cheie, date)
+        return _copie(date)
     except Exception as e:
         st.error(f"Eroare la preluarea imobilelor: {str(e)}")
         return []
@@ -36,22 +110,28 @@ def get_imobile_user(supabase: Client, user_id: str, include_shared: bool = True
 def get_contracte_user(supabase: Client, user_id: str, include_shared: bool = True) -> List[Dict]:
     """
     Obține toate contractele la care un user are acces
+    Rezultatul e memorat per user (TTL + versiune, vezi invalideaza_cache_user)
     """
+    cheie = _cheie_cache("contracte", user_id, include_shared)
+    date = _citeste_cache(cheie)
+    if date is not None:
+        return _copie(date)
+
     try:
         if include_shared:
             result = supabase.table("contracte_proprietari")\
                 .select("*, contracte(*, imobile(nume))")\
                 .eq("user_id", user_id)\
                 .execute()
-
-            return result.data if result.data else []
         else:
             result = supabase.table("contracte")\
                 .select("*, imobile(nume)")\
                 .eq("user_id", user_id)\
                 .execute()
 
-            return result.data if result.data else []
+        date = result.data if result.data else []
+        _scrie_cache(cheie, date)
+        return _copie(date)
     except Exception as e:
         st.error(f"Eroare la preluarea contractelor: {str(e)}")
         return []
@@ -71,6 +151,71 @@ def get_coproprietari_imobil(supabase: Client, imobil_id: str) -> List[Dict]:
         st.error(f"Eroare la preluarea co-proprietarilor: {str(e)}")
         return []
 
+def _loturi(valori: List[str], marime: int = MARIME_LOT):
+    for i in range(0, len(valori), marime):
+        yield valori[i:i + marime]
+
+def adauga_user_la_contracte(supabase: Client, contract_ids: List[str], user_id: str) -> Dict[str, str]:
+    """
+    Adaugă un user la mai multe contracte printr-un singur upsert
+
+    Returns:
+        {contract_id: "adăugat" | "existent" | "eroare: ..."}
+    """
+    if not contract_ids:
+        return {}
+
+    try:
+        result = supabase.table("contracte_proprietari")\
+            .upsert(
+                [{"contract_id": cid, "user_id": user_id} for cid in contract_ids],
+                on_conflict="contract_id,user_id",
+                ignore_duplicates=True
+            )\
+            .execute()
+
+        # Rândurile deja existente nu sunt returnate de upsert
+        adaugate = {r['contract_id'] for r in (result.data or [])}
+        if adaugate:
+            invalideaza_cache_user(user_id)
+        return {cid: "adăugat" if cid in adaugate else "existent" for cid in contract_ids}
+    except Exception as e:
+        return {cid: f"eroare: {str(e)}" for cid in contract_ids}
+
+def sterge_user_din_contracte(supabase: Client, contract_ids: List[str], user_id: str) -> Dict[str, str]:
+    """
+    Șterge un user de la mai multe contracte (DELETE filtrat cu in_, pe loturi)
+
+    Returns:
+        {contract_id: "șters" | "inexistent" | "eroare: ..."}
+    """
+    rezultate = {}
+    for lot in _loturi(contract_ids):
+        try:
+            result = supabase.table("contracte_proprietari")\
+                .delete()\
+                .eq("user_id", user_id)\
+                .in_("contract_id", lot)\
+                .execute()
+
+            sterse = {r['contract_id'] for r in (result.data or [])}
+            rezultate.update({cid: "șters" if cid in sterse else "inexistent" for cid in lot})
+        except Exception as e:
+            rezultate.update({cid: f"eroare: {str(e)}" for cid in lot})
+
+    if "șters" in rezultate.values():
+        invalideaza_cache_user(user_id)
+    return rezultate
+
+def _rezumat_contracte(mesaj: str, rezultate: Dict[str, str]) -> str:
+    """Adaugă la mesaj numărul de contracte actualizate și eventualele erori"""
+    erori = [r for r in rezultate.values() if r.startswith("eroare")]
+    if not rezultate:
+        return mesaj
+    if erori:
+        return f"{mesaj} Atenție: {len(erori)} din {len(rezultate)} contracte nu au fost actualizate ({erori[0]})"
+    return f"{mesaj} ({len(rezultate)} contracte actualizate)"
+
 def adauga_coproprietar_imobil(
     supabase: Client,
     imobil_id: str,
@@ -108,17 +253,12 @@ def adauga_coproprietar_imobil(
             .eq("imobil_id", imobil_id)\
             .execute()
 
-        if contracte.data:
-            for contract in contracte.data:
-                try:
-                    supabase.table("contracte_proprietari").insert({
-                        "contract_id": contract['id'],
-                        "user_id": user_id
-                    }).execute()
-                except:
-                    pass  # Poate exista deja
+        rezultate = adauga_user_la_contracte(
+            supabase, [c['id'] for c in (contracte.data or [])], user_id
+        )
 
-        return True, "Co-proprietar adăugat cu succes!"
+        invalideaza_cache_user(user_id)
+        return True, _rezumat_contracte("Co-proprietar adăugat cu succes!", rezultate)
 
     except Exception as e:
         return False, f"Eroare: {str(e)}"
@@ -150,18 +290,12 @@ def sterge_coproprietar_imobil(
             .eq("imobil_id", imobil_id)\
             .execute()
 
-        if contracte.data:
-            for contract in contracte.data:
-                try:
-                    supabase.table("contracte_proprietari")\
-                        .delete()\
-                        .eq("contract_id", contract['id'])\
-                        .eq("user_id", user_id)\
-                        .execute()
-                except:
-                    pass
+        rezultate = sterge_user_din_contracte(
+            supabase, [c['id'] for c in (contracte.data or [])], user_id
+        )
 
-        return True, "Co-proprietar șters cu succes!"
+        invalideaza_cache_user(user_id)
+        return True, _rezumat_contracte("Co-proprietar șters cu succes!", rezultate)
 
     except Exception as e:
         return False, f"Eroare: {str(e)}"
@@ -185,6 +319,7 @@ def actualizeaza_procent_coproprietar(
             .eq("user_id", user_id)\
             .execute()
 
+        invalideaza_cache_user(user_id)
         return True, "Procent actualizat cu succes!"
 
     except Exception as e:
@@ -194,48 +329,309 @@ def get_procent_total_imobil(supabase: Client, imobil_id: str) -> float:
     """
     Calculează suma procentelor pentru un imobil
     """
+    return get_procente_totale_imobile(supabase, [imobil_id]).get(imobil_id, 0)
+
+def get_procente_totale_imobile(supabase: Client, imobil_ids: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Suma procentelor de proprietate pentru mai multe imobile, agregată pe
+    server (RPC procente_imobile, vezi migration_procente_imobile.sql)
+
+    Args:
+        imobil_ids: Imobilele cerute (None = toate, doar pentru admini; citite în pagini)
+
+    Returns:
+        {imobil_id: procent total}; imobilele cerute fără proprietari au 0
+    """
     try:
-        proprietari = get_coproprietari_imobil(supabase, imobil_id)
-        return sum(p.get('procent_proprietate', 0) for p in proprietari)
-    except:
-        return 0
+        if imobil_ids is None:
+            randuri = _pagini_keyset(lambda: supabase.rpc("procente_imobile", {}), "imobil_id")
+        else:
+            randuri = supabase.rpc("procente_imobile", {"p_imobil_ids": imobil_ids}).execute().data or []
+        totaluri = {r['imobil_id']: float(r['procent_total']) for r in randuri}
+    except Exception:
+        # Fără migrare: doar cele două coloane necesare, însumate local
+        try:
+            totaluri = _procente_din_tabel(supabase, imobil_ids)
+        except Exception as e:
+            st.error(f"Eroare la calculul cotelor de proprietate: {str(e)}")
+            return {}
+
+    if imobil_ids is not None:
+        totaluri = {imobil_id: totaluri.get(imobil_id, 0.0) for imobil_id in imobil_ids}
+    return totaluri
+
+def _procente_din_tabel(supabase: Client, imobil_ids: Optional[List[str]]) -> Dict[str, float]:
+    def cerere(client, lot):
+        return client.table("imobile_proprietari")\
+            .select("id, imobil_id, procent_proprietate")\
+            .in_("imobil_id", lot)
+
+    if imobil_ids is None:
+        randuri = _pagini_keyset(lambda: supabase.table("imobile_proprietari")\
+            .select("id, imobil_id, procent_proprietate"), "id")
+    else:
+        raspunsuri = acces_async.aduna(supabase, *(
+            lambda c, lot=lot: cerere(c, lot) for lot in _loturi(list(imobil_ids))
+        ))
+        randuri = [r for result in raspunsuri for r in (result.data or [])]
+
+    totaluri: Dict[str, float] = {}
+    for r in randuri:
+        totaluri[r['imobil_id']] = totaluri.get(r['imobil_id'], 0.0) + float(r['procent_proprietate'])
+    return totaluri
+
+def imobile_cu_cote_invalide(totaluri: Dict[str, float], toleranta: float = TOLERANTA_PROCENT) -> Dict[str, float]:
+    """Imobilele ale căror cote nu însumează 100% ({imobil_id: procent total})"""
+    return {
+        imobil_id: total
+        for imobil_id, total in totaluri.items()
+        if abs(total - 100) > toleranta
+    }
+
+def get_imobile_cote_invalide(
+    supabase: Client,
+    imobil_ids: Optional[List[str]] = None,
+    toleranta: float = TOLERANTA_PROCENT
+) -> Dict[str, float]:
+    """
+    Imobilele ale căror cote nu însumează 100%
 
-def user_poate_edita_imobil(supabase: Client, user_id: str, imobil_id: str, is_admin: bool = False) -> bool:
+    Pentru toate imobilele (admin) filtrarea se face pe server (RPC
+    imobile_cote_invalide), deci se transferă doar imobilele cu probleme.
+
+    Args:
+        imobil_ids: Imobilele verificate (None = toate, doar pentru admini)
+
+    Returns:
+        {imobil_id: procent total}
     """
-    Verifică dacă un user poate edita un imobil
-    Admini pot edita orice, userii doar imobilele lor (inclusiv co-proprietăți)
+    if imobil_ids is None:
+        try:
+            randuri = _pagini_keyset(
+                lambda: supabase.rpc("imobile_cote_invalide", {"p_toleranta": toleranta}),
+                "imobil_id"
+            )
+            return {r['imobil_id']: float(r['procent_total']) for r in randuri}
+        except Exception:
+            pass  # Migrare mai veche: totalurile tuturor imobilelor, filtrate local
+
+    return imobile_cu_cote_invalide(get_procente_totale_imobile(supabase, imobil_ids), toleranta)
+
+def get_venituri_anuale(
+    supabase: Client,
+    an_fiscal: int,
+    user_ids: Optional[List[str]] = None,
+    ridica: bool = False
+) -> List[Dict]:
     """
-    if is_admin:
-        return True
+    Obține totalurile anuale calculate pe server
+    Un rând per (user_id, an_fiscal, moneda) cu venit_brut și nr_contracte
+
+    Citește tabelul venituri_anuale, ținut la zi de triggere (vezi
+    migration_venituri_rollup.sql). Pentru anii pe care tabelul nu îi acoperă
+    sau dacă migrarea nu e aplicată, calculează prin RPC-ul venituri_anuale.
+
+    Args:
+        user_ids: Userii ceruți (None = toți, doar pentru admini)
+        ridica: True = eroarea e ridicată (lucrări în fundal), False = afișată cu st.error
+    """
+    if an_fiscal <= an_maxim_rollup(supabase):
+        try:
+            return _citeste_venituri_rollup(supabase, an_fiscal, user_ids)
+        except Exception:
+            pass
 
     try:
-        result = supabase.table("imobile_proprietari")\
-            .select("id")\
-            .eq("imobil_id", imobil_id)\
-            .eq("user_id", user_id)\
-            .execute()
+        return _pagini_pe_useri(lambda: supabase.rpc("venituri_anuale", {
+            "p_an_fiscal": an_fiscal,
+            "p_user_ids": user_ids
+        }))
+    except Exception as e:
+        if ridica:
+            raise
+        st.error(f"Eroare la calculul veniturilor: {str(e)}")
+        return []
 
-        return bool(result.data)
-    except:
-        return False
+def an_maxim_rollup(supabase: Client) -> int:
+    """
+    Ultimul an pe care venituri_anuale îl acoperă pentru toți userii
+    (memorat CACHE_TTL secunde); anii de după se calculează prin RPC
+    """
+    global _acoperire
+    acum = time.monotonic()
+    if _acoperire is not None and _acoperire[0] > acum:
+        return _acoperire[1]
 
-def user_poate_edita_contract(supabase: Client, user_id: str, contract_id: str, is_admin: bool = False) -> bool:
+    an_maxim = datetime.date.today().year + AN_ROLLUP_DUPA_CURENT
+    try:
+        result = supabase.table("venituri_anuale_acoperire").select("an_maxim").execute()
+        if result.data:
+            an_maxim = int(result.data[0]['an_maxim'])
+    except Exception:
+        pass
+
+    _acoperire = (acum + CACHE_TTL, an_maxim)
+    return an_maxim
+
+def _pagini_keyset(cerere: Callable, cheie: str, marime: int = MARIME_PAGINA, dupa=None) -> List[Dict]:
     """
-    Verifică dacă un user poate edita un contract
+    Toate rândurile unei cereri (tabel sau RPC), peste limita de rânduri per
+    răspuns a PostgREST, prin paginare keyset pe o coloană unică
+
+    Args:
+        cerere: Întoarce de fiecare dată un builder nou, neexecutat
+        cheie: Coloana unică după care se ordonează și se continuă
+        dupa: Continuă după această valoare a cheii (ex: după o primă pagină deja citită)
     """
-    if is_admin:
-        return True
+    randuri, ultima = [], dupa
+    while True:
+        query = cerere()
+        if ultima is not None:
+            query = query.gt(cheie, ultima)
+        pagina = query.order(cheie).limit(marime).execute().data or []
+        randuri.extend(pagina)
+        if len(pagina) < marime:
+            return randuri
+        ultima = pagina[-1][cheie]
+
+def _pagini_pe_useri(cerere: Callable, marime: int = MARIME_PAGINA) -> List[Dict]:
+    """
+    Toate rândurile (user_id, moneda) ale unei cereri (tabel sau RPC), peste
+    limita de rânduri per răspuns a PostgREST
+
+    Paginare keyset pe user_id: rândurile ultimului user dintr-o pagină plină
+    pot continua în pagina următoare, deci sunt recitite de acolo (user_id >=).
 
+    Args:
+        cerere: Întoarce de fiecare dată un builder nou, neexecutat
+    """
+    randuri, ultimul = [], None
+    while True:
+        query = cerere()
+        if ultimul is not None:
+            query = query.gte("user_id", ultimul)
+        pagina = query.order("user_id").order("moneda").limit(marime).execute().data or []
+        if len(pagina) < marime:
+            return randuri + pagina
+
+        ultimul = pagina[-1]['user_id']
+        complete = [r for r in pagina if r['user_id'] != ultimul]
+        if not complete:
+            raise ValueError(f"Userul {ultimul} are peste {marime} rânduri")
+        randuri.extend(complete)
+
+def _citeste_venituri_rollup(supabase: Client, an_fiscal: int, user_ids: Optional[List[str]]) -> List[Dict]:
+    """Rândurile precalculate din tabelul venituri_anuale"""
+    coloane = "user_id, an_fiscal, moneda, venit_brut, nr_contracte"
+    if user_ids is None:
+        return _pagini_pe_useri(lambda: supabase.table("venituri_anuale")\
+            .select(coloane)\
+            .eq("an_fiscal", an_fiscal))
+
+    # Loturile sunt independente: trimise concurent (MARIME_LOT useri × câteva
+    # monede rămân sub limita de rânduri per răspuns)
+    raspunsuri = acces_async.aduna(supabase, *(
+        lambda c, lot=lot: c.table("venituri_anuale")\
+            .select(coloane)\
+            .eq("an_fiscal", an_fiscal)\
+            .in_("user_id", lot)
+        for lot in _loturi(list(user_ids))
+    ))
+    return [r for result in raspunsuri for r in (result.data or [])]
+
+# ==================== PERMISIUNI (INDEX ACL PER SESIUNE) ====================
+
+# Cheia din session_state: {user_id: {"versiune", "imobile", "contracte"}}
+CHEIE_ACL = "acl_index"
+
+# tip -> (tabel de legătură, coloana cu id-ul verificat)
+_TABELE_ACL = {
+    "imobile": ("imobile_proprietari", "imobil_id"),
+    "contracte": ("contracte_proprietari", "contract_id"),
+}
+
+def incarca_acl(supabase: Client, user_id: str) -> Optional[Dict]:
+    """
+    Încarcă în sesiune id-urile imobilelor și contractelor editabile de user
+    (două cereri concurente; de apelat la login, reîncărcat automat după invalidare)
+
+    Index-ul e legat de versiunea userului din invalideaza_cache_user, deci
+    orice mutator de co-proprietate (din orice sesiune) îl face învechit.
+    Primele pagini sunt citite concurent; un user cu peste MARIME_PAGINA
+    rânduri într-un tabel e citit în continuare prin paginare keyset pe id.
+    """
+    def cerere(client, tabel, coloana):
+        return client.table(tabel)\
+            .select(f"id, {coloana}")\
+            .eq("user_id", user_id)
+
+    # Versiunea citită înaintea cererilor: o invalidare concurentă forțează reîncărcarea
+    index = {"versiune": _versiuni.get(user_id, 0)}
     try:
-        result = supabase.table("contracte_proprietari")\
-            .select("id")\
-            .eq("contract_id", contract_id)\
-            .eq("user_id", user_id)\
-            .execute()
+        raspunsuri = acces_async.aduna(supabase, *(
+            lambda c, tabel=tabel, coloana=coloana: cerere(c, tabel, coloana)\
+                .order("id")\
+                .limit(MARIME_PAGINA)
+            for tabel, coloana in _TABELE_ACL.values()
+        ))
+        for (tip, (tabel, coloana)), result in zip(_TABELE_ACL.items(), raspunsuri):
+            randuri = result.data or []
+            if len(randuri) >= MARIME_PAGINA:
+                randuri += _pagini_keyset(
+                    lambda tabel=tabel, coloana=coloana: cerere(supabase, tabel, coloana),
+                    "id", dupa=randuri[-1]['id']
+                )
+            index[tip] = frozenset(r[coloana] for r in randuri)
+    except Exception:
+        return None
+
+    st.session_state.setdefault(CHEIE_ACL, {})[user_id] = index
+    return index
+
+def _index_acl(supabase: Client, user_id: str) -> Optional[Dict]:
+    index = st.session_state.get(CHEIE_ACL, {}).get(user_id)
+    if index is None or index["versiune"] != _versiuni.get(user_id, 0):
+        index = incarca_acl(supabase, user_id)
+    return index
+
+def filter_editable(
+    supabase: Client,
+    user_id: str,
+    ids: List[str],
+    tip: str = "imobile",
+    is_admin: bool = False
+) -> List[str]:
+    """
+    Păstrează din `ids` doar imobilele / contractele pe care userul le poate
+    edita, fără cereri per rând (pentru listări cu butoane de editare)
+
+    Args:
+        tip: "imobile" sau "contracte"
+
+    Returns:
+        Id-urile editabile, în ordinea primită
+    """
+    if is_admin:
+        return list(ids)
+
+    index = _index_acl(supabase, user_id)
+    if index is None:
+        return []
+    editabile = index[tip]
+    return [i for i in ids if i in editabile]
+
+def user_poate_edita_imobil(supabase: Client, user_id: str, imobil_id: str, is_admin: bool = False) -> bool:
+    """
+    Verifică dacă un user poate edita un imobil
+    Admini pot edita orice, userii doar imobilele lor (inclusiv co-proprietăți)
+    """
+    return bool(filter_editable(supabase, user_id, [imobil_id], "imobile", is_admin))
 
-        return bool(result.data)
-    except:
-        return False
+def user_poate_edita_contract(supabase: Client, user_id: str, contract_id: str, is_admin: bool = False) -> bool:
+    """
+    Verifică dacă un user poate edita un contract
+    """
+    return bool(filter_editable(supabase, user_id, [contract_id], "contracte", is_admin))
 
 def creaza_imobil_cu_proprietari(
     supabase: Client,
@@ -255,7 +651,7 @@ def creaza_imobil_cu_proprietari(
     try:
         # Verifică că suma procentelor = 100
         suma_procente = sum(p['procent'] for p in proprietari)
-        if abs(suma_procente - 100) > 0.01:  # Toleranță pentru erori de rotunjire
+        if abs(suma_procente - 100) > TOLERANTA_PROCENT:
             return False, f"Suma procentelor trebuie să fie 100% (acum: {suma_procente}%)", None
 
         # Creează imobilul (fără user_id pentru că e co-proprietate)
@@ -271,14 +667,17 @@ def creaza_imobil_cu_proprietari(
 
         imobil_id = result.data[0]['id']
 
-        # Adaugă toți proprietarii
-        for prop in proprietari:
-            supabase.table("imobile_proprietari").insert({
+        # Adaugă toți proprietarii într-un singur insert
+        supabase.table("imobile_proprietari").insert([
+            {
                 "imobil_id": imobil_id,
                 "user_id": prop['user_id'],
                 "procent_proprietate": prop['procent']
-            }).execute()
+            }
+            for prop in proprietari
+        ]).execute()
 
+        invalideaza_cache_user(*{p['user_id'] for p in proprietari})
         return True, "Imobil creat cu succes!", imobil_id
 
     except Exception as e:
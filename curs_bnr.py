@@ -0,0 +1,225 @@
+"""
+Modul cursuri BNR pentru Proprieto
+Încarcă fișierele XML publicate de BNR (nbrfxrates*.xml) dintr-un director
+local într-un tabel compact, sortat după dată, per monedă; răspunde la
+căutări după dată (bisect) și la medii lunare / anuale precalculate
+"""
+
+import datetime
+import glob
+import os
+import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import streamlit as st
+
+# Directorul implicit cu fișierele XML (suprascris de st.secrets["CURS_BNR_DIR"])
+DIRECTOR_IMPLICIT = "cursuri_bnr"
+
+_EPOCA = datetime.date(1970, 1, 1).toordinal()
+
+Data = Union[datetime.date, str]
+
+
+def _zi(data: Data) -> int:
+    """Zile de la 1970-01-01 (aceeași unitate ca datetime64[D])"""
+    if isinstance(data, str):
+        data = datetime.date.fromisoformat(data[:10])
+    elif isinstance(data, datetime.datetime):
+        data = data.date()
+    return data.toordinal() - _EPOCA
+
+
+def _local(tag: str) -> str:
+    """Numele elementului fără namespace ('{http://www.bnr.ro/xsd}Rate' -> 'Rate')"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def citeste_xml_bnr(sursa) -> Iterable[Tuple[str, str, float]]:
+    """
+    Generează (dată ISO, monedă, curs RON) dintr-un fișier nbrfxrates
+
+    Cursurile cu `multiplier` (ex: HUF la 100 de unități) sunt împărțite
+    la multiplicator, deci toate valorile sunt RON pentru o unitate.
+    """
+    data = None
+    for eveniment, element in ET.iterparse(sursa, events=("start", "end")):
+        nume = _local(element.tag)
+        if eveniment == "start":
+            if nume == "Cube":
+                data = element.get("date")
+            continue
+
+        if nume == "Rate" and data and element.text:
+            multiplicator = float(element.get("multiplier") or 1)
+            yield data, element.get("currency"), float(element.text) / multiplicator
+        elif nume == "Cube":
+            element.clear()
+
+
+class CursuriBNR:
+    """
+    Cursurile BNR pentru fiecare monedă, ca două array-uri paralele sortate
+    (zile de la 1970-01-01, curs RON), plus mediile lunare și anuale
+
+    Pentru o dată fără curs publicat (weekend, sărbători) se folosește
+    ultimul curs publicat înainte, ca în practica BNR.
+    """
+
+    def __init__(self):
+        self._zile: Dict[str, np.ndarray] = {}
+        self._valori: Dict[str, np.ndarray] = {}
+        self._zile_lista: Dict[str, List[int]] = {}
+        self._medii_lunare: Dict[str, Dict[Tuple[int, int], float]] = {}
+        self._medii_anuale: Dict[str, Dict[int, float]] = {}
+
+    @classmethod
+    def din_director(cls, director: str) -> "CursuriBNR":
+        """Încarcă toate fișierele *.xml din director (ex: nbrfxrates2025.xml, nbrfxrates.xml)"""
+        cursuri = cls()
+        cursuri.adauga(
+            rand
+            for cale in sorted(glob.glob(os.path.join(director, "*.xml")))
+            for rand in citeste_xml_bnr(cale)
+        )
+        return cursuri
+
+    def adauga(self, randuri: Iterable[Tuple[str, str, float]]):
+        """
+        Adaugă cursuri (dată, monedă, valoare) și reconstruiește tabelele
+
+        La aceeași (dată, monedă) câștigă ultima valoare (fișierele zilnice
+        suprascriu arhivele anuale).
+        """
+        per_moneda: Dict[str, Dict[int, float]] = {
+            moneda: dict(zip(self._zile_lista[moneda], self._valori[moneda].tolist()))
+            for moneda in self._zile
+        }
+        for data, moneda, valoare in randuri:
+            per_moneda.setdefault(moneda, {})[_zi(data)] = valoare
+
+        for moneda, cursuri in per_moneda.items():
+            zile = np.array(sorted(cursuri), dtype=np.int64)
+            valori = np.array([cursuri[z] for z in zile.tolist()], dtype=np.float64)
+            self._zile[moneda] = zile
+            self._valori[moneda] = valori
+            self._zile_lista[moneda] = zile.tolist()
+            self._medii_lunare[moneda], self._medii_anuale[moneda] = self._medii(zile, valori)
+
+    @staticmethod
+    def _medii(zile: np.ndarray, valori: np.ndarray) -> Tuple[Dict[Tuple[int, int], float], Dict[int, float]]:
+        """Media aritmetică a cursurilor publicate în fiecare lună / an"""
+        luni = zile.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        chei, pozitii = np.unique(luni, return_inverse=True)
+        sume = np.bincount(pozitii, weights=valori)
+        numar = np.bincount(pozitii)
+
+        lunare = {
+            (1970 + int(k) // 12, int(k) % 12 + 1): float(s / n)
+            for k, s, n in zip(chei, sume, numar)
+        }
+
+        ani = 1970 + chei // 12
+        ani_unici, pozitii_ani = np.unique(ani, return_inverse=True)
+        sume_ani = np.bincount(pozitii_ani, weights=sume)
+        numar_ani = np.bincount(pozitii_ani, weights=numar)
+        anuale = {int(a): float(s / n) for a, s, n in zip(ani_unici, sume_ani, numar_ani)}
+
+        return lunare, anuale
+
+    # --- interogări ---
+    @property
+    def monede(self) -> List[str]:
+        return sorted(self._zile)
+
+    def interval(self, moneda: str) -> Optional[Tuple[datetime.date, datetime.date]]:
+        """Prima și ultima dată cu curs pentru o monedă"""
+        zile = self._zile_lista.get(moneda)
+        if not zile:
+            return None
+        return (
+            datetime.date.fromordinal(zile[0] + _EPOCA),
+            datetime.date.fromordinal(zile[-1] + _EPOCA),
+        )
+
+    def curs(self, moneda: str, data: Data) -> Optional[float]:
+        """Cursul valabil la o dată (ultimul publicat până atunci inclusiv); RON = 1"""
+        if moneda == "RON":
+            return 1.0
+        zile = self._zile_lista.get(moneda)
+        if not zile:
+            return None
+        i = bisect_right(zile, _zi(data))
+        return float(self._valori[moneda][i - 1]) if i else None
+
+    def medie_lunara(self, moneda: str, an: int, luna: int) -> Optional[float]:
+        if moneda == "RON":
+            return 1.0
+        return self._medii_lunare.get(moneda, {}).get((an, luna))
+
+    def medie_anuala(self, moneda: str, an: int) -> Optional[float]:
+        if moneda == "RON":
+            return 1.0
+        return self._medii_anuale.get(moneda, {}).get(an)
+
+    def medii_anuale(self, an: int) -> Dict[str, float]:
+        """{monedă: media anului} pentru toate monedele cu cursuri în acel an"""
+        return {
+            moneda: medii[an]
+            for moneda, medii in self._medii_anuale.items()
+            if an in medii
+        }
+
+    def factori(self, moneda, date) -> np.ndarray:
+        """
+        Cursul pentru fiecare rând dintr-un lot (monedă, dată), vectorizat
+
+        Args:
+            moneda: Coloana cu codurile de monedă
+            date: Coloana cu datele (datetime64, date sau str ISO)
+
+        Returns:
+            Array float64; 1 pentru RON, NaN unde nu există curs
+        """
+        moneda = np.asarray(moneda, dtype=object)
+        if isinstance(date, np.ndarray) and date.dtype.kind == "M":
+            zile = date.astype("datetime64[D]").astype(np.int64)
+        else:
+            zile = np.array([_zi(d) for d in date], dtype=np.int64)
+
+        factori = np.full(len(moneda), np.nan, dtype=np.float64)
+        factori[moneda == "RON"] = 1.0
+        for cod in self._zile:
+            masca = moneda == cod
+            if not masca.any():
+                continue
+            pozitii = np.searchsorted(self._zile[cod], zile[masca], side="right") - 1
+            valori = self._valori[cod][np.maximum(pozitii, 0)]
+            factori[masca] = np.where(pozitii >= 0, valori, np.nan)
+
+        return factori
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _incarca(director: str, semnatura: tuple) -> CursuriBNR:
+    return CursuriBNR.din_director(director)
+
+
+def get_cursuri(director: Optional[str] = None) -> CursuriBNR:
+    """
+    Cursurile BNR din director, încărcate o singură dată per proces și
+    reîncărcate doar când se schimbă fișierele din director
+    """
+    if director is None:
+        try:
+            director = st.secrets.get("CURS_BNR_DIR", DIRECTOR_IMPLICIT)
+        except Exception:
+            director = DIRECTOR_IMPLICIT
+
+    semnatura = tuple(
+        (cale, os.path.getmtime(cale), os.path.getsize(cale))
+        for cale in sorted(glob.glob(os.path.join(director, "*.xml")))
+    )
+    return _incarca(director, semnatura)
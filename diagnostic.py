@@ -0,0 +1,182 @@
+"""
+Modul de diagnostic pentru cererile Supabase în Proprieto
+Înregistrează fiecare cerere PostgREST dintr-un rerun Streamlit (tabel,
+filtre, latență, dimensiune răspuns) și semnalează tiparele N+1
+"""
+
+import json
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+# Aceeași formă de cerere repetată de atâtea ori într-un rerun = N+1
+PRAG_N_PLUS_1 = 3
+
+# Câte rerun-uri păstrăm per sesiune
+MAX_RERUNS = 20
+
+OPERATII = ("select", "insert", "upsert", "update", "delete")
+
+
+def _scurt(valoare: Any, limita: int = 60) -> str:
+    text = repr(valoare)
+    return text if len(text) <= limita else text[:limita] + "…"
+
+
+class JurnalCereri:
+    """Cererile făcute într-un singur rerun"""
+
+    def __init__(self, eticheta: str = ""):
+        self.eticheta = eticheta
+        self.inceput = time.time()
+        self.cereri: List[Dict] = []
+
+    def adauga(self, cerere: Dict):
+        self.cereri.append(cerere)
+
+    def n_plus_1(self, prag: int = PRAG_N_PLUS_1) -> List[Dict]:
+        """Formele de cerere repetate de cel puțin `prag` ori"""
+        grupuri: Dict[str, List[Dict]] = {}
+        for cerere in self.cereri:
+            grupuri.setdefault(cerere["forma"], []).append(cerere)
+
+        return [
+            {
+                "forma": forma,
+                "repetari": len(cereri),
+                "ms_total": sum(c["ms"] for c in cereri),
+            }
+            for forma, cereri in grupuri.items()
+            if len(cereri) >= prag
+        ]
+
+    def rezumat(self) -> Dict:
+        return {
+            "eticheta": self.eticheta,
+            "inceput": time.strftime("%H:%M:%S", time.localtime(self.inceput)),
+            "nr_cereri": len(self.cereri),
+            "ms_total": sum(c["ms"] for c in self.cereri),
+            "octeti_total": sum(c["octeti"] for c in self.cereri),
+            "n_plus_1": len(self.n_plus_1()),
+        }
+
+    def ca_dict(self) -> Dict:
+        return {**self.rezumat(), "cereri": self.cereri, "tipare_n_plus_1": self.n_plus_1()}
+
+
+class _CerereInregistrata:
+    """Învelește un request builder PostgREST și înregistrează execute()"""
+
+    def __init__(self, builder, jurnal: JurnalCereri, tinta: str, apeluri: List[tuple]):
+        self._builder = builder
+        self._jurnal = jurnal
+        self._tinta = tinta
+        self._apeluri = apeluri
+
+    def _impacheteaza(self, rezultat, nume: str, args: tuple):
+        if hasattr(rezultat, "execute"):
+            return _CerereInregistrata(rezultat, self._jurnal, self._tinta, self._apeluri + [(nume, args)])
+        return rezultat
+
+    def __getattr__(self, nume: str):
+        atribut = getattr(self._builder, nume)
+        if not callable(atribut):
+            # ex: `.not_` e o proprietate care întoarce builder-ul
+            return self._impacheteaza(atribut, nume, ())
+
+        def apel(*args, **kwargs):
+            return self._impacheteaza(atribut(*args, **kwargs), nume, args)
+        return apel
+
+    def _descriere(self) -> tuple:
+        operatie = "rpc" if self._tinta.startswith("rpc:") else "select"
+        forma, filtre = [], []
+        for nume, args in self._apeluri:
+            if nume in OPERATII:
+                operatie = nume
+                forma.append(f"select({args[0]})" if nume == "select" and args else nume)
+                if nume in ("insert", "upsert") and args:
+                    randuri = len(args[0]) if isinstance(args[0], list) else 1
+                    filtre.append(f"{randuri} rânduri")
+            elif args:
+                forma.append(f"{nume}:{args[0]}")
+                filtre.append(f"{nume}({', '.join(_scurt(a) for a in args)})")
+            else:
+                forma.append(nume)
+        return operatie, " ".join([self._tinta] + forma), filtre
+
+    def execute(self):
+        inceput = time.perf_counter()
+        rezultat, eroare = None, None
+        try:
+            rezultat = self._builder.execute()
+            return rezultat
+        except Exception as e:
+            eroare = str(e)
+            raise
+        finally:
+            ms = (time.perf_counter() - inceput) * 1000
+            date = getattr(rezultat, "data", None)
+            operatie, forma, filtre = self._descriere()
+            self._jurnal.adauga({
+                "tabel": self._tinta,
+                "operatie": operatie,
+                "forma": forma,
+                "filtre": filtre,
+                "ms": round(ms, 2),
+                "randuri": len(date) if isinstance(date, list) else (1 if date else 0),
+                "octeti": len(json.dumps(date, default=str)) if date is not None else 0,
+                "eroare": eroare,
+            })
+
+
+class ClientInregistrat:
+    """Proxy peste clientul Supabase; table() și rpc() sunt înregistrate în jurnal"""
+
+    def __init__(self, client, jurnal: JurnalCereri):
+        self._client = client
+        self.jurnal = jurnal
+
+    def table(self, nume: str):
+        return _CerereInregistrata(self._client.table(nume), self.jurnal, nume, [])
+
+    def rpc(self, functie: str, parametri: Optional[Dict] = None, *args, **kwargs):
+        builder = self._client.rpc(functie, parametri or {}, *args, **kwargs)
+        return _CerereInregistrata(builder, self.jurnal, f"rpc:{functie}", [])
+
+    def __getattr__(self, nume: str):
+        return getattr(self._client, nume)
+
+
+def este_activ() -> bool:
+    return bool(st.session_state.get("diagnostic_activ", False))
+
+
+def client_pentru_rerun(client, eticheta: str = ""):
+    """
+    Dacă diagnosticul e activ în sesiune, întoarce clientul învelit într-un
+    jurnal nou pentru rerun-ul curent; altfel clientul neschimbat
+    """
+    if client is None or not este_activ():
+        return client
+
+    jurnal = JurnalCereri(eticheta)
+    st.session_state.setdefault("diagnostic_reruns", deque(maxlen=MAX_RERUNS)).append(jurnal)
+    return ClientInregistrat(client, jurnal)
+
+
+def eticheteaza_rerun(client, eticheta: str):
+    """Setează eticheta (ex: pagina curentă) a jurnalului rerun-ului curent"""
+    if isinstance(client, ClientInregistrat):
+        client.jurnal.eticheta = eticheta
+
+
+def jurnale() -> List[JurnalCereri]:
+    """Jurnalele ultimelor rerun-uri din sesiune, cel mai recent primul"""
+    return list(reversed(st.session_state.get("diagnostic_reruns", [])))
+
+
+def exporta_json() -> str:
+    return json.dumps([j.ca_dict() for j in jurnale()], ensure_ascii=False, indent=2, default=str)
@@ -0,0 +1,482 @@
+"""
+Modul de import în masă a contractelor pentru Proprieto
+Citește fișiere CSV / XLSX rând cu rând, normalizează și validează fiecare
+rând, apoi scrie contractele și co-proprietarii lor în loturi de mărime fixă,
+deci memoria rămâne constantă indiferent de mărimea fișierului
+"""
+
+import csv
+import io
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from supabase import Client
+
+import coproprietate
+import lucrari
+import validari
+
+# Rânduri scrise într-o singură cerere upsert
+MARIME_LOT_IMPORT = 500
+
+# Câte erori păstrăm în raport (restul sunt doar numărate)
+MAX_ERORI_RAPORT = 1000
+
+# Antet normalizat -> coloana din tabelul contracte
+ALIASURI_COLOANE = {
+    "imobil": "imobil",
+    "nume_imobil": "imobil",
+    "imobil_id": "imobil_id",
+    "nr_contract": "nr_contract",
+    "numar_contract": "nr_contract",
+    "locatar": "locatar",
+    "nume_locatar": "locatar",
+    "cnp_cui": "cnp_cui",
+    "cnp": "cnp_cui",
+    "cui": "cnp_cui",
+    "chirie": "chirie_lunara",
+    "chirie_lunara": "chirie_lunara",
+    "moneda": "moneda",
+    "valuta": "moneda",
+    "frecventa": "frecventa_plata",
+    "frecventa_plata": "frecventa_plata",
+    "data_inceput": "data_inceput",
+    "data_start": "data_inceput",
+    "data_sfarsit": "data_sfarsit",
+    "data_final": "data_sfarsit",
+    "email": "locatar_email",
+    "locatar_email": "locatar_email",
+    "telefon": "locatar_telefon",
+    "locatar_telefon": "locatar_telefon",
+}
+
+COLOANE_OBLIGATORII = ("locatar", "chirie_lunara", "data_inceput")
+
+ALIASURI_MONEDA = {"LEI": "RON", "€": "EUR", "EURO": "EUR", "$": "USD"}
+
+ALIASURI_FRECVENTA = {
+    "lunara": "lunar",
+    "trimestriala": "trimestrial",
+    "semestriala": "semestrial",
+    "anuala": "anual",
+}
+
+# "Nr. contract", "CNP/CUI", "Data-început" -> nr_contract, cnp_cui, data_inceput
+_SEPARATORI_ANTET = re.compile(r'[^a-z0-9]+')
+
+# 1.500 / 12.000.000: puncte ca separatori de mii, fără zecimale
+_MII_CU_PUNCT = re.compile(r'^-?[1-9]\d{0,2}(\.\d{3})+$')
+
+# zz.ll.aaaa, zz/ll/aaaa sau zz-ll-aaaa (ISO e încercat întâi cu date.fromisoformat)
+_DATA_RO = re.compile(r'^(\d{1,2})[./-](\d{1,2})[./-](\d{4})$')
+
+def _fara_diacritice(text: str) -> str:
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+    )
+
+
+def _normalizeaza_antet(antet: str) -> str:
+    cheie = _fara_diacritice(str(antet or "")).lower()
+    return "_".join(_SEPARATORI_ANTET.sub(" ", cheie).split())
+
+
+def _cheie_imobil(nume: str) -> str:
+    return " ".join(_fara_diacritice(nume).casefold().split())
+
+
+# ==================== CITIRE ====================
+
+def _randuri_csv(fisier: BinaryIO, marime: Optional[int]) -> Iterator[Tuple[int, Dict, Optional[float]]]:
+    """(nr rând, valori după antet, fracțiune citită) pentru fiecare rând CSV"""
+    text = io.TextIOWrapper(fisier, encoding="utf-8-sig", newline="")
+    try:
+        prima_linie = text.readline()
+        separator = ";" if prima_linie.count(";") > prima_linie.count(",") else ","
+        antet = next(csv.reader([prima_linie], delimiter=separator), None)
+        if not antet:
+            return
+
+        reader = csv.reader(text, delimiter=separator)
+        for valori in reader:
+            if not any(v.strip() for v in valori):
+                continue
+            fractiune = min(fisier.tell() / marime, 1.0) if marime else None
+            # line_num nu include antetul, citit separat
+            yield reader.line_num + 1, dict(zip(antet, valori)), fractiune
+    finally:
+        # Fișierul rămâne al apelantului
+        text.detach()
+
+
+def _randuri_xlsx(fisier: BinaryIO) -> Iterator[Tuple[int, Dict, Optional[float]]]:
+    """(nr rând, valori după antet, fracțiune citită) din prima foaie, în modul read-only"""
+    from openpyxl import load_workbook  # doar pentru importurile .xlsx
+
+    wb = load_workbook(fisier, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = ws.max_row
+        randuri = ws.iter_rows(values_only=True)
+        antet = next(randuri, None)
+        if antet is None:
+            return
+
+        for nr, valori in enumerate(randuri, start=2):
+            if all(v is None or str(v).strip() == "" for v in valori):
+                continue
+            yield nr, dict(zip(antet, valori)), (min(nr / total, 1.0) if total else None)
+    finally:
+        wb.close()
+
+
+def citeste_randuri(fisier: BinaryIO, nume_fisier: str) -> Iterator[Tuple[int, Dict, Optional[float]]]:
+    """
+    Generează rândurile unui fișier CSV sau XLSX, cu antetul normalizat
+
+    Antetele sunt comparate fără diacritice și majuscule (ex: "Chirie lunară"
+    -> chirie_lunara); coloanele necunoscute sunt ignorate.
+
+    Yields:
+        (nr rând în fișier, {coloană: valoare}, fracțiune citită 0-1 sau None)
+    """
+    if nume_fisier.lower().endswith((".xlsx", ".xlsm")):
+        randuri = _randuri_xlsx(fisier)
+    else:
+        fisier.seek(0, io.SEEK_END)
+        marime = fisier.tell()
+        fisier.seek(0)
+        randuri = _randuri_csv(fisier, marime)
+
+    coloane: Dict[object, Optional[str]] = {}
+    for nr, rand, fractiune in randuri:
+        normalizat = {}
+        for antet, valoare in rand.items():
+            if antet not in coloane:
+                coloane[antet] = ALIASURI_COLOANE.get(_normalizeaza_antet(antet))
+            if coloane[antet]:
+                normalizat[coloane[antet]] = valoare
+        yield nr, normalizat, fractiune
+
+
+# ==================== NORMALIZARE ====================
+
+def _text(valoare) -> Optional[str]:
+    if valoare is None:
+        return None
+    text = str(valoare).strip()
+    return text or None
+
+
+def normalizeaza_moneda(valoare) -> Optional[str]:
+    """'lei' -> RON, '€' -> EUR etc.; None dacă nu e în validari.MONEDE"""
+    text = _text(valoare)
+    if text is None:
+        return "RON"
+    moneda = ALIASURI_MONEDA.get(text.upper(), text.upper())
+    return moneda if moneda in validari.MONEDE else None
+
+
+def normalizeaza_frecventa(valoare) -> Optional[str]:
+    """'Lunară' -> lunar etc.; None dacă nu e în validari.FRECVENTE_PLATA"""
+    text = _text(valoare)
+    if text is None:
+        return "lunar"
+    frecventa = _fara_diacritice(text).lower()
+    frecventa = ALIASURI_FRECVENTA.get(frecventa, frecventa)
+    return frecventa if frecventa in validari.FRECVENTE_PLATA else None
+
+
+def normalizeaza_suma(valoare) -> Optional[float]:
+    """
+    Acceptă 1500, '1500.50', '1.500', '1.500,50', '1500,50' sau '1,500.50'
+
+    Un punct urmat de exact trei cifre, fără virgulă ('1.500', '12.000.000'),
+    e separator de mii (formatul românesc), nu zecimale; '0.500' nu are
+    grupe de mii, deci rămâne 0.5.
+    """
+    if isinstance(valoare, (int, float)):
+        return float(valoare)
+    text = _text(valoare)
+    if text is None:
+        return None
+    text = text.replace(" ", "")
+    if "," in text and "." in text and text.rfind(".") > text.rfind(","):
+        # 1,500.50: virgula separă miile, punctul zecimalele
+        text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    elif _MII_CU_PUNCT.match(text):
+        text = text.replace(".", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def normalizeaza_data(valoare) -> Optional[str]:
+    """Data în format ISO (celulele XLSX vin deja ca datetime)"""
+    if isinstance(valoare, datetime):
+        return valoare.date().isoformat()
+    if isinstance(valoare, date):
+        return valoare.isoformat()
+    text = _text(valoare)
+    if text is None:
+        return None
+    text = text.split(" ")[0]
+    try:
+        potrivire = _DATA_RO.match(text)
+        if potrivire:
+            zi, luna, an = (int(g) for g in potrivire.groups())
+            return date(an, luna, zi).isoformat()
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        return None
+
+
+# ==================== INDEX IMOBILE ====================
+
+def index_imobile(supabase: Client, user_id: str) -> Tuple[Dict[str, Optional[str]], Dict[str, List[str]]]:
+    """
+    Construiește o singură dată indexurile folosite la import
+
+    Returns:
+        (nume imobil normalizat -> imobil_id, None dacă numele e ambiguu;
+         imobil_id -> user_id-urile co-proprietarilor)
+    """
+    imobile = coproprietate.get_imobile_user(supabase, user_id)
+    dupa_nume: Dict[str, Optional[str]] = {}
+    for rand in imobile:
+        imobil = rand.get('imobile') or {}
+        if not imobil.get('id'):
+            continue
+        cheie = _cheie_imobil(imobil.get('nume') or "")
+        dupa_nume[cheie] = imobil['id'] if dupa_nume.get(cheie, imobil['id']) == imobil['id'] else None
+
+    imobil_ids = sorted({r['imobil_id'] for r in imobile if r.get('imobil_id')})
+    proprietari: Dict[str, List[str]] = {i: [] for i in imobil_ids}
+    for i in range(0, len(imobil_ids), coproprietate.MARIME_LOT):
+        result = supabase.table("imobile_proprietari")\
+            .select("imobil_id, user_id")\
+            .in_("imobil_id", imobil_ids[i:i + coproprietate.MARIME_LOT])\
+            .execute()
+        for rand in result.data or []:
+            proprietari[rand['imobil_id']].append(rand['user_id'])
+
+    return dupa_nume, proprietari
+
+
+# ==================== IMPORT ====================
+
+def _contract_din_rand(
+    rand: Dict,
+    user_id: str,
+    dupa_nume: Dict[str, Optional[str]],
+    proprietari: Dict[str, List[str]]
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """(contract gata de scris, None) sau (None, mesaj de eroare)"""
+    lipsa = [c for c in COLOANE_OBLIGATORII if _text(rand.get(c)) is None]
+    if lipsa:
+        return None, f"Lipsesc coloanele obligatorii: {', '.join(lipsa)}"
+
+    imobil_id = _text(rand.get('imobil_id'))
+    if imobil_id is None:
+        nume = _text(rand.get('imobil'))
+        if nume is None:
+            return None, "Lipsește imobilul (coloana imobil sau imobil_id)"
+        cheie = _cheie_imobil(nume)
+        if cheie not in dupa_nume:
+            return None, f"Imobilul '{nume}' nu există sau nu îți aparține"
+        imobil_id = dupa_nume[cheie]
+        if imobil_id is None:
+            return None, f"Există mai multe imobile cu numele '{nume}'; folosește imobil_id"
+    elif imobil_id not in proprietari:
+        return None, f"Imobilul {imobil_id} nu există sau nu îți aparține"
+
+    chirie = normalizeaza_suma(rand.get('chirie_lunara'))
+    if chirie is None or chirie <= 0:
+        return None, f"Chirie invalidă: {rand.get('chirie_lunara')}"
+
+    moneda = normalizeaza_moneda(rand.get('moneda'))
+    if moneda is None:
+        return None, f"Monedă necunoscută: {rand.get('moneda')} (acceptate: {', '.join(validari.MONEDE)})"
+
+    frecventa = normalizeaza_frecventa(rand.get('frecventa_plata'))
+    if frecventa is None:
+        return None, f"Frecvență necunoscută: {rand.get('frecventa_plata')} (acceptate: {', '.join(validari.FRECVENTE_PLATA)})"
+
+    data_inceput = normalizeaza_data(rand.get('data_inceput'))
+    if data_inceput is None:
+        return None, f"Dată de început invalidă: {rand.get('data_inceput')}"
+
+    data_sfarsit = None
+    if _text(rand.get('data_sfarsit')) is not None:
+        data_sfarsit = normalizeaza_data(rand.get('data_sfarsit'))
+        if data_sfarsit is None:
+            return None, f"Dată de sfârșit invalidă: {rand.get('data_sfarsit')}"
+        if data_sfarsit < data_inceput:
+            return None, "Data de sfârșit este înaintea datei de început"
+
+    cnp_cui = _text(rand.get('cnp_cui'))
+    return {
+        "imobil_id": imobil_id,
+        "nr_contract": _text(rand.get('nr_contract')),
+        "locatar": _text(rand.get('locatar')),
+        "cnp_cui": cnp_cui.replace(" ", "").replace("-", "").upper() if cnp_cui else None,
+        "chirie_lunara": round(chirie, 2),
+        "moneda": moneda,
+        "frecventa_plata": frecventa,
+        "data_inceput": data_inceput,
+        "data_sfarsit": data_sfarsit,
+        "locatar_email": _text(rand.get('locatar_email')),
+        "locatar_telefon": _text(rand.get('locatar_telefon')),
+        "user_id": user_id,
+    }, None
+
+
+def _valideaza_identificatori(lot: List[Tuple[int, Dict]]) -> Dict[int, str]:
+    """Validează în masă CNP/CUI, email și telefon pentru un lot; {nr rând: eroare}"""
+    erori: Dict[int, str] = {}
+
+    cu_cod = [(nr, c['cnp_cui']) for nr, c in lot if c['cnp_cui']]
+    cnp = [(nr, cod) for nr, cod in cu_cod if len(cod) == 13]
+    cui = [(nr, cod) for nr, cod in cu_cod if len(cod) != 13]
+    emailuri = [(nr, c['locatar_email']) for nr, c in lot if c['locatar_email']]
+    telefoane = [(nr, c['locatar_telefon']) for nr, c in lot if c['locatar_telefon']]
+
+    for valori, validare, mesaje in (
+        (cnp, validari.valideaza_cnp_bulk, validari.MESAJE_CNP),
+        (cui, validari.valideaza_cui_bulk, validari.MESAJE_CUI),
+        (emailuri, validari.valideaza_email_bulk, validari.MESAJE_EMAIL),
+        (telefoane, validari.valideaza_telefon_bulk, validari.MESAJE_TELEFON),
+    ):
+        if not valori:
+            continue
+        _, coduri = validare([v for _, v in valori])
+        for (nr, _), mesaj in zip(valori, validari.mesaje_erori(coduri, mesaje)):
+            if mesaj:
+                erori.setdefault(nr, mesaj)
+
+    return erori
+
+
+def _scrie_lot(
+    supabase: Client,
+    lot: List[Tuple[int, Dict]],
+    proprietari: Dict[str, List[str]]
+) -> Tuple[int, List[Tuple[int, str]], set]:
+    """
+    Upsert pentru un lot de contracte și co-proprietarii lor
+
+    Returns:
+        (contracte scrise, erori [(nr rând, mesaj)], user_id-uri afectate)
+    """
+    erori_identificatori = _valideaza_identificatori(lot)
+    erori = sorted(erori_identificatori.items())
+    valide = [(nr, c) for nr, c in lot if nr not in erori_identificatori]
+    if not valide:
+        return 0, erori, set()
+
+    try:
+        result = supabase.table("contracte")\
+            .upsert([c for _, c in valide], on_conflict="imobil_id,nr_contract")\
+            .execute()
+        scrise = result.data or []
+
+        legaturi = [
+            {"contract_id": c['id'], "user_id": uid}
+            for c in scrise
+            for uid in (proprietari.get(c['imobil_id']) or [c['user_id']])
+        ]
+        if legaturi:
+            supabase.table("contracte_proprietari")\
+                .upsert(legaturi, on_conflict="contract_id,user_id", ignore_duplicates=True)\
+                .execute()
+
+        return len(scrise), erori, {l['user_id'] for l in legaturi}
+    except Exception as e:
+        return 0, erori + [(nr, f"Lotul nu a fost scris: {str(e)}") for nr, _ in valide], set()
+
+
+def importa_contracte(
+    supabase: Client,
+    fisier: BinaryIO,
+    nume_fisier: str,
+    user_id: str,
+    progres: Optional[Callable[[Optional[float], str], None]] = None,
+    marime_lot: int = MARIME_LOT_IMPORT
+) -> Dict:
+    """
+    Importă contractele dintr-un fișier CSV / XLSX pentru un proprietar
+
+    Fiecare rând e normalizat (monedă, frecvență, sume, date) și validat;
+    imobilul e căutat după nume în imobilele userului. Rândurile valide sunt
+    scrise în loturi de `marime_lot` (upsert pe imobil_id + nr_contract, deci
+    la reimport contractele cu număr sunt actualizate în loc să fie dublate),
+    iar co-proprietarii imobilului sunt adăugați automat la fiecare contract.
+
+    Args:
+        fisier: Fișierul deschis în mod binar (ex: st.file_uploader)
+        nume_fisier: Numele fișierului (extensia decide formatul)
+        user_id: Proprietarul principal al contractelor importate
+        progres: Apelat cu (fracțiune 0-1 sau None, text) după fiecare lot
+
+    Returns:
+        {"procesate", "importate", "nr_erori", "erori": [(nr rând, mesaj)],
+         "useri_afectati": user_id-urile cu cache de co-proprietate invalidat}
+    """
+    raport = {"procesate": 0, "importate": 0, "nr_erori": 0, "erori": []}
+
+    def adauga_erori(erori: List[Tuple[int, str]]):
+        raport["nr_erori"] += len(erori)
+        loc = MAX_ERORI_RAPORT - len(raport["erori"])
+        if loc > 0:
+            raport["erori"].extend(erori[:loc])
+
+    dupa_nume, proprietari = index_imobile(supabase, user_id)
+    afectati = {user_id}
+    vazute: Dict[tuple, int] = {}
+    lot: List[Tuple[int, Dict]] = []
+    fractiune = None
+
+    def scrie():
+        importate, erori, useri = _scrie_lot(supabase, lot, proprietari)
+        raport["importate"] += importate
+        adauga_erori(erori)
+        afectati.update(useri)
+        lot.clear()
+        if progres:
+            progres(fractiune, f"{raport['procesate']:,} rânduri citite, {raport['importate']:,} importate, {raport['nr_erori']:,} erori")
+
+    try:
+        for nr, rand, fractiune in citeste_randuri(fisier, nume_fisier):
+            raport["procesate"] += 1
+            contract, eroare = _contract_din_rand(rand, user_id, dupa_nume, proprietari)
+            if eroare:
+                adauga_erori([(nr, eroare)])
+                continue
+
+            if contract['nr_contract']:
+                cheie = (contract['imobil_id'], contract['nr_contract'])
+                if cheie in vazute:
+                    adauga_erori([(nr, f"Contractul {contract['nr_contract']} apare deja la rândul {vazute[cheie]}")])
+                    continue
+                vazute[cheie] = nr
+
+            lot.append((nr, contract))
+            if len(lot) >= marime_lot:
+                scrie()
+
+        if lot:
+            scrie()
+    except lucrari.LucrareAnulata:
+        raise  # anularea cerută din progres() oprește importul, nu e o eroare de citire
+    except Exception as e:
+        adauga_erori([(0, f"Fișierul nu a putut fi citit: {str(e)}")])
+    finally:
+        coproprietate.invalideaza_cache_user(*afectati)
+        raport["useri_afectati"] = sorted(afectati)
+
+    return raport
@@ -0,0 +1,132 @@
+"""
+Modul de rate limiting pentru Proprieto
+Token bucket partajat la nivel de proces (sau între procese, prin SQLite),
+folosit pentru a respinge încercările de login înainte de orice query/hash
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class LimitatorMemorie:
+    """
+    Token bucket per cheie, ținut în memoria procesului
+
+    Fiecare cheie are `capacitate` jetoane și primește unul la fiecare
+    `interval / capacitate` secunde (ex: 5 încercări / 15 minute).
+    `capacitati` dă altă capacitate cheilor cu un anumit prefix (textul
+    dinaintea primului ':'), ex: {"client": 20} pentru "client:1.2.3.4".
+    """
+
+    def __init__(self, capacitate: int, interval: float, capacitati: Optional[Dict[str, int]] = None):
+        self.capacitate = capacitate
+        self.interval = interval
+        self.capacitati = capacitati or {}
+        self._lock = threading.Lock()
+        self._galeti: Dict[str, Tuple[float, float]] = {}  # cheie -> (jetoane, actualizat)
+
+    def _capacitate(self, cheie: str) -> int:
+        return self.capacitati.get(cheie.split(":", 1)[0], self.capacitate)
+
+    def _jetoane(self, cheie: str, stare: Optional[Tuple[float, float]], acum: float) -> float:
+        capacitate = self._capacitate(cheie)
+        if stare is None:
+            return float(capacitate)
+        jetoane, actualizat = stare
+        return min(capacitate, jetoane + (acum - actualizat) * capacitate / self.interval)
+
+    def _asteptare(self, chei: List[str], disponibile: List[float]) -> float:
+        """Secundele până când toate cheile au cel puțin un jeton (0 = acum)"""
+        return max(
+            (max(0.0, 1 - j) * self.interval / self._capacitate(c) for c, j in zip(chei, disponibile)),
+            default=0.0
+        )
+
+    def incearca(self, chei: List[str]) -> float:
+        """
+        Consumă câte un jeton din fiecare cheie, toate sau niciunul
+
+        Returns:
+            0 dacă s-a consumat; altfel secundele de așteptat până când
+            încercarea ar fi acceptată (fără consum)
+        """
+        acum = time.time()
+        with self._lock:
+            disponibile = [self._jetoane(c, self._galeti.get(c), acum) for c in chei]
+            asteptare = self._asteptare(chei, disponibile)
+            if asteptare > 0:
+                return asteptare
+            for cheie, jetoane in zip(chei, disponibile):
+                self._galeti[cheie] = (jetoane - 1, acum)
+
+            # Curăță gălețile pline (nu mai au nimic de limitat)
+            if len(self._galeti) > 10000:
+                self._galeti = {
+                    c: s for c, s in self._galeti.items()
+                    if self._jetoane(c, s, acum) < self._capacitate(c)
+                }
+            return 0.0
+
+    def consuma(self, chei: List[str]) -> bool:
+        """Consumă câte un jeton din fiecare cheie; False (fără consum) dacă vreuna e goală"""
+        return self.incearca(chei) == 0
+
+    def reseteaza(self, cheie: str):
+        """Umple la loc găleata unei chei (ex: după un login reușit)"""
+        with self._lock:
+            self._galeti.pop(cheie, None)
+
+
+class LimitatorSQLite(LimitatorMemorie):
+    """
+    Același token bucket, cu starea într-un fișier SQLite
+    (pentru deploy-uri cu mai multe procese pe aceeași mașină)
+    """
+
+    def __init__(self, capacitate: int, interval: float, cale: str, capacitati: Optional[Dict[str, int]] = None):
+        super().__init__(capacitate, interval, capacitati)
+        self._cale = cale
+        with self._conexiune() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS galeti ("
+                "cheie TEXT PRIMARY KEY, jetoane REAL NOT NULL, actualizat REAL NOT NULL)"
+            )
+
+    def _conexiune(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._cale, timeout=5, isolation_level=None)
+
+    def incearca(self, chei: List[str]) -> float:
+        acum = time.time()
+        conn = self._conexiune()
+        try:
+            # BEGIN IMMEDIATE serializează citirea + scrierea între procese
+            conn.execute("BEGIN IMMEDIATE")
+            disponibile = []
+            for cheie in chei:
+                rand = conn.execute(
+                    "SELECT jetoane, actualizat FROM galeti WHERE cheie = ?", (cheie,)
+                ).fetchone()
+                disponibile.append(self._jetoane(cheie, rand, acum))
+
+            asteptare = self._asteptare(chei, disponibile)
+            if asteptare > 0:
+                conn.execute("ROLLBACK")
+                return asteptare
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO galeti (cheie, jetoane, actualizat) VALUES (?, ?, ?)",
+                [(c, j - 1, acum) for c, j in zip(chei, disponibile)]
+            )
+            conn.execute("COMMIT")
+            return 0.0
+        finally:
+            conn.close()
+
+    def reseteaza(self, cheie: str):
+        conn = self._conexiune()
+        try:
+            conn.execute("DELETE FROM galeti WHERE cheie = ?", (cheie,))
+        finally:
+            conn.close()
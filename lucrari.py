@@ -0,0 +1,521 @@
+"""
+Coada locală de lucrări în fundal pentru Proprieto
+Exporturile, pachetele de ghiduri D212 și importurile rulează în procese
+worker separate; starea și progresul stau într-o bază SQLite locală, iar
+fișierul rezultat pe disc, gata de descărcat
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+RADACINA = os.path.dirname(os.path.abspath(__file__))
+
+# Baza SQLite și fișierele lucrărilor (câte un director per lucrare)
+DIRECTOR_LUCRARI = os.environ.get("PROPRIETO_LUCRARI_DIR") or os.path.join(RADACINA, ".lucrari")
+
+NR_WORKERI = 2
+INTERVAL_INTEROGARE = 0.5  # secunde între verificările cozii în worker
+INTERVAL_PROGRES = 0.5  # secunde minime între două scrieri de progres
+PASTRARE_ZILE = 7  # lucrările terminate mai vechi sunt șterse (cu fișierele lor)
+
+STARI_FINALE = ("finalizata", "esuata", "anulata")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lucrari (
+    id TEXT PRIMARY KEY,
+    tip TEXT NOT NULL,
+    titlu TEXT NOT NULL,
+    user_id TEXT,
+    parametri TEXT NOT NULL,
+    stare TEXT NOT NULL DEFAULT 'in_asteptare',
+    progres REAL NOT NULL DEFAULT 0,
+    mesaj TEXT,
+    rezultat TEXT,
+    fisier TEXT,
+    mime TEXT,
+    anulare INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER,
+    creata REAL NOT NULL,
+    pornita REAL,
+    terminata REAL
+);
+CREATE INDEX IF NOT EXISTS idx_lucrari_coada ON lucrari(stare, creata);
+CREATE INDEX IF NOT EXISTS idx_lucrari_user ON lucrari(user_id, creata);
+"""
+
+_initializate = set()
+_aplicate = set()  # importuri deja reflectate în cache-ul acestui proces
+_init_lock = threading.Lock()
+
+
+class LucrareAnulata(Exception):
+    """Ridicată din progres() când utilizatorul a anulat lucrarea"""
+
+
+def _conectare(director: str = DIRECTOR_LUCRARI) -> sqlite3.Connection:
+    """Conexiune nouă (una per operație, deci sigură între thread-uri și procese)"""
+    os.makedirs(director, exist_ok=True)
+    con = sqlite3.connect(os.path.join(director, "lucrari.db"), timeout=30, isolation_level=None)
+    con.row_factory = sqlite3.Row
+    with _init_lock:
+        if director not in _initializate:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+            _initializate.add(director)
+    return con
+
+
+def _din_rand(rand: sqlite3.Row) -> Dict:
+    lucrare = dict(rand)
+    lucrare["parametri"] = json.loads(lucrare["parametri"])
+    lucrare["rezultat"] = json.loads(lucrare["rezultat"]) if lucrare["rezultat"] else None
+    return lucrare
+
+
+# ==================== TIPURI DE LUCRĂRI ====================
+# Rulează în procesul worker: primesc clientul Supabase, parametrii (JSON)
+# și contextul lucrării; întorc rezultatul (JSON) afișat în aplicație.
+
+class ContextLucrare:
+    """Directorul, progresul și fișierul rezultat ale unei lucrări în execuție"""
+
+    def __init__(self, director: str, lucrare_id: str):
+        self._baza = director
+        self.id = lucrare_id
+        self.director = os.path.join(director, lucrare_id)
+        self.fisier: Optional[str] = None
+        self.mime: Optional[str] = None
+        self._ultima_scriere = 0.0
+
+    def progres(self, fractiune: Optional[float], text: str):
+        """
+        Salvează progresul (cel mult o dată la INTERVAL_PROGRES secunde)
+
+        Raises:
+            LucrareAnulata: Anularea a fost cerută din aplicație
+        """
+        acum = time.monotonic()
+        if acum - self._ultima_scriere < INTERVAL_PROGRES:
+            return
+        self._ultima_scriere = acum
+
+        with closing(_conectare(self._baza)) as con:
+            con.execute(
+                "UPDATE lucrari SET progres = COALESCE(?, progres), mesaj = ? WHERE id = ?",
+                (fractiune, text, self.id)
+            )
+            anulare = con.execute("SELECT anulare FROM lucrari WHERE id = ?", (self.id,)).fetchone()
+        if anulare and anulare["anulare"]:
+            raise LucrareAnulata()
+
+    def artefact(self, nume_fisier: str, mime: str) -> str:
+        """Calea fișierului rezultat (de descărcat din aplicație)"""
+        self.fisier, self.mime = nume_fisier, mime
+        return os.path.join(self.director, nume_fisier)
+
+
+def _lucrare_backup_excel(supabase, parametri: Dict, context: ContextLucrare) -> Dict:
+    import backup
+
+    cale = context.artefact(
+        f"Backup_Proprieto_{time.strftime('%Y%m%d_%H%M')}.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    total = backup.exporta_backup_excel(supabase, cale, context.progres)
+    return {"randuri": total}
+
+
+def _lucrare_pachet_d212(supabase, parametri: Dict, context: ContextLucrare) -> Dict:
+    import admin_panel
+    import parametri_fiscali
+    import pdf_d212
+
+    an_fiscal = parametri["an_fiscal"]
+    context.progres(0.0, "Calcul date fiscale...")
+    # ridica=True: o eroare de citire marchează lucrarea esuata, nu "fără venituri"
+    ghiduri = admin_panel.ghiduri_d212_utilizatori(supabase, an_fiscal, ridica=True)
+    if not ghiduri:
+        return {"ghiduri": 0}
+
+    cale = context.artefact(f"Ghiduri_D212_{an_fiscal}.zip", "application/zip")
+    return {"ghiduri": pdf_d212.genereaza_zip_d212(
+        ghiduri, an_fiscal, cale, context.progres,
+        parametri=parametri_fiscali.get_parametri(supabase, an_fiscal)
+    )}
+
+
+def _lucrare_ghid_d212(supabase, parametri: Dict, context: ContextLucrare) -> Dict:
+    import admin_panel
+    import parametri_fiscali
+    import pdf_d212
+
+    an_fiscal = parametri["an_fiscal"]
+    ghiduri = admin_panel.ghiduri_d212_utilizatori(supabase, an_fiscal, [parametri["user_id"]], ridica=True)
+    if not ghiduri:
+        return {"ghiduri": 0}
+
+    nume_fisier, fisc = ghiduri[0]
+    with open(context.artefact(nume_fisier, "application/pdf"), "wb") as f:
+        f.write(pdf_d212.genereaza_pdf_d212(fisc, an_fiscal, parametri_fiscali.get_parametri(supabase, an_fiscal)))
+    return {"ghiduri": 1, "taxe": fisc["total_taxe"]}
+
+
+def _lucrare_import_contracte(supabase, parametri: Dict, context: ContextLucrare) -> Dict:
+    import import_contracte
+
+    nume_fisier = parametri["nume_fisier"]
+    with open(os.path.join(context.director, nume_fisier), "rb") as fisier:
+        return import_contracte.importa_contracte(
+            supabase, fisier, nume_fisier, parametri["user_id"], context.progres
+        )
+
+
+TIPURI: Dict[str, Callable] = {
+    "backup_excel": _lucrare_backup_excel,
+    "pachet_d212": _lucrare_pachet_d212,
+    "ghid_d212": _lucrare_ghid_d212,
+    "import_contracte": _lucrare_import_contracte,
+}
+
+
+# ==================== WORKER ====================
+
+def _revendica(director: str, pid: int) -> Optional[Dict]:
+    """Prima lucrare din coadă, marcată atomic ca preluată de acest worker"""
+    with closing(_conectare(director)) as con:
+        con.execute("BEGIN IMMEDIATE")
+        # rowid departajează lucrările trimise în același moment (ordinea inserării)
+        rand = con.execute(
+            "SELECT * FROM lucrari WHERE stare = 'in_asteptare' ORDER BY creata, rowid LIMIT 1"
+        ).fetchone()
+        if rand is not None:
+            con.execute(
+                "UPDATE lucrari SET stare = 'in_lucru', pid = ?, pornita = ?, mesaj = 'Pornită' WHERE id = ?",
+                (pid, time.time(), rand["id"])
+            )
+        con.execute("COMMIT")
+    return _din_rand(rand) if rand is not None else None
+
+
+def _termina(director: str, lucrare_id: str, stare: str, mesaj: str, **campuri):
+    campuri = {"stare": stare, "mesaj": mesaj, "terminata": time.time(), **campuri}
+    with closing(_conectare(director)) as con:
+        con.execute(
+            f"UPDATE lucrari SET {', '.join(f'{c} = ?' for c in campuri)} WHERE id = ?",
+            (*campuri.values(), lucrare_id)
+        )
+
+
+def executa_lucrare(director: str, supabase, lucrare: Dict):
+    """Rulează o lucrare preluată și îi salvează starea finală"""
+    context = ContextLucrare(director, lucrare["id"])
+    try:
+        rezultat = TIPURI[lucrare["tip"]](supabase, lucrare["parametri"], context)
+        fisier = context.fisier if context.fisier and os.path.exists(os.path.join(context.director, context.fisier)) else None
+        _termina(
+            director, lucrare["id"], "finalizata", "Finalizată",
+            progres=1.0, rezultat=json.dumps(rezultat, default=str), fisier=fisier, mime=context.mime
+        )
+    except LucrareAnulata:
+        shutil.rmtree(context.director, ignore_errors=True)  # fișierul parțial nu e util
+        _termina(director, lucrare["id"], "anulata", "Anulată de utilizator")
+    except Exception as e:
+        _termina(director, lucrare["id"], "esuata", f"Eroare: {str(e)}")
+
+
+def bucla_worker(director: str, fabrica_client: Callable, parinte: Optional[int] = None):
+    """
+    Preia și rulează lucrări până la oprirea procesului părinte (serverul Streamlit)
+
+    Clientul Supabase e creat la prima lucrare; dacă nu poate fi creat,
+    lucrarea e marcată eșuată și se reîncearcă la următoarea.
+    """
+    supabase = None
+    while parinte is None or os.getppid() == parinte:
+        lucrare = _revendica(director, os.getpid())
+        if lucrare is None:
+            time.sleep(INTERVAL_INTEROGARE)
+            continue
+
+        if supabase is None:
+            try:
+                supabase = fabrica_client()
+            except Exception as e:
+                _termina(director, lucrare["id"], "esuata", f"Eroare conexiune Supabase: {str(e)}")
+                continue
+        executa_lucrare(director, supabase, lucrare)
+
+
+def _proces_activ(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+
+
+def curata(director: str = DIRECTOR_LUCRARI, pastrare_zile: float = PASTRARE_ZILE):
+    """
+    Marchează eșuate lucrările rămase "in_lucru" după oprirea worker-ului și
+    șterge lucrările terminate mai vechi de `pastrare_zile` (cu fișierele lor)
+    """
+    limita = time.time() - pastrare_zile * 86400
+    with closing(_conectare(director)) as con:
+        for rand in con.execute("SELECT id, pid FROM lucrari WHERE stare = 'in_lucru'").fetchall():
+            if not _proces_activ(rand["pid"]):
+                con.execute(
+                    "UPDATE lucrari SET stare = 'esuata', mesaj = ?, terminata = ? WHERE id = ? AND stare = 'in_lucru'",
+                    ("Procesul worker s-a oprit în timpul lucrării", time.time(), rand["id"])
+                )
+
+        vechi = [r["id"] for r in con.execute(
+            "SELECT id FROM lucrari WHERE terminata < ? AND stare IN ('finalizata', 'esuata', 'anulata')", (limita,)
+        ).fetchall()]
+        con.executemany("DELETE FROM lucrari WHERE id = ?", [(i,) for i in vechi])
+
+    for lucrare_id in vechi:
+        shutil.rmtree(os.path.join(director, lucrare_id), ignore_errors=True)
+
+
+class PoolLucrari:
+    """
+    Procesele worker ale serverului Streamlit (pornite la prima lucrare)
+
+    Worker-ii sunt procese `python -m lucrari` independente, nu procese
+    multiprocessing: pot porni la rândul lor pool-uri de procese (pachetul
+    D212) și nu blochează oprirea serverului; se opresc singuri când
+    procesul părinte dispare.
+    """
+
+    def __init__(self, director: str = DIRECTOR_LUCRARI, nr_workeri: int = NR_WORKERI):
+        self.director = director
+        self.nr_workeri = nr_workeri
+        self._url: Optional[str] = None
+        self._key: Optional[str] = None
+        self._procese: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    def configureaza(self, url: str, key: str):
+        with self._lock:
+            self._url, self._key = url, key
+
+    def asigura(self) -> bool:
+        """Pornește worker-ii lipsă (ex: după o cădere); False dacă nu e configurat"""
+        with self._lock:
+            if self._url is None:
+                return False
+
+            self._procese = [p for p in self._procese if p.poll() is None]
+            if len(self._procese) < self.nr_workeri:
+                curata(self.director)
+                mediu = {
+                    **os.environ,
+                    "SUPABASE_URL": self._url,
+                    "SUPABASE_KEY": self._key,
+                    "PROPRIETO_LUCRARI_DIR": self.director,
+                }
+                while len(self._procese) < self.nr_workeri:
+                    self._procese.append(subprocess.Popen(
+                        [sys.executable, "-m", "lucrari", "--parinte", str(os.getpid())],
+                        cwd=RADACINA,
+                        env=mediu
+                    ))
+            return True
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool() -> PoolLucrari:
+    """Worker-ii procesului, creați o singură dată (partajați între sesiuni)"""
+    return PoolLucrari()
+
+
+def configureaza(url: str, key: str):
+    get_pool().configureaza(url, key)
+
+
+# ==================== API APLICAȚIE ====================
+
+def trimite(
+    tip: str,
+    titlu: str,
+    parametri: Dict,
+    user_id: Optional[str] = None,
+    fisiere: Optional[Dict[str, bytes]] = None,
+    director: Optional[str] = None
+) -> str:
+    """
+    Adaugă o lucrare în coadă și pornește worker-ii dacă e nevoie
+
+    Args:
+        titlu: Textul afișat în lista de lucrări
+        user_id: Cine a trimis lucrarea (userii își văd doar lucrările lor)
+        fisiere: Fișiere de intrare ({nume: conținut}), scrise în directorul lucrării
+
+    Returns:
+        id-ul lucrării
+    """
+    if tip not in TIPURI:
+        raise ValueError(f"Tip de lucrare necunoscut: {tip}")
+
+    pool = get_pool() if director is None else None
+    director = director or pool.director
+    lucrare_id = uuid.uuid4().hex
+
+    # Fișierele de intrare există înaintea rândului, deci worker-ul le găsește
+    director_lucrare = os.path.join(director, lucrare_id)
+    os.makedirs(director_lucrare, exist_ok=True)
+    for nume, continut in (fisiere or {}).items():
+        with open(os.path.join(director_lucrare, os.path.basename(nume)), "wb") as f:
+            f.write(continut)
+
+    with closing(_conectare(director)) as con:
+        con.execute(
+            "INSERT INTO lucrari (id, tip, titlu, user_id, parametri, mesaj, creata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (lucrare_id, tip, titlu, user_id, json.dumps(parametri, default=str), "În așteptare", time.time())
+        )
+
+    if pool is not None:
+        pool.asigura()
+    return lucrare_id
+
+
+def reporneste_pentru_coada() -> bool:
+    """
+    Repornește worker-ii opriți (ex: după restartul serverului) doar dacă
+    există lucrări în așteptare; deschiderea paginii nu pornește procese
+
+    Returns:
+        True dacă existau lucrări în așteptare
+    """
+    pool = get_pool()
+    with closing(_conectare(pool.director)) as con:
+        in_asteptare = con.execute(
+            "SELECT 1 FROM lucrari WHERE stare = 'in_asteptare' LIMIT 1"
+        ).fetchone() is not None
+    if in_asteptare:
+        pool.asigura()
+    return in_asteptare
+
+
+def _aplica_rezultate(lucrari: List[Dict]):
+    """
+    Importurile terminate invalidează cache-ul de co-proprietate al acestui
+    proces (worker-ul l-a invalidat doar pe al lui), o singură dată per lucrare
+    """
+    for lucrare in lucrari:
+        if lucrare["tip"] != "import_contracte" or lucrare["stare"] != "finalizata":
+            continue
+        with _init_lock:
+            if lucrare["id"] in _aplicate:
+                continue
+            _aplicate.add(lucrare["id"])
+
+        import coproprietate
+        coproprietate.invalideaza_cache_user(*(lucrare["rezultat"] or {}).get("useri_afectati", []))
+
+
+def get_lucrare(lucrare_id: str, director: str = DIRECTOR_LUCRARI) -> Optional[Dict]:
+    with closing(_conectare(director)) as con:
+        rand = con.execute("SELECT * FROM lucrari WHERE id = ?", (lucrare_id,)).fetchone()
+    if rand is None:
+        return None
+    lucrare = _din_rand(rand)
+    _aplica_rezultate([lucrare])
+    return lucrare
+
+
+def lucrari_recente(
+    user_id: Optional[str] = None,
+    tipuri: Optional[Tuple[str, ...]] = None,
+    limita: int = 10,
+    director: str = DIRECTOR_LUCRARI
+) -> List[Dict]:
+    """
+    Ultimele lucrări, cele mai noi primele
+
+    Args:
+        user_id: Doar lucrările acestui user (None = toate, pentru admini)
+        tipuri: Doar aceste tipuri (None = toate)
+    """
+    conditii, valori = [], []
+    if user_id is not None:
+        conditii.append("user_id = ?")
+        valori.append(user_id)
+    if tipuri:
+        conditii.append(f"tip IN ({', '.join('?' for _ in tipuri)})")
+        valori.extend(tipuri)
+    where = f"WHERE {' AND '.join(conditii)}" if conditii else ""
+
+    with closing(_conectare(director)) as con:
+        randuri = con.execute(
+            f"SELECT * FROM lucrari {where} ORDER BY creata DESC, rowid DESC LIMIT ?", (*valori, limita)
+        ).fetchall()
+    lucrari = [_din_rand(r) for r in randuri]
+    _aplica_rezultate(lucrari)
+    return lucrari
+
+
+def anuleaza(lucrare_id: str, director: str = DIRECTOR_LUCRARI) -> Tuple[bool, str]:
+    """
+    Anulează o lucrare: din coadă imediat, în execuție la următorul progres
+
+    Returns:
+        (success, message)
+    """
+    with closing(_conectare(director)) as con:
+        scoasa = con.execute(
+            "UPDATE lucrari SET stare = 'anulata', mesaj = 'Anulată de utilizator', terminata = ? "
+            "WHERE id = ? AND stare = 'in_asteptare'",
+            (time.time(), lucrare_id)
+        ).rowcount
+        if scoasa:
+            return True, "Lucrarea a fost scoasă din coadă"
+
+        ceruta = con.execute(
+            "UPDATE lucrari SET anulare = 1 WHERE id = ? AND stare = 'in_lucru'", (lucrare_id,)
+        ).rowcount
+    if ceruta:
+        return True, "Anularea a fost cerută; lucrarea se oprește la următorul pas"
+    return False, "Lucrarea este deja terminată"
+
+
+def cale_artefact(lucrare: Dict, director: str = DIRECTOR_LUCRARI) -> Optional[str]:
+    """Calea fișierului rezultat al unei lucrări finalizate (None dacă nu are)"""
+    if lucrare["stare"] != "finalizata" or not lucrare["fisier"]:
+        return None
+    cale = os.path.join(director, lucrare["id"], lucrare["fisier"])
+    return cale if os.path.exists(cale) else None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Worker lucrări în fundal Proprieto")
+    parser.add_argument("--parinte", type=int, default=None, help="pid-ul serverului; worker-ul se oprește odată cu el")
+    args = parser.parse_args(argv)
+
+    from supabase import create_client
+
+    bucla_worker(
+        DIRECTOR_LUCRARI,
+        lambda: create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"]),
+        args.parinte
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Indexuri pentru prezentarea generală (admin)
+-- Pagini din imobile/contracte ordonate după (created_at, id)
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: PAGINARE
+-- ================================================================
+
+-- Tabelele din "Prezentare Generală Date" sunt ordonate după
+-- (created_at, id) descrescător; fără index, fiecare pagină sortează tot tabelul
+CREATE INDEX IF NOT EXISTS idx_imobile_created_id ON imobile(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_contracte_created_id ON contracte(created_at DESC, id DESC);
+
+-- ================================================================
+-- PARTE 2: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ INDEXURI PAGINARE DATE CREATE!' AS status,
+    (SELECT COUNT(*) FROM pg_indexes
+     WHERE indexname IN ('idx_imobile_created_id', 'idx_contracte_created_id')) AS indexuri;
@@ -0,0 +1,43 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Import în masă al contractelor (CSV / XLSX)
+-- Cheie unică pentru upsert-ul din import_contracte.py și monedele
+-- acceptate de aplicație (validari.MONEDE)
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- ATENȚIE: dacă PARTEA 1 eșuează, există deja contracte duplicate
+-- (același număr de contract pe același imobil). Le găsești cu:
+--   SELECT imobil_id, nr_contract, COUNT(*) FROM contracte
+--   WHERE nr_contract IS NOT NULL GROUP BY 1, 2 HAVING COUNT(*) > 1;
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: CHEIE UNICĂ (imobil_id, nr_contract)
+-- ================================================================
+
+-- Reimportul aceluiași fișier actualizează contractele în loc să le dubleze.
+-- Contractele fără număr (nr_contract NULL) nu intră în conflict între ele.
+ALTER TABLE contracte DROP CONSTRAINT IF EXISTS contracte_imobil_nr_contract_key;
+ALTER TABLE contracte ADD CONSTRAINT contracte_imobil_nr_contract_key UNIQUE (imobil_id, nr_contract);
+
+-- ================================================================
+-- PARTE 2: MONEDE
+-- ================================================================
+
+-- Aliniază constrângerea cu validari.MONEDE (RON, EUR, USD)
+ALTER TABLE contracte DROP CONSTRAINT IF EXISTS contracte_moneda_check;
+ALTER TABLE contracte ADD CONSTRAINT contracte_moneda_check CHECK (moneda IN ('RON', 'EUR', 'USD'));
+
+-- ================================================================
+-- PARTE 3: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ IMPORT CONTRACTE CONFIGURAT!' AS status,
+    (SELECT COUNT(*) FROM pg_constraint WHERE conname IN ('contracte_imobil_nr_contract_key', 'contracte_moneda_check')) AS constrangeri;
@@ -0,0 +1,68 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Registrul parametrilor fiscali pe ani
+-- Salariul minim, cotele și pragurile CASS, editabile din panoul de
+-- administrare în loc de constante în cod
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- Un an fără rând folosește parametrii ultimului an anterior din tabel
+-- (vezi motor_fiscal.parametri_pentru_an).
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: TABEL
+-- ================================================================
+
+CREATE TABLE IF NOT EXISTS parametri_fiscali (
+    an_fiscal INTEGER PRIMARY KEY,
+    salariu_minim NUMERIC(10,2) NOT NULL CHECK (salariu_minim > 0),
+    cota_forfetara NUMERIC(5,4) NOT NULL CHECK (cota_forfetara BETWEEN 0 AND 1),
+    cota_impozit NUMERIC(5,4) NOT NULL CHECK (cota_impozit BETWEEN 0 AND 1),
+    cota_cass NUMERIC(5,4) NOT NULL CHECK (cota_cass BETWEEN 0 AND 1),
+    -- Număr de salarii minime pentru pragurile CASS 1/2/3
+    praguri_cass INTEGER[] NOT NULL CHECK (
+        cardinality(praguri_cass) = 3
+        AND praguri_cass[1] > 0
+        AND praguri_cass[1] < praguri_cass[2]
+        AND praguri_cass[2] < praguri_cass[3]
+    ),
+    actualizat_la TIMESTAMPTZ DEFAULT now(),
+    actualizat_de UUID REFERENCES users(id) ON DELETE SET NULL
+);
+
+DROP TRIGGER IF EXISTS parametri_fiscali_actualizat ON parametri_fiscali;
+
+CREATE OR REPLACE FUNCTION marcheaza_parametri_actualizati()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.actualizat_la = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER parametri_fiscali_actualizat
+    BEFORE UPDATE ON parametri_fiscali
+    FOR EACH ROW
+    EXECUTE FUNCTION marcheaza_parametri_actualizati();
+
+-- ================================================================
+-- PARTE 2: VALORI 2026
+-- ================================================================
+
+INSERT INTO parametri_fiscali (an_fiscal, salariu_minim, cota_forfetara, cota_impozit, cota_cass, praguri_cass)
+VALUES (2026, 4050, 0.20, 0.10, 0.10, ARRAY[6, 12, 24])
+ON CONFLICT (an_fiscal) DO NOTHING;
+
+-- ================================================================
+-- PARTE 3: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ TABEL parametri_fiscali CREAT!' AS status,
+    (SELECT COUNT(*) FROM parametri_fiscali) AS ani_configurati;
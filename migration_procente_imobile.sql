@@ -0,0 +1,71 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Totaluri cote de proprietate (RPC)
+-- Suma procentelor co-proprietarilor pentru mai multe imobile
+-- într-o singură cerere agregată pe server
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- Aplicația apelează funcțiile prin supabase.rpc("procente_imobile", ...)
+-- și supabase.rpc("imobile_cote_invalide", ...) (vezi
+-- coproprietate.get_procente_totale_imobile / get_imobile_cote_invalide).
+-- Scriptul poate fi rulat din nou după actualizări.
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: INDEX
+-- ================================================================
+
+-- Suma se calculează doar din index (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_imobile_prop_imobil_procent
+    ON imobile_proprietari(imobil_id) INCLUDE (procent_proprietate);
+
+-- ================================================================
+-- PARTE 2: TOTALURI PER IMOBIL
+-- ================================================================
+
+-- Un rând per imobil cu cel puțin un proprietar: suma cotelor și
+-- numărul de proprietari. p_imobil_ids NULL = toate imobilele.
+CREATE OR REPLACE FUNCTION procente_imobile(p_imobil_ids UUID[] DEFAULT NULL)
+RETURNS TABLE (
+    imobil_id UUID,
+    procent_total NUMERIC,
+    nr_proprietari BIGINT
+) AS $$
+    SELECT ip.imobil_id, SUM(ip.procent_proprietate), COUNT(*)
+    FROM imobile_proprietari ip
+    WHERE p_imobil_ids IS NULL OR ip.imobil_id = ANY(p_imobil_ids)
+    GROUP BY ip.imobil_id;
+$$ LANGUAGE sql STABLE;
+
+-- ================================================================
+-- PARTE 3: IMOBILE CU COTE INVALIDE
+-- ================================================================
+
+-- Doar imobilele ale căror cote nu însumează 100% (± p_toleranta):
+-- verificarea adminului pe tot portofoliul transferă doar problemele,
+-- nu câte un rând per imobil
+CREATE OR REPLACE FUNCTION imobile_cote_invalide(p_toleranta NUMERIC DEFAULT 0.01)
+RETURNS TABLE (
+    imobil_id UUID,
+    procent_total NUMERIC,
+    nr_proprietari BIGINT
+) AS $$
+    SELECT ip.imobil_id, SUM(ip.procent_proprietate), COUNT(*)
+    FROM imobile_proprietari ip
+    GROUP BY ip.imobil_id
+    HAVING abs(SUM(ip.procent_proprietate) - 100) > p_toleranta;
+$$ LANGUAGE sql STABLE;
+
+-- ================================================================
+-- PARTE 4: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ RPC procente_imobile și imobile_cote_invalide CREATE!' AS status,
+    (SELECT COUNT(*) FROM imobile_cote_invalide()) AS imobile_cote_incomplete;
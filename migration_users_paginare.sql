@@ -0,0 +1,37 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Indexuri pentru lista de utilizatori (admin)
+-- Paginare keyset pe (created_at, id) și căutare după email/nume
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: PAGINARE KEYSET
+-- ================================================================
+
+-- Lista din panoul de administrare e ordonată după (created_at, id) descrescător
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON users(created_at DESC, id DESC);
+
+-- ================================================================
+-- PARTE 2: CĂUTARE DUPĂ EMAIL / NUME
+-- ================================================================
+
+-- Indexuri trigram pentru filtrele ILIKE '%text%'
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_nume_trgm ON users USING gin (nume gin_trgm_ops);
+
+-- ================================================================
+-- PARTE 3: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ INDEXURI USERS CREATE!' AS status,
+    (SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'users' AND indexname LIKE 'idx_users_%') AS indexuri_users;
@@ -0,0 +1,261 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Totaluri anuale precalculate (rollup)
+-- Tabelul venituri_anuale e ținut la zi de triggere pe contracte,
+-- contracte_proprietari și imobile_proprietari
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Rulează întâi migration_venituri_rpc.sql (funcția luni_active)
+-- 2. Mergi la Supabase Dashboard → SQL Editor
+-- 3. Creează o "New Query"
+-- 4. Copiază și rulează acest script complet
+-- 5. Verifică că vezi "Success" pentru toate comenzile
+--
+-- Tabelul are același nume ca RPC-ul venituri_anuale: în PostgREST
+-- tabelul e /venituri_anuale, iar funcția /rpc/venituri_anuale.
+--
+-- Contractele pe durată nedeterminată sunt totalizate până la anul
+-- următor celui curent. Reconstrucția anuală e programată automat dacă
+-- extensia pg_cron e activă; altfel rulează la începutul fiecărui an:
+--   SELECT reconstruieste_venituri_anuale();
+-- Până atunci aplicația calculează anii neacoperiți prin RPC (vezi
+-- tabelul venituri_anuale_acoperire).
+--
+-- Scriptul poate fi rulat din nou peste o versiune anterioară.
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: TABEL
+-- ================================================================
+
+CREATE TABLE IF NOT EXISTS venituri_anuale (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    an_fiscal INTEGER NOT NULL,
+    moneda TEXT NOT NULL,
+    venit_brut NUMERIC NOT NULL,
+    nr_contracte INTEGER NOT NULL,
+    actualizat_la TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (user_id, an_fiscal, moneda)
+);
+
+-- Panoul de administrare citește un an pentru toți userii
+CREATE INDEX IF NOT EXISTS idx_venituri_anuale_an ON venituri_anuale(an_fiscal);
+
+-- Ultimul an acoperit pentru toți userii (scris de reconstrucția completă);
+-- aplicația citește din tabel doar anii <= an_maxim
+CREATE TABLE IF NOT EXISTS venituri_anuale_acoperire (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    an_maxim INTEGER NOT NULL,
+    reconstruit_la TIMESTAMPTZ DEFAULT now()
+);
+
+-- ================================================================
+-- PARTE 2: RECALCULARE
+-- ================================================================
+
+-- Recalculează toți anii pentru userii dați (NULL = toți userii).
+-- Aceeași formulă ca RPC-ul venituri_anuale, pentru fiecare an în care
+-- contractul e activ.
+--
+-- Scrieri concurente (ex: un import în fundal și o editare din UI) pe
+-- aceiași useri: lock-urile advisory per user (luate în ordinea id-urilor)
+-- serializează recalculările, deci a doua vede datele primei; rândurile
+-- sunt scrise cu upsert și sunt șterse doar cheile care nu mai există.
+-- Reconstrucția completă ia lock-ul global exclusiv, recalculările per
+-- user îl iau partajat.
+CREATE OR REPLACE FUNCTION recalculeaza_venituri_anuale(p_user_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_randuri INTEGER;
+BEGIN
+    IF p_user_ids IS NULL THEN
+        PERFORM pg_advisory_xact_lock(hashtext('venituri_anuale'));
+    ELSE
+        PERFORM pg_advisory_xact_lock_shared(hashtext('venituri_anuale'));
+        PERFORM pg_advisory_xact_lock(hashtextextended('venituri_anuale:' || u::text, 0))
+        FROM (SELECT DISTINCT unnest(p_user_ids) AS u ORDER BY 1) useri;
+    END IF;
+
+    WITH noi AS (
+        SELECT
+            cp.user_id,
+            a.an,
+            c.moneda,
+            SUM(
+                c.chirie_lunara
+                * luni_active(c.data_inceput, c.data_sfarsit, a.an)
+                * COALESCE(ip.procent_proprietate, 100) / 100
+            ) AS venit_brut,
+            COUNT(*) AS nr_contracte
+        FROM contracte c
+        JOIN contracte_proprietari cp ON cp.contract_id = c.id
+        LEFT JOIN imobile_proprietari ip ON ip.imobil_id = c.imobil_id AND ip.user_id = cp.user_id
+        CROSS JOIN LATERAL generate_series(
+            EXTRACT(YEAR FROM c.data_inceput)::INTEGER,
+            COALESCE(
+                EXTRACT(YEAR FROM c.data_sfarsit)::INTEGER,
+                GREATEST(EXTRACT(YEAR FROM c.data_inceput)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1)
+            )
+        ) AS a(an)
+        WHERE p_user_ids IS NULL OR cp.user_id = ANY(p_user_ids)
+        GROUP BY cp.user_id, a.an, c.moneda
+    ),
+    scrise AS (
+        INSERT INTO venituri_anuale (user_id, an_fiscal, moneda, venit_brut, nr_contracte)
+        SELECT user_id, an, moneda, venit_brut, nr_contracte FROM noi
+        ON CONFLICT (user_id, an_fiscal, moneda) DO UPDATE
+        SET venit_brut = EXCLUDED.venit_brut,
+            nr_contracte = EXCLUDED.nr_contracte,
+            actualizat_la = now()
+        RETURNING 1
+    ),
+    sterse AS (
+        DELETE FROM venituri_anuale v
+        WHERE (p_user_ids IS NULL OR v.user_id = ANY(p_user_ids))
+          AND NOT EXISTS (
+              SELECT 1 FROM noi n
+              WHERE n.user_id = v.user_id AND n.an = v.an_fiscal AND n.moneda = v.moneda
+          )
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM scrise) INTO v_randuri;
+
+    RETURN v_randuri;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reconstrucție completă (backfill după migrare, la început de an
+-- sau după modificări făcute cu triggerele dezactivate)
+CREATE OR REPLACE FUNCTION reconstruieste_venituri_anuale()
+RETURNS INTEGER AS $$
+DECLARE
+    v_randuri INTEGER;
+BEGIN
+    v_randuri := recalculeaza_venituri_anuale(NULL);
+
+    INSERT INTO venituri_anuale_acoperire (id, an_maxim, reconstruit_la)
+    VALUES (TRUE, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1, now())
+    ON CONFLICT (id) DO UPDATE
+    SET an_maxim = EXCLUDED.an_maxim, reconstruit_la = EXCLUDED.reconstruit_la;
+
+    RETURN v_randuri;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reconstrucția anuală (1 ianuarie, 03:00) dacă pg_cron e disponibil
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'venituri-anuale-an-nou',
+            '0 3 1 1 *',
+            'SELECT reconstruieste_venituri_anuale()'
+        );
+    END IF;
+END;
+$$;
+
+-- ================================================================
+-- PARTE 3: TRIGGERE
+-- ================================================================
+
+-- Triggere la nivel de statement cu tabele de tranziție: un import de
+-- 500 de contracte recalculează o singură dată fiecare user afectat.
+-- Ștergerea unui contract ajunge aici prin ON DELETE CASCADE pe
+-- contracte_proprietari, deci e tratată de triggerul acelui tabel.
+
+CREATE OR REPLACE FUNCTION venituri_anuale_contracte()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM recalculeaza_venituri_anuale(ARRAY(
+        SELECT DISTINCT cp.user_id
+        FROM contracte_proprietari cp
+        WHERE cp.contract_id IN (SELECT id FROM contracte_noi)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION venituri_anuale_proprietari()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_useri UUID[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_useri := ARRAY(SELECT DISTINCT user_id FROM proprietari_noi);
+    ELSIF TG_OP = 'DELETE' THEN
+        v_useri := ARRAY(SELECT DISTINCT user_id FROM proprietari_vechi);
+    ELSE
+        v_useri := ARRAY(
+            SELECT user_id FROM proprietari_noi
+            UNION
+            SELECT user_id FROM proprietari_vechi
+        );
+    END IF;
+
+    IF cardinality(v_useri) > 0 THEN
+        PERFORM recalculeaza_venituri_anuale(v_useri);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS venituri_anuale_contracte_update ON contracte;
+CREATE TRIGGER venituri_anuale_contracte_update
+    AFTER UPDATE ON contracte
+    REFERENCING NEW TABLE AS contracte_noi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_contracte();
+
+DROP TRIGGER IF EXISTS venituri_anuale_cp_insert ON contracte_proprietari;
+CREATE TRIGGER venituri_anuale_cp_insert
+    AFTER INSERT ON contracte_proprietari
+    REFERENCING NEW TABLE AS proprietari_noi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+DROP TRIGGER IF EXISTS venituri_anuale_cp_update ON contracte_proprietari;
+CREATE TRIGGER venituri_anuale_cp_update
+    AFTER UPDATE ON contracte_proprietari
+    REFERENCING OLD TABLE AS proprietari_vechi NEW TABLE AS proprietari_noi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+DROP TRIGGER IF EXISTS venituri_anuale_cp_delete ON contracte_proprietari;
+CREATE TRIGGER venituri_anuale_cp_delete
+    AFTER DELETE ON contracte_proprietari
+    REFERENCING OLD TABLE AS proprietari_vechi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+DROP TRIGGER IF EXISTS venituri_anuale_ip_insert ON imobile_proprietari;
+CREATE TRIGGER venituri_anuale_ip_insert
+    AFTER INSERT ON imobile_proprietari
+    REFERENCING NEW TABLE AS proprietari_noi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+DROP TRIGGER IF EXISTS venituri_anuale_ip_update ON imobile_proprietari;
+CREATE TRIGGER venituri_anuale_ip_update
+    AFTER UPDATE ON imobile_proprietari
+    REFERENCING OLD TABLE AS proprietari_vechi NEW TABLE AS proprietari_noi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+DROP TRIGGER IF EXISTS venituri_anuale_ip_delete ON imobile_proprietari;
+CREATE TRIGGER venituri_anuale_ip_delete
+    AFTER DELETE ON imobile_proprietari
+    REFERENCING OLD TABLE AS proprietari_vechi
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION venituri_anuale_proprietari();
+
+-- ================================================================
+-- PARTE 4: BACKFILL ȘI VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ ROLLUP venituri_anuale CREAT!' AS status,
+    reconstruieste_venituri_anuale() AS randuri_calculate;
+
+SELECT an_maxim AS an_acoperit, reconstruit_la FROM venituri_anuale_acoperire;
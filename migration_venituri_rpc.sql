@@ -0,0 +1,95 @@
+-- ================================================================
+-- PROPRIETO ANAF 2026 - Agregare fiscală pe server (RPC)
+-- Totaluri anuale per (user, an fiscal, monedă) calculate în Postgres
+-- ================================================================
+--
+-- INSTRUCȚIUNI:
+-- 1. Mergi la Supabase Dashboard → SQL Editor
+-- 2. Creează o "New Query"
+-- 3. Copiază și rulează acest script complet
+-- 4. Verifică că vezi "Success" pentru toate comenzile
+--
+-- Aplicația apelează funcția prin supabase.rpc("venituri_anuale", ...)
+-- și aplică în Python doar conversia valutară și pragurile CASS.
+--
+-- ================================================================
+
+-- ================================================================
+-- PARTE 1: LUNI ACTIVE ÎNTR-UN AN FISCAL
+-- ================================================================
+
+-- Aceeași regulă ca app.calculeaza_luni_active: luni întregi între
+-- capete (data de start + N luni, cu ziua limitată la sfârșitul lunii)
+-- plus o lună pentru orice rest de zile, plafonat la 12
+CREATE OR REPLACE FUNCTION luni_active(p_start DATE, p_end DATE, p_an_fiscal INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_start DATE := GREATEST(p_start, make_date(p_an_fiscal, 1, 1));
+    v_end DATE := LEAST(COALESCE(p_end, make_date(p_an_fiscal, 12, 31)), make_date(p_an_fiscal, 12, 31));
+    v_luni INTEGER;
+BEGIN
+    IF v_start > v_end THEN
+        RETURN 0;
+    END IF;
+
+    v_luni := (EXTRACT(YEAR FROM v_end)::INTEGER - EXTRACT(YEAR FROM v_start)::INTEGER) * 12
+            + EXTRACT(MONTH FROM v_end)::INTEGER - EXTRACT(MONTH FROM v_start)::INTEGER;
+
+    -- Luni întregi
+    IF (v_start + make_interval(months => v_luni))::DATE > v_end THEN
+        v_luni := v_luni - 1;
+    END IF;
+
+    -- Lună parțială
+    IF (v_start + make_interval(months => v_luni))::DATE < v_end THEN
+        v_luni := v_luni + 1;
+    END IF;
+
+    RETURN LEAST(v_luni, 12);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- ================================================================
+-- PARTE 2: VENITURI ANUALE PER USER
+-- ================================================================
+
+-- Un rând per (user, an fiscal, monedă) cu venitul brut în moneda
+-- contractelor, după aplicarea cotei de proprietate a userului.
+-- p_user_ids NULL = toți userii (folosit din panoul de administrare)
+CREATE OR REPLACE FUNCTION venituri_anuale(
+    p_an_fiscal INTEGER,
+    p_user_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+    user_id UUID,
+    an_fiscal INTEGER,
+    moneda TEXT,
+    venit_brut NUMERIC,
+    nr_contracte BIGINT
+) AS $$
+    SELECT
+        cp.user_id,
+        p_an_fiscal,
+        c.moneda,
+        SUM(
+            c.chirie_lunara
+            * luni_active(c.data_inceput, c.data_sfarsit, p_an_fiscal)
+            * COALESCE(ip.procent_proprietate, 100) / 100
+        ),
+        COUNT(*)
+    FROM contracte c
+    JOIN contracte_proprietari cp ON cp.contract_id = c.id
+    LEFT JOIN imobile_proprietari ip ON ip.imobil_id = c.imobil_id AND ip.user_id = cp.user_id
+    WHERE (p_user_ids IS NULL OR cp.user_id = ANY(p_user_ids))
+      AND c.data_inceput <= make_date(p_an_fiscal, 12, 31)
+      AND (c.data_sfarsit IS NULL OR c.data_sfarsit >= make_date(p_an_fiscal, 1, 1))
+    GROUP BY cp.user_id, c.moneda;
+$$ LANGUAGE sql STABLE;
+
+-- ================================================================
+-- PARTE 3: VERIFICĂRI FINALE
+-- ================================================================
+
+SELECT
+    '✅ RPC venituri_anuale CREAT!' AS status,
+    (SELECT COUNT(*) FROM venituri_anuale(EXTRACT(YEAR FROM now())::INTEGER)) AS randuri_an_curent;
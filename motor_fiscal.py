@@ -0,0 +1,439 @@
+"""
+Motor fiscal vectorizat pentru Proprieto ANAF 2026
+Calculează lunile active, venitul brut și taxele (impozit + CASS) pentru
+portofolii întregi de contracte într-o singură trecere NumPy
+"""
+
+import calendar
+import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# --- CONSTANTE FISCALE 2026 ---
+SALARIU_MINIM = 4050
+CURS_BNR_DEFAULT = 5.02
+CURS_USD_DEFAULT = 4.40
+
+# Cursuri folosite când nu există cursuri BNR încărcate pentru anul cerut
+CURSURI_DEFAULT = {"EUR": CURS_BNR_DEFAULT, "USD": CURS_USD_DEFAULT}
+
+COTA_FORFETARA = 0.20   # Deducere forfetară 20%
+COTA_IMPOZIT = 0.10     # Impozit 10% din venitul net
+COTA_CASS = 0.10        # CASS 10% din baza de calcul
+PRAGURI_CASS = (6, 12, 24)  # Număr de salarii minime pentru pragurile 1/2/3
+
+# Parametrii fiscali ai unui an (un rând din tabelul parametri_fiscali);
+# valorile 2026 de mai sus sunt folosite când registrul nu e disponibil
+PARAMETRI_DEFAULT = {
+    "salariu_minim": SALARIU_MINIM,
+    "cota_forfetara": COTA_FORFETARA,
+    "cota_impozit": COTA_IMPOZIT,
+    "cota_cass": COTA_CASS,
+    "praguri_cass": PRAGURI_CASS,
+}
+
+_NAT = np.datetime64("NaT", "D")
+
+
+def _ca_zile(valori) -> np.ndarray:
+    """Convertește o coloană de date (date, str ISO, None) în datetime64[D]"""
+    if isinstance(valori, np.ndarray) and valori.dtype.kind == "M":
+        return valori.astype("datetime64[D]")
+
+    return np.array(
+        [_NAT if v is None or v == "" else np.datetime64(v, "D") for v in valori],
+        dtype="datetime64[D]"
+    )
+
+
+def _ancora(luna_start: np.ndarray, zi_start: np.ndarray, luni: np.ndarray) -> np.ndarray:
+    """Data de start + `luni` luni, cu ziua limitată la lungimea lunii (ca relativedelta)"""
+    luna = luna_start + luni.astype("timedelta64[M]")
+    prima_zi = luna.astype("datetime64[D]")
+    zile_luna = ((luna + 1).astype("datetime64[D]") - prima_zi).astype(np.int64)
+    return prima_zi + np.minimum(zi_start, zile_luna - 1).astype("timedelta64[D]")
+
+
+def luni_active_vector(data_start, data_end, an_fiscal: int) -> np.ndarray:
+    """
+    Calculează lunile active într-un an fiscal pentru o coloană de contracte
+
+    Reproduce exact regula din `calculeaza_luni_active`: numărul de luni
+    întregi dintre capete (ca `relativedelta`) plus o lună pentru orice
+    rest de zile, plafonat la 12.
+
+    Args:
+        data_start: Coloana cu datele de început (obligatorii)
+        data_end: Coloana cu datele de sfârșit (None/NaT = nedeterminat)
+        an_fiscal: Anul fiscal
+
+    Returns:
+        Array int64 cu numărul de luni active (0-12) pentru fiecare contract
+    """
+    data_start = _ca_zile(data_start)
+    data_end = _ca_zile(data_end)
+
+    start_fiscal = np.datetime64(f"{an_fiscal:04d}-01-01", "D")
+    end_fiscal = np.datetime64(f"{an_fiscal:04d}-12-31", "D")
+
+    # Intersecție cu anul fiscal
+    start = np.maximum(data_start, start_fiscal)
+    end = np.where(np.isnat(data_end), end_fiscal, np.minimum(data_end, end_fiscal))
+
+    luna_start = start.astype("datetime64[M]")
+    zi_start = (start - luna_start.astype("datetime64[D]")).astype(np.int64)
+
+    # Luni întregi: diferența de luni, minus una dacă ancora depășește sfârșitul
+    luni = (end.astype("datetime64[M]") - luna_start).astype(np.int64)
+    luni = np.where(_ancora(luna_start, zi_start, luni) > end, luni - 1, luni)
+
+    # Luni parțiale: orice zi rămasă după ancoră contează ca lună
+    luni = luni + (end > _ancora(luna_start, zi_start, luni))
+
+    return np.where(start > end, 0, np.minimum(luni, 12)).astype(np.int64)
+
+
+def adauga_luni(data: datetime.date, luni: int) -> datetime.date:
+    """Data + N luni, cu ziua limitată la sfârșitul lunii (31 ian + 1 = 28/29 feb)"""
+    total = data.month - 1 + luni
+    an, luna = data.year + total // 12, total % 12 + 1
+    return datetime.date(an, luna, min(data.day, calendar.monthrange(an, luna)[1]))
+
+
+def luni_active(data_start: datetime.date, data_end: Optional[datetime.date], an_fiscal: int) -> int:
+    """
+    Varianta scalară a `luni_active_vector`, pentru un singur contract
+    (aceeași regulă, fără costul fix al unui apel NumPy)
+    """
+    start = max(data_start, datetime.date(an_fiscal, 1, 1))
+    end = min(data_end or datetime.date(an_fiscal, 12, 31), datetime.date(an_fiscal, 12, 31))
+
+    if start > end:
+        return 0
+
+    luni = (end.year - start.year) * 12 + end.month - start.month
+    if adauga_luni(start, luni) > end:
+        luni -= 1
+    if adauga_luni(start, luni) < end:
+        luni += 1
+
+    return min(luni, 12)
+
+
+def parametri_pentru_an(registru: Dict[int, Dict], an_fiscal: int) -> Dict:
+    """
+    Parametrii în vigoare într-un an: ultimul an din registru ≤ an_fiscal
+    (un an fără rând moștenește valorile anului anterior)
+
+    Args:
+        registru: {an: parametri} (vezi parametri_fiscali.get_registru)
+    """
+    ani = [an for an in registru if an <= an_fiscal]
+    if ani:
+        return {**PARAMETRI_DEFAULT, **registru[max(ani)]}
+    if registru:
+        return {**PARAMETRI_DEFAULT, **registru[min(registru)]}
+    return dict(PARAMETRI_DEFAULT)
+
+
+def _parametri(parametri: Optional[Dict], salariu_minim: Optional[float]) -> Dict:
+    parametri = {**PARAMETRI_DEFAULT, **(parametri or {})}
+    if salariu_minim is not None:
+        parametri["salariu_minim"] = salariu_minim
+    return parametri
+
+
+def _coloane_parametri(seturi: List[Dict]) -> tuple:
+    """Cotele ca array-uri (n,) și pragurile CASS în RON ca array (n, 3)"""
+    def coloana(cheie):
+        return np.array([p[cheie] for p in seturi], dtype=np.float64)
+
+    praguri = np.array(
+        [[n * p["salariu_minim"] for n in p["praguri_cass"]] for p in seturi],
+        dtype=np.float64
+    ).reshape(len(seturi), -1)
+    return coloana("cota_forfetara"), coloana("cota_impozit"), coloana("cota_cass"), praguri
+
+
+def _taxe(brut: np.ndarray, forfetara, impozit, cota_cass, praguri) -> Dict[str, np.ndarray]:
+    """
+    Formula comună: parametrii pot fi scalari sau array-uri care se
+    broadcast-ează cu `brut` (praguri are în plus o axă finală de 3)
+    """
+    net = brut * (1 - forfetara)
+    peste = net[..., None] >= praguri
+
+    # Pragul = numărul de praguri atinse; baza CASS = cel mai mare prag atins
+    prag = peste.sum(axis=-1)
+    baza = np.where(peste, praguri, 0.0).max(axis=-1)
+    cass = baza * cota_cass
+    impozit = net * impozit
+
+    return {
+        "brut": brut,
+        "net": net,
+        "impozit": impozit,
+        "cass": cass,
+        "prag": prag.astype(np.int64),
+        "total_taxe": impozit + cass
+    }
+
+
+def calculeaza_taxe_vector(
+    venit_brut_ron,
+    salariu_minim: Optional[float] = None,
+    parametri: Optional[Dict] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calcul taxe ANAF conform legislației 2026 pentru o coloană de venituri
+
+    Args:
+        venit_brut_ron: Venituri brute anuale în RON
+        salariu_minim: Salariul minim brut folosit pentru pragurile CASS
+            (suprascrie valoarea din `parametri`)
+        parametri: Parametrii fiscali ai anului (implicit PARAMETRI_DEFAULT)
+
+    Returns:
+        Dict cu array-urile brut, net, impozit, cass, prag și total_taxe
+    """
+    p = _parametri(parametri, salariu_minim)
+    brut = np.asarray(venit_brut_ron, dtype=np.float64)
+
+    # Praguri CASS conform Codului Fiscal (6/12/24 salarii minime)
+    praguri = np.array([n * p["salariu_minim"] for n in p["praguri_cass"]], dtype=np.float64)
+
+    return _taxe(brut, p["cota_forfetara"], p["cota_impozit"], p["cota_cass"], praguri)
+
+
+def calculeaza_taxe(
+    venit_brut_ron: float,
+    salariu_minim: Optional[float] = None,
+    parametri: Optional[Dict] = None
+) -> Dict[str, object]:
+    """
+    Calcul taxe ANAF pentru un singur venit, cu explicația pragului CASS
+
+    Args:
+        venit_brut_ron: Venitul brut anual în RON
+        salariu_minim: Salariul minim brut pentru pragurile CASS
+        parametri: Parametrii fiscali ai anului (implicit PARAMETRI_DEFAULT)
+
+    Returns:
+        Dict cu brut, net, impozit, cass, prag, explicatie și total_taxe
+    """
+    p = _parametri(parametri, salariu_minim)
+    taxe = calculeaza_taxe_vector([venit_brut_ron], parametri=p)
+    prag = int(taxe["prag"][0])
+
+    # Praguri CASS conform Codului Fiscal
+    n6, n12, n24 = p["praguri_cass"]
+    p6, p12, p24 = (n * p["salariu_minim"] for n in p["praguri_cass"])
+
+    if prag == 3:
+        explicatie = f"Venit net ≥ {p24:,.0f} RON → CASS pe {n24} salarii"
+    elif prag == 2:
+        explicatie = f"Venit net ≥ {p12:,.0f} RON → CASS pe {n12} salarii"
+    elif prag == 1:
+        explicatie = f"Venit net ≥ {p6:,.0f} RON → CASS pe {n6} salarii"
+    else:
+        explicatie = f"Venit net < {p6:,.0f} RON → Fără CASS"
+
+    return {
+        "brut": venit_brut_ron,
+        "net": float(taxe["net"][0]),
+        "impozit": float(taxe["impozit"][0]),
+        "cass": float(taxe["cass"][0]),
+        "prag": prag,
+        "explicatie": explicatie,
+        "total_taxe": float(taxe["total_taxe"][0])
+    }
+
+
+def simuleaza_scenarii(venit_brut_ron, scenarii: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Reevaluează taxele tuturor userilor sub mai multe seturi de parametri
+    într-o singură trecere (broadcast scenarii × useri)
+
+    Args:
+        venit_brut_ron: Venitul brut anual în RON al fiecărui user
+        scenarii: Parametri fiscali per scenariu (cheile lipsă iau valorile
+            din PARAMETRI_DEFAULT)
+
+    Returns:
+        Dict cu array-uri (n_scenarii, n_useri): brut, net, impozit, cass,
+        prag, total_taxe
+    """
+    forfetara, impozit, cota_cass, praguri = _coloane_parametri([_parametri(p, None) for p in scenarii])
+    brut = np.asarray(venit_brut_ron, dtype=np.float64)[None, :]
+
+    return _taxe(brut, forfetara[:, None], impozit[:, None], cota_cass[:, None], praguri[:, None, :])
+
+
+def rezumat_scenarii(taxe: Dict[str, np.ndarray]) -> List[Dict]:
+    """Totalurile pe portofoliu ale fiecărui scenariu din `simuleaza_scenarii`"""
+    praguri = np.stack([(taxe["prag"] == k).sum(axis=1) for k in range(4)], axis=1)
+    return [
+        {
+            "impozit": float(impozit),
+            "cass": float(cass),
+            "total_taxe": float(total),
+            "useri_per_prag": [int(n) for n in nr],
+        }
+        for impozit, cass, total, nr in zip(
+            taxe["impozit"].sum(axis=1), taxe["cass"].sum(axis=1), taxe["total_taxe"].sum(axis=1), praguri
+        )
+    ]
+
+
+def factori_curs(moneda, curs: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Factorii de conversie în RON pentru o coloană de monede
+
+    Args:
+        moneda: Coloana cu codurile de monedă (RON, EUR, USD)
+        curs: Cursuri față de RON; implicit CURSURI_DEFAULT
+
+    Returns:
+        Array float64 cu factorul de conversie pentru fiecare contract
+    """
+    if curs is None:
+        curs = CURSURI_DEFAULT
+
+    moneda = np.asarray(moneda, dtype=object)
+    factori = np.ones(len(moneda), dtype=np.float64)
+    for cod, valoare in curs.items():
+        factori[moneda == cod] = valoare
+
+    return factori
+
+
+def curs_pentru_an(an_fiscal: int, cursuri=None) -> Dict[str, float]:
+    """
+    Cursurile de conversie pentru un an fiscal: media anuală BNR pentru
+    monedele cu cursuri încărcate, CURSURI_DEFAULT pentru restul
+
+    Args:
+        cursuri: Un `curs_bnr.CursuriBNR` (sau None pentru valorile implicite)
+    """
+    if cursuri is None:
+        return dict(CURSURI_DEFAULT)
+    return {**CURSURI_DEFAULT, **cursuri.medii_anuale(an_fiscal)}
+
+
+def calculeaza_portofoliu(
+    user_idx,
+    data_start,
+    data_end,
+    chirie,
+    moneda,
+    procent,
+    ani: Sequence[int],
+    n_useri: Optional[int] = None,
+    curs: Optional[Dict[str, float]] = None,
+    salariu_minim: Optional[float] = None,
+    cursuri=None,
+    parametri: Optional[Dict] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calculează veniturile și taxele pentru un portofoliu întreg
+
+    Fiecare poziție din coloane descrie o cotă a unui user dintr-un contract.
+
+    Args:
+        user_idx: Indexul userului (0..n_useri-1) pentru fiecare rând
+        data_start: Datele de început ale contractelor
+        data_end: Datele de sfârșit (None/NaT = nedeterminat)
+        chirie: Chiria lunară în moneda contractului
+        moneda: Codul monedei contractului
+        procent: Cota de proprietate a userului (0-100)
+        ani: Anii fiscali de calculat
+        n_useri: Numărul de useri (implicit max(user_idx) + 1)
+        curs: Cursuri față de RON, aceleași pentru toți anii (vezi `factori_curs`)
+        salariu_minim: Salariul minim brut pentru pragurile CASS
+        cursuri: `curs_bnr.CursuriBNR`; dacă `curs` lipsește, fiecare an e
+            convertit cu media anuală BNR (vezi `curs_pentru_an`)
+        parametri: Parametrii fiscali: un set pentru toți anii sau registrul
+            {an: parametri} (vezi `parametri_pentru_an`)
+
+    Returns:
+        Dict cu array-uri de formă (n_useri, len(ani)): brut, net,
+        impozit, cass, prag, total_taxe
+    """
+    user_idx = np.asarray(user_idx, dtype=np.int64)
+    data_start = _ca_zile(data_start)
+    data_end = _ca_zile(data_end)
+
+    if n_useri is None:
+        n_useri = int(user_idx.max()) + 1 if len(user_idx) else 0
+
+    # Venit lunar în moneda contractului corespunzător cotei fiecărui user
+    lunar = np.asarray(chirie, dtype=np.float64) * np.asarray(procent, dtype=np.float64) / 100
+
+    # Monedele distincte o singură dată; per an se schimbă doar cursul lor
+    monede, cod_moneda = np.unique(np.asarray(moneda, dtype=object).astype(str), return_inverse=True)
+
+    brut = np.zeros((n_useri, len(ani)), dtype=np.float64)
+    for j, an in enumerate(ani):
+        factori = factori_curs(monede, curs if curs is not None else curs_pentru_an(an, cursuri))
+        luni = luni_active_vector(data_start, data_end, an)
+        brut[:, j] = np.bincount(user_idx, weights=lunar * factori[cod_moneda] * luni, minlength=n_useri)
+
+    # Registru {an: parametri}: fiecare coloană (an) cu parametrii ei
+    if parametri and all(isinstance(an, int) for an in parametri):
+        forfetara, impozit, cota_cass, praguri = _coloane_parametri(
+            [_parametri(parametri_pentru_an(parametri, an), salariu_minim) for an in ani]
+        )
+        return _taxe(brut, forfetara[None, :], impozit[None, :], cota_cass[None, :], praguri[None, :, :])
+
+    return calculeaza_taxe_vector(brut, salariu_minim, parametri)
+
+
+def coloane_contracte(contracte: List[Dict], user_ids: Optional[List[str]] = None) -> Dict[str, object]:
+    """
+    Transformă rânduri de contracte (dict-uri Supabase) în coloane pentru motor
+
+    Fiecare rând trebuie să aibă user_id, data_inceput, data_sfarsit,
+    chirie_lunara, moneda și, opțional, procent_proprietate (lipsă sau
+    NULL = 100).
+
+    Args:
+        contracte: Lista de rânduri
+        user_ids: Ordinea userilor în rezultat (implicit ordinea apariției)
+
+    Returns:
+        Dict cu user_ids și coloanele acceptate de `calculeaza_portofoliu`
+    """
+    if user_ids is None:
+        user_ids = list(dict.fromkeys(c['user_id'] for c in contracte))
+    index = {uid: i for i, uid in enumerate(user_ids)}
+
+    return {
+        "user_ids": user_ids,
+        "user_idx": np.array([index[c['user_id']] for c in contracte], dtype=np.int64),
+        "data_start": _ca_zile([c['data_inceput'] for c in contracte]),
+        "data_end": _ca_zile([c.get('data_sfarsit') for c in contracte]),
+        "chirie": np.array([c['chirie_lunara'] for c in contracte], dtype=np.float64),
+        "moneda": np.array([c.get('moneda') or 'RON' for c in contracte], dtype=object),
+        "procent": np.array([c.get('procent_proprietate') or 100 for c in contracte], dtype=np.float64),
+    }
+
+
+def brut_ron_din_totaluri(totaluri: List[Dict], curs: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Însumează în RON totalurile pe monede din venituri_anuale (tabel sau RPC)
+
+    Args:
+        totaluri: Rânduri {user_id, moneda, venit_brut, ...}
+        curs: Cursuri față de RON (vezi `factori_curs`)
+
+    Returns:
+        {user_id: venit brut anual în RON}, gata pentru calculul taxelor
+    """
+    factori = factori_curs([t.get('moneda') or 'RON' for t in totaluri], curs)
+
+    venituri: Dict[str, float] = {}
+    for t, factor in zip(totaluri, factori):
+        venituri[t['user_id']] = venituri.get(t['user_id'], 0.0) + float(t['venit_brut']) * factor
+
+    return venituri
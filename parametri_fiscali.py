@@ -0,0 +1,116 @@
+"""
+Registrul parametrilor fiscali pentru Proprieto
+Salariul minim, cotele (forfetară, impozit, CASS) și pragurile CASS pe ani,
+din tabelul parametri_fiscali, încărcat o dată per proces și memorat
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+from supabase import Client
+
+import motor_fiscal
+
+CACHE_TTL = 3600  # secunde
+CACHE_TTL_EROARE = 60  # fără tabel (migrare neaplicată) nu re-interogăm la fiecare calcul
+
+COLOANE = "an_fiscal, salariu_minim, cota_forfetara, cota_impozit, cota_cass, praguri_cass"
+
+_registru: Optional[Dict[int, Dict]] = None
+_expira = 0.0
+_lock = threading.Lock()
+
+
+def _din_rand(rand: Dict) -> Dict:
+    return {
+        "salariu_minim": float(rand['salariu_minim']),
+        "cota_forfetara": float(rand['cota_forfetara']),
+        "cota_impozit": float(rand['cota_impozit']),
+        "cota_cass": float(rand['cota_cass']),
+        "praguri_cass": tuple(int(n) for n in rand['praguri_cass']),
+    }
+
+
+def get_registru(supabase: Client) -> Dict[int, Dict]:
+    """
+    {an_fiscal: parametri} pentru toți anii din tabel
+
+    Citit o dată per proces (TTL CACHE_TTL, invalidat la salvare). Fără
+    migrare sau la eroare întoarce un registru gol, deci motorul fiscal
+    folosește PARAMETRI_DEFAULT.
+    """
+    global _registru, _expira
+    with _lock:
+        if _registru is not None and _expira > time.monotonic():
+            return _registru
+
+    ttl = CACHE_TTL
+    try:
+        result = supabase.table("parametri_fiscali")\
+            .select(COLOANE)\
+            .order("an_fiscal")\
+            .execute()
+        registru = {int(r['an_fiscal']): _din_rand(r) for r in (result.data or [])}
+    except Exception:
+        registru, ttl = {}, CACHE_TTL_EROARE
+
+    with _lock:
+        _registru, _expira = registru, time.monotonic() + ttl
+    return registru
+
+
+def invalideaza_registru():
+    global _registru
+    with _lock:
+        _registru = None
+
+
+def get_parametri(supabase: Client, an_fiscal: int) -> Dict:
+    """Parametrii în vigoare într-un an (ultimul an din registru ≤ an_fiscal)"""
+    return motor_fiscal.parametri_pentru_an(get_registru(supabase), an_fiscal)
+
+
+def valideaza_parametri(parametri: Dict) -> Tuple[bool, str]:
+    """Verifică un set de parametri înainte de salvare sau simulare"""
+    if parametri['salariu_minim'] <= 0:
+        return False, "Salariul minim trebuie să fie pozitiv"
+
+    for cheie, nume in (("cota_forfetara", "Cota forfetară"), ("cota_impozit", "Cota de impozit"), ("cota_cass", "Cota CASS")):
+        if not 0 <= parametri[cheie] <= 1:
+            return False, f"{nume} trebuie să fie între 0% și 100%"
+
+    praguri = list(parametri['praguri_cass'])
+    if len(praguri) != 3 or praguri[0] <= 0 or praguri != sorted(set(praguri)):
+        return False, "Pragurile CASS trebuie să fie 3 numere pozitive, crescătoare"
+
+    return True, ""
+
+
+def salveaza_parametri(supabase: Client, an_fiscal: int, parametri: Dict) -> Tuple[bool, str]:
+    """
+    Salvează (upsert) parametrii unui an și invalidează registrul memorat
+
+    Returns:
+        (success, message)
+    """
+    valid, mesaj = valideaza_parametri(parametri)
+    if not valid:
+        return False, mesaj
+
+    try:
+        supabase.table("parametri_fiscali").upsert({
+            "an_fiscal": an_fiscal,
+            "salariu_minim": parametri['salariu_minim'],
+            "cota_forfetara": parametri['cota_forfetara'],
+            "cota_impozit": parametri['cota_impozit'],
+            "cota_cass": parametri['cota_cass'],
+            "praguri_cass": list(parametri['praguri_cass']),
+            "actualizat_de": st.session_state.get("user_id"),
+        }, on_conflict="an_fiscal").execute()
+
+        invalideaza_registru()
+        return True, f"Parametrii pentru {an_fiscal} au fost salvați!"
+    except Exception as e:
+        return False, f"Eroare: {str(e)}"
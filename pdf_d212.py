@@ -0,0 +1,196 @@
+"""
+Modul pentru ghidurile PDF D212 în Proprieto
+Generare cu cache după conținut (LRU) și export în masă pentru toți
+utilizatorii, randat pe un pool de procese și scris direct într-un ZIP
+"""
+
+import hashlib
+import json
+import multiprocessing
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import motor_fiscal
+
+# Se incrementează la orice schimbare de conținut/aspect a ghidului,
+# ca PDF-urile memorate cu șablonul vechi să nu mai fie refolosite
+VERSIUNE_SABLON = 2
+
+CACHE_MAX_PDF = 256
+
+_cache_pdf: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _procent(cota: float) -> str:
+    return f"{cota * 100:g}%"
+
+
+def genereaza_pdf_d212(fisc: Dict, an_fiscal: int, parametri: Optional[Dict] = None) -> bytes:
+    """
+    Generează PDF cu instrucțiuni D212 (fără cache)
+
+    Args:
+        parametri: Parametrii fiscali ai anului (parametri_fiscali.get_parametri),
+            pentru cotele afișate; implicit motor_fiscal.PARAMETRI_DEFAULT
+    """
+    # fpdf se încarcă abia la primul PDF, nu la fiecare pornire a aplicației
+    from fpdf import FPDF
+
+    parametri = parametri or motor_fiscal.PARAMETRI_DEFAULT
+
+    try:
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.cell(0, 10, f"Ghid Completare D212 - An Fiscal {an_fiscal}", ln=True, align="C")
+
+        pdf.set_font("Helvetica", "", 11)
+        pdf.ln(10)
+
+        # Secțiunea I - Date identificare
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, "SECTIUNEA I - Date de identificare", ln=True)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.multi_cell(0, 6, "Completeaza CNP, nume, prenume si adresa conform CI.")
+        pdf.ln(5)
+
+        # Secțiunea II - Venituri
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, "SECTIUNEA II - Venituri din cedarea folosintei bunurilor", ln=True)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.cell(0, 6, f"Rd. 01 - Venit brut: {fisc['brut']:,.2f} RON", ln=True)
+        pdf.cell(
+            0, 6,
+            f"Rd. 02 - Cheltuieli forfetare ({_procent(parametri['cota_forfetara'])}): "
+            f"{fisc['brut'] - fisc['net']:,.2f} RON",
+            ln=True
+        )
+        pdf.cell(0, 6, f"Rd. 03 - Venit net anual: {fisc['net']:,.2f} RON", ln=True)
+        pdf.ln(5)
+
+        # Secțiunea III - Impozit
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, "SECTIUNEA III - Calculul impozitului", ln=True)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.cell(
+            0, 6,
+            f"Impozit datorat ({_procent(parametri['cota_impozit'])} din venit net): {fisc['impozit']:,.2f} RON",
+            ln=True
+        )
+        pdf.ln(5)
+
+        # Secțiunea IV - CASS
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, "SECTIUNEA IV - Contributia de asigurari sociale de sanatate", ln=True)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.cell(0, 6, f"BIFEAZA PRAGUL {fisc['prag']} (vezi instructiuni)", ln=True)
+        pdf.cell(0, 6, f"CASS datorat: {fisc['cass']:,.2f} RON", ln=True)
+
+        # Explicație fără caractere speciale
+        explicatie_clean = fisc['explicatie'].replace('≥', '>=').replace('→', '->')
+        pdf.multi_cell(0, 6, f"Explicatie: {explicatie_clean}")
+        pdf.ln(5)
+
+        # Total
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, f"TOTAL DE PLATA: {fisc['total_taxe']:,.2f} RON", ln=True, border=1, align="C")
+
+        return bytes(pdf.output())
+    except Exception as e:
+        # Fallback: returnează un PDF minimal
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, f"Rezumat Fiscal {an_fiscal}", ln=True)
+        pdf.set_font("Helvetica", "", 11)
+        pdf.cell(0, 8, f"Venit Brut: {fisc['brut']:,.2f} RON", ln=True)
+        pdf.cell(0, 8, f"Impozit: {fisc['impozit']:,.2f} RON", ln=True)
+        pdf.cell(0, 8, f"CASS: {fisc['cass']:,.2f} RON", ln=True)
+        pdf.cell(0, 8, f"Prag CASS D212: {fisc['prag']}", ln=True)
+        return bytes(pdf.output())
+
+
+def cheie_pdf(fisc: Dict, an_fiscal: int, parametri: Optional[Dict] = None) -> str:
+    """Hash-ul conținutului unui ghid: date fiscale + an + cote + versiunea șablonului"""
+    continut = json.dumps(
+        {"fisc": fisc, "an": an_fiscal, "parametri": parametri, "sablon": VERSIUNE_SABLON},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(continut.encode("utf-8")).hexdigest()
+
+
+def genereaza_pdf_d212_cached(fisc: Dict, an_fiscal: int, parametri: Optional[Dict] = None) -> bytes:
+    """
+    Ca genereaza_pdf_d212, dar refolosește PDF-ul dacă datele nu s-au schimbat
+    (cache LRU per proces, maxim CACHE_MAX_PDF ghiduri)
+    """
+    cheie = cheie_pdf(fisc, an_fiscal, parametri)
+
+    with _cache_lock:
+        pdf = _cache_pdf.get(cheie)
+        if pdf is not None:
+            _cache_pdf.move_to_end(cheie)
+            return pdf
+
+    pdf = genereaza_pdf_d212(fisc, an_fiscal, parametri)
+
+    with _cache_lock:
+        _cache_pdf[cheie] = pdf
+        _cache_pdf.move_to_end(cheie)
+        while len(_cache_pdf) > CACHE_MAX_PDF:
+            _cache_pdf.popitem(last=False)
+
+    return pdf
+
+
+def nume_fisier_pdf(nume: str, user_id: str, an_fiscal: int) -> str:
+    """Nume de fișier sigur pentru ghidul unui utilizator"""
+    nume_curat = re.sub(r'[^A-Za-z0-9]+', '_', nume or '').strip('_') or 'utilizator'
+    return f"D212_{an_fiscal}_{nume_curat}_{str(user_id)[:8]}.pdf"
+
+
+def _randeaza(lucrare: Tuple[str, Dict, int, Optional[Dict]]) -> Tuple[str, bytes]:
+    nume_fisier, fisc, an_fiscal, parametri = lucrare
+    return nume_fisier, genereaza_pdf_d212(fisc, an_fiscal, parametri)
+
+
+def genereaza_zip_d212(
+    ghiduri: List[Tuple[str, Dict]],
+    an_fiscal: int,
+    cale_zip: str,
+    progres: Optional[Callable[[float, str], None]] = None,
+    workers: Optional[int] = None,
+    parametri: Optional[Dict] = None
+) -> int:
+    """
+    Randează ghidurile D212 pe un pool de procese și le scrie într-un ZIP
+
+    Args:
+        ghiduri: Listă (nume fișier, fisc) - câte una per utilizator
+        cale_zip: Fișierul ZIP în care se scrie
+        progres: Apelat cu (fracțiune 0-1, text) după fiecare ghid
+        workers: Numărul de procese (implicit numărul de CPU-uri)
+        parametri: Parametrii fiscali ai anului (cotele afișate în ghid)
+
+    Returns:
+        Numărul de ghiduri scrise
+    """
+    lucrari = [(nume_fisier, fisc, an_fiscal, parametri) for nume_fisier, fisc in ghiduri]
+    total = len(lucrari)
+
+    # spawn: procese curate, fără thread-urile serverului Streamlit
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+            zipfile.ZipFile(cale_zip, "w", compression=zipfile.ZIP_DEFLATED) as arhiva:
+        for i, (nume_fisier, pdf) in enumerate(pool.map(_randeaza, lucrari, chunksize=8), start=1):
+            arhiva.writestr(nume_fisier, pdf)
+            if progres:
+                progres(i / total, f"{i:,} / {total:,} ghiduri")
+
+    return total
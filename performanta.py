@@ -0,0 +1,139 @@
+"""
+Modul de performanță pentru rerun-urile Streamlit în Proprieto
+Importuri amânate pentru dependențele folosite doar la export, stilul CSS
+citit o singură dată per proces și un mod de profilare (?profil=1) care
+măsoară fiecare fază a scriptului
+"""
+
+import functools
+import importlib
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import streamlit as st
+
+# Foaia de stil a aplicației (design system), lângă app.py
+CALE_STIL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stil.css")
+
+# Câte rerun-uri profilate păstrăm per sesiune
+MAX_PROFILE = 20
+
+# Momentul importului acestui modul ≈ pornirea procesului Streamlit
+_PORNIRE_PROCES = time.perf_counter()
+_primul_rerun = True
+_primul_rerun_lock = threading.Lock()
+
+
+class ModulLenes:
+    """
+    Referință la un modul importat abia la primul acces la un atribut
+
+    Exemplu:
+        pd = ModulLenes("pandas")   # nu importă nimic
+        pd.DataFrame(...)           # importă pandas acum, o singură dată
+    """
+
+    def __init__(self, nume: str):
+        self._nume = nume
+        self._modul = None
+
+    def __getattr__(self, atribut: str):
+        if self._modul is None:
+            # import_module e protejat de lock-ul de import, deci e sigur între sesiuni
+            self._modul = importlib.import_module(self._nume)
+        return getattr(self._modul, atribut)
+
+    def __repr__(self) -> str:
+        stare = "încărcat" if self._modul is not None else "neîncărcat"
+        return f"<ModulLenes {self._nume} ({stare})>"
+
+
+# ==================== STIL ====================
+
+@functools.lru_cache(maxsize=4)
+def _css_minificat(cale: str) -> str:
+    """Conținutul foii de stil fără comentarii și spații inutile"""
+    with open(cale, encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def injecteaza_stil(cale: str = CALE_STIL):
+    """
+    Emite foaia de stil în pagină
+
+    Fișierul e citit și minificat o singură dată per proces. Blocul trebuie
+    totuși emis la fiecare rerun: Streamlit șterge la finalul rerun-ului
+    elementele care nu au fost emise din nou.
+    """
+    st.markdown(f"<style>{_css_minificat(cale)}</style>", unsafe_allow_html=True)
+
+
+# ==================== PROFIL RERUN ====================
+
+def _profil_activ() -> bool:
+    if os.environ.get("PROPRIETO_PROFIL") == "1":
+        return True
+    try:
+        return st.query_params.get("profil") == "1"
+    except Exception:
+        return False
+
+
+class ProfilRerun:
+    """
+    Cronometrează fazele unui rerun (importuri, stil, conexiune, pagină...)
+
+    Se creează la începutul scriptului; `marcheaza(faza)` închide faza
+    curentă. Primul rerun din proces e marcat "rece" (include importurile
+    modulelor), restul "cald".
+    """
+
+    def __init__(self, inceput: Optional[float] = None):
+        global _primul_rerun
+        with _primul_rerun_lock:
+            self.rece = _primul_rerun
+            _primul_rerun = False
+
+        self.activ = _profil_activ()
+        self.inceput = inceput if inceput is not None else time.perf_counter()
+        self._ultim = self.inceput
+        self.faze: List[Tuple[str, float]] = []
+
+    def marcheaza(self, faza: str):
+        acum = time.perf_counter()
+        self.faze.append((faza, (acum - self._ultim) * 1000))
+        self._ultim = acum
+
+    @property
+    def total_ms(self) -> float:
+        return (self._ultim - self.inceput) * 1000
+
+    def raporteaza(self):
+        """Afișează fazele în sidebar și le păstrează în sesiune (doar în modul profil)"""
+        if not self.activ:
+            return
+
+        istoric = st.session_state.setdefault("profil_reruns", deque(maxlen=MAX_PROFILE))
+        istoric.append({"rece": self.rece, "total_ms": self.total_ms, "faze": dict(self.faze)})
+
+        tip = "rece" if self.rece else "cald"
+        linii = "\n".join(f"- {faza}: {ms:,.1f} ms" for faza, ms in self.faze)
+        with st.sidebar.expander(f"⏱️ Profil rerun ({tip}): {self.total_ms:,.0f} ms"):
+            st.markdown(linii)
+            if self.rece:
+                st.caption(f"Proces pornit acum {(time.perf_counter() - _PORNIRE_PROCES):,.1f} s")
+            calde = [p["total_ms"] for p in istoric if not p["rece"]]
+            if calde:
+                st.caption(f"Rerun cald: median {sorted(calde)[len(calde) // 2]:,.0f} ms din {len(calde)}")
+
+        print(f"[profil] rerun {tip} {self.total_ms:,.1f} ms | " + " | ".join(
+            f"{faza} {ms:,.1f}" for faza, ms in self.faze
+        ))
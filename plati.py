@@ -0,0 +1,173 @@
+"""
+Modul scadențar plăți pentru Proprieto
+Extinde contractele în plățile așteptate (dată scadentă, sumă) pentru o
+fereastră de timp, după frecventa_plata, fără a construi tot scadențarul
+"""
+
+import datetime
+import heapq
+from itertools import chain
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from supabase import Client
+
+import motor_fiscal
+
+# Lunile acoperite de o plată, după frecventa_plata (NULL = lunar)
+LUNI_FRECVENTA = {
+    "lunar": 1,
+    "trimestrial": 3,
+    "semestrial": 6,
+    "anual": 12,
+}
+
+COLOANE_PLATI = "id, imobil_id, user_id, chirie_lunara, moneda, frecventa_plata, data_inceput, data_sfarsit"
+
+# Limita implicită de rânduri per răspuns în PostgREST (Supabase)
+MARIME_PAGINA = 1000
+
+Data = datetime.date
+
+
+def _data(valoare) -> Optional[Data]:
+    if valoare is None or isinstance(valoare, datetime.date):
+        return valoare
+    return datetime.date.fromisoformat(str(valoare)[:10])
+
+
+def _luni_acoperite(scadenta: Data, sfarsit: Optional[Data], luni_perioada: int) -> int:
+    """
+    Lunile dintr-o perioadă de plată în care contractul e activ: o lună
+    începută se numără întreagă, lunile fiind ancorate în ziua scadenței
+
+    Nu e regula din motor_fiscal.luni_active, care numără lunile fiecărui
+    an calendaristic de la 1 ianuarie (ex: 29.08.2020 - 07.03.2023 dă 31 de
+    luni aici și 5 + 12 + 12 + 3 = 32 de luni pe ani). Pe toată durata unui
+    contract totalurile diferă cu cel mult o lună, în orice sens; D212 se
+    calculează doar cu luni_active, plățile urmăresc scadențele reale.
+    """
+    if sfarsit is None:
+        return luni_perioada
+
+    luni = (sfarsit.year - scadenta.year) * 12 + sfarsit.month - scadenta.month
+    if motor_fiscal.adauga_luni(scadenta, luni) > sfarsit:
+        luni -= 1
+    if motor_fiscal.adauga_luni(scadenta, luni) < sfarsit:
+        luni += 1
+    return max(0, min(luni, luni_perioada))
+
+
+def plati_contract(contract: Dict, de_la: Data, pana_la: Data) -> Iterator[Dict]:
+    """
+    Plățile așteptate ale unui contract cu scadența în [de_la, pana_la]
+
+    Plata se face la începutul fiecărei perioade, ancorată în data_inceput
+    (31 ian lunar -> 28 feb -> 31 mar); suma e chiria lunară × lunile
+    acoperite (vezi _luni_acoperite), deci ultima perioadă e trunchiată la
+    data_sfarsit. Prima scadență din fereastră e calculată direct, fără a
+    parcurge perioadele dinainte.
+
+    Yields:
+        {contract_id, imobil_id, user_id, data, suma, moneda, luni}
+    """
+    start = _data(contract['data_inceput'])
+    sfarsit = _data(contract.get('data_sfarsit'))
+    luni_perioada = LUNI_FRECVENTA.get(contract.get('frecventa_plata') or "lunar", 1)
+    capat = min(pana_la, sfarsit) if sfarsit else pana_la
+
+    # Prima perioadă cu scadența în fereastră
+    decalaj = (de_la.year - start.year) * 12 + de_la.month - start.month
+    k = max(0, decalaj // luni_perioada)
+    scadenta = motor_fiscal.adauga_luni(start, k * luni_perioada)
+    if scadenta < de_la:
+        k += 1
+        scadenta = motor_fiscal.adauga_luni(start, k * luni_perioada)
+
+    while scadenta <= capat:
+        luni = _luni_acoperite(scadenta, sfarsit, luni_perioada)
+        if luni:
+            yield {
+                "contract_id": contract.get('id'),
+                "imobil_id": contract.get('imobil_id'),
+                "user_id": contract.get('user_id'),
+                "data": scadenta,
+                "suma": float(contract['chirie_lunara']) * luni,
+                "moneda": contract.get('moneda') or "RON",
+                "luni": luni,
+            }
+        k += 1
+        scadenta = motor_fiscal.adauga_luni(start, k * luni_perioada)
+
+
+def plati_asteptate(
+    contracte: Iterable[Dict],
+    de_la: Data,
+    pana_la: Data,
+    ordonat: bool = True
+) -> Iterator[Dict]:
+    """
+    Plățile așteptate ale mai multor contracte în fereastra [de_la, pana_la]
+
+    Args:
+        contracte: Rânduri de contracte (listă sau generator, ex: contracte_in_fereastra)
+        ordonat: True = în ordinea scadențelor (interclasare; în memorie stă
+            câte o plată per contract), False = contract după contract
+
+    Yields:
+        Aceleași evenimente ca plati_contract
+    """
+    generatoare = (plati_contract(c, de_la, pana_la) for c in contracte)
+    if ordonat:
+        return heapq.merge(*generatoare, key=lambda plata: plata["data"])
+    return chain.from_iterable(generatoare)
+
+
+def contracte_in_fereastra(
+    supabase: Client,
+    de_la: Data,
+    pana_la: Data,
+    user_id: Optional[str] = None,
+    marime: int = MARIME_PAGINA
+) -> Iterator[Dict]:
+    """
+    Contractele active cel puțin o zi în fereastră, citite pe pagini
+    (keyset pe id), doar cu coloanele necesare scadențarului
+
+    Args:
+        user_id: Doar contractele cu acest proprietar principal (None = toate)
+    """
+    ultimul_id = None
+    while True:
+        query = supabase.table("contracte")\
+            .select(COLOANE_PLATI)\
+            .lte("data_inceput", pana_la.isoformat())\
+            .or_(f"data_sfarsit.is.null,data_sfarsit.gte.{de_la.isoformat()}")
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        if ultimul_id is not None:
+            query = query.gt("id", ultimul_id)
+
+        randuri = query.order("id").limit(marime).execute().data or []
+        yield from randuri
+
+        if len(randuri) < marime:
+            return
+        ultimul_id = randuri[-1]['id']
+
+
+def totaluri_lunare(
+    plati: Iterable[Dict],
+    curs: Optional[Dict[str, float]] = None
+) -> Dict[Tuple[int, int], float]:
+    """
+    Încasările așteptate pe luni, în RON ({(an, lună): sumă})
+
+    Args:
+        curs: Cursuri față de RON (implicit motor_fiscal.CURSURI_DEFAULT)
+    """
+    curs = curs if curs is not None else motor_fiscal.CURSURI_DEFAULT
+    totaluri: Dict[Tuple[int, int], float] = {}
+    for plata in plati:
+        cheie = (plata["data"].year, plata["data"].month)
+        totaluri[cheie] = totaluri.get(cheie, 0.0) + plata["suma"] * curs.get(plata["moneda"], 1.0)
+    return totaluri
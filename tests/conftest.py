@@ -0,0 +1,11 @@
+"""
+Configurare comună pentru teste: modulele aplicației sunt în rădăcina
+repo-ului (nu într-un pachet), deci rădăcina intră în sys.path
+"""
+
+import os
+import sys
+
+RADACINA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RADACINA not in sys.path:
+    sys.path.insert(0, RADACINA)
@@ -0,0 +1,34 @@
+"""
+Normalizarea sumelor din fișierele de import (format românesc și englezesc)
+"""
+
+import pytest
+
+from import_contracte import normalizeaza_suma
+
+
+@pytest.mark.parametrize("valoare, asteptat", [
+    (1500, 1500.0),
+    (1500.5, 1500.5),
+    ("1500", 1500.0),
+    ("1500.50", 1500.5),
+    ("1.500", 1500.0),
+    ("1.500,50", 1500.5),
+    ("1500,50", 1500.5),
+    ("1,500.50", 1500.5),
+    ("12.000.000", 12000000.0),
+    ("12.000.000,25", 12000000.25),
+    ("1 500", 1500.0),
+    ("1.5", 1.5),
+    ("1.50", 1.5),
+    ("1.5000", 1.5),
+    ("-1.500", -1500.0),
+    ("0.500", 0.5),
+])
+def test_normalizeaza_suma(valoare, asteptat):
+    assert normalizeaza_suma(valoare) == pytest.approx(asteptat)
+
+
+@pytest.mark.parametrize("valoare", [None, "", "   ", "abc", "1.500.5"])
+def test_normalizeaza_suma_invalida(valoare):
+    assert normalizeaza_suma(valoare) is None
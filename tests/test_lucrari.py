@@ -0,0 +1,167 @@
+"""
+Coada de lucrări: preluare, anulare și încheiere, pe un director temporar
+(fără worker-i: lucrările sunt preluate și rulate direct din test)
+"""
+
+import os
+
+import pytest
+
+import import_contracte
+import lucrari
+from benchmarks.generator import client_fake
+
+
+@pytest.fixture
+def director(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.fixture
+def tip_test(monkeypatch):
+    """Un tip de lucrare controlat din test prin parametri"""
+    def lucrare(supabase, parametri, context):
+        for i in range(parametri.get("pasi", 0)):
+            context.progres(i / parametri["pasi"], f"Pasul {i}")
+        if parametri.get("eroare"):
+            raise RuntimeError(parametri["eroare"])
+        if parametri.get("fisier"):
+            os.makedirs(context.director, exist_ok=True)
+            with open(context.artefact("rezultat.txt", "text/plain"), "w") as f:
+                f.write(parametri["fisier"])
+        return {"pasi": parametri.get("pasi", 0)}
+
+    monkeypatch.setitem(lucrari.TIPURI, "test", lucrare)
+    monkeypatch.setattr(lucrari, "INTERVAL_PROGRES", 0)
+    return "test"
+
+
+def _trimite(director, tip, **parametri):
+    return lucrari.trimite(tip, "Test", parametri, user_id="u", director=director)
+
+
+def test_tip_necunoscut(director):
+    with pytest.raises(ValueError):
+        lucrari.trimite("inexistent", "Test", {}, director=director)
+
+
+def test_revendica_in_ordine(director, tip_test, monkeypatch):
+    # Același moment al creării: ordinea inserării decide
+    monkeypatch.setattr(lucrari.time, "time", lambda: 1000.0)
+    primul = _trimite(director, tip_test)
+    al_doilea = _trimite(director, tip_test)
+
+    lucrare = lucrari._revendica(director, 123)
+    assert lucrare["id"] == primul
+    assert lucrari.get_lucrare(primul, director)["stare"] == "in_lucru"
+    assert lucrari.get_lucrare(primul, director)["pid"] == 123
+
+    assert lucrari._revendica(director, 124)["id"] == al_doilea
+    assert lucrari._revendica(director, 125) is None
+
+
+def test_anuleaza_din_coada(director, tip_test):
+    lucrare_id = _trimite(director, tip_test)
+
+    assert lucrari.anuleaza(lucrare_id, director) == (True, "Lucrarea a fost scoasă din coadă")
+    assert lucrari.get_lucrare(lucrare_id, director)["stare"] == "anulata"
+    assert lucrari._revendica(director, 1) is None
+
+
+def test_anuleaza_in_executie(director, tip_test):
+    lucrare_id = _trimite(director, tip_test, pasi=3, fisier="partial")
+    lucrare = lucrari._revendica(director, 1)
+
+    succes, _ = lucrari.anuleaza(lucrare_id, director)
+    assert succes
+    lucrari.executa_lucrare(director, None, lucrare)
+
+    terminata = lucrari.get_lucrare(lucrare_id, director)
+    assert terminata["stare"] == "anulata"
+    assert lucrari.cale_artefact(terminata, director) is None
+    assert not os.path.exists(os.path.join(director, lucrare_id))
+
+
+def test_finalizata_cu_artefact(director, tip_test):
+    lucrare_id = _trimite(director, tip_test, pasi=2, fisier="continut")
+    lucrari.executa_lucrare(director, None, lucrari._revendica(director, 1))
+
+    terminata = lucrari.get_lucrare(lucrare_id, director)
+    assert terminata["stare"] == "finalizata"
+    assert terminata["progres"] == 1.0
+    assert terminata["rezultat"] == {"pasi": 2}
+    cale = lucrari.cale_artefact(terminata, director)
+    with open(cale) as f:
+        assert f.read() == "continut"
+    assert terminata["mime"] == "text/plain"
+
+
+def test_esuata(director, tip_test):
+    lucrare_id = _trimite(director, tip_test, eroare="conexiune pierdută")
+    lucrari.executa_lucrare(director, None, lucrari._revendica(director, 1))
+
+    terminata = lucrari.get_lucrare(lucrare_id, director)
+    assert terminata["stare"] == "esuata"
+    assert "conexiune pierdută" in terminata["mesaj"]
+    assert lucrari.cale_artefact(terminata, director) is None
+
+
+def test_anuleaza_dupa_final(director, tip_test):
+    lucrare_id = _trimite(director, tip_test)
+    lucrari.executa_lucrare(director, None, lucrari._revendica(director, 1))
+
+    assert lucrari.anuleaza(lucrare_id, director) == (False, "Lucrarea este deja terminată")
+    assert lucrari.get_lucrare(lucrare_id, director)["stare"] == "finalizata"
+
+
+def test_anuleaza_import_in_executie(director, monkeypatch):
+    monkeypatch.setattr(lucrari, "INTERVAL_PROGRES", 0)
+    client = client_fake(3)
+    user_id = client.tabele["users"][0]['id']
+    imobil = next(i['nume'] for i in client.tabele["imobile"] if i['user_id'] == user_id)
+    contracte_initiale = len(client.tabele["contracte"])
+    linii = ["imobil;nr_contract;locatar;chirie_lunara;data_inceput"]
+    linii += [f"{imobil};ANUL-{k};Locatar {k};1500;01.03.2026" for k in range(1200)]
+
+    lucrare_id = lucrari.trimite(
+        "import_contracte", "Import", {"nume_fisier": "import.csv", "user_id": user_id},
+        fisiere={"import.csv": "\n".join(linii).encode("utf-8")}, director=director
+    )
+    lucrare = lucrari._revendica(director, 1)
+    lucrari.anuleaza(lucrare_id, director)
+    lucrari.executa_lucrare(director, client, lucrare)
+
+    terminata = lucrari.get_lucrare(lucrare_id, director)
+    assert terminata["stare"] == "anulata"
+    assert terminata["rezultat"] is None
+    # Primul lot era scris când progres() a văzut anularea; restul nu mai sunt importate
+    assert len(client.tabele["contracte"]) - contracte_initiale == import_contracte.MARIME_LOT_IMPORT
+
+
+class _ClientIndisponibil:
+    """Orice cerere către baza de date eșuează"""
+
+    def table(self, *_):
+        raise ConnectionError("baza de date indisponibilă")
+
+    rpc = table
+
+
+@pytest.mark.parametrize("tip, parametri", [
+    ("pachet_d212", {"an_fiscal": 2025}),
+    ("ghid_d212", {"an_fiscal": 2025, "user_id": "u"}),
+])
+def test_d212_esuata_la_eroare_db(director, tip, parametri):
+    lucrare_id = lucrari.trimite(tip, "D212", parametri, director=director)
+    lucrari.executa_lucrare(director, _ClientIndisponibil(), lucrari._revendica(director, 1))
+
+    terminata = lucrari.get_lucrare(lucrare_id, director)
+    assert terminata["stare"] == "esuata"
+    assert "baza de date indisponibilă" in terminata["mesaj"]
+
+
+def test_lucrari_recente(director, tip_test, monkeypatch):
+    monkeypatch.setattr(lucrari.time, "time", lambda: 1000.0)
+    ids = [_trimite(director, tip_test) for _ in range(3)]
+    assert [l["id"] for l in lucrari.lucrari_recente(user_id="u", limita=2, director=director)] == ids[:0:-1]
+    assert lucrari.lucrari_recente(user_id="altul", director=director) == []
@@ -0,0 +1,164 @@
+"""
+motor_fiscal față de implementările inițiale din app.py (relativedelta
+pentru lunile active, formula cu praguri if/elif pentru taxe)
+"""
+
+import datetime
+import random
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+import motor_fiscal
+
+SALARIU_MINIM_INITIAL = 4050
+
+
+def luni_active_initial(data_start, data_end, an_fiscal):
+    """calculeaza_luni_active din app.py, înainte de motor_fiscal"""
+    start_fiscal = datetime.date(an_fiscal, 1, 1)
+    end_fiscal = datetime.date(an_fiscal, 12, 31)
+    start = max(data_start, start_fiscal)
+    end = min(data_end if data_end else end_fiscal, end_fiscal)
+    if start > end:
+        return 0
+    delta = relativedelta(end, start)
+    luni = delta.years * 12 + delta.months + (1 if delta.days > 0 else 0)
+    return min(luni, 12)
+
+
+def calculeaza_taxe_initial(venit_brut_ron):
+    """calculeaza_taxe din app.py, înainte de motor_fiscal"""
+    venit_net = venit_brut_ron * 0.80
+    impozit = venit_net * 0.10
+
+    p6 = 6 * SALARIU_MINIM_INITIAL
+    p12 = 12 * SALARIU_MINIM_INITIAL
+    p24 = 24 * SALARIU_MINIM_INITIAL
+
+    if venit_net >= p24:
+        cass, prag = p24 * 0.1, 3
+        explicatie = f"Venit net ≥ {p24:,.0f} RON → CASS pe 24 salarii"
+    elif venit_net >= p12:
+        cass, prag = p12 * 0.1, 2
+        explicatie = f"Venit net ≥ {p12:,.0f} RON → CASS pe 12 salarii"
+    elif venit_net >= p6:
+        cass, prag = p6 * 0.1, 1
+        explicatie = f"Venit net ≥ {p6:,.0f} RON → CASS pe 6 salarii"
+    else:
+        cass, prag = 0, 0
+        explicatie = f"Venit net < {p6:,.0f} RON → Fără CASS"
+
+    return {
+        "brut": venit_brut_ron,
+        "net": venit_net,
+        "impozit": impozit,
+        "cass": cass,
+        "prag": prag,
+        "explicatie": explicatie,
+        "total_taxe": impozit + cass
+    }
+
+
+def _contracte_aleatoare(n, seed=2026):
+    """Perioade aleatoare, cu capete pe 1, 28-31 și la granițele anului"""
+    rng = random.Random(seed)
+    zile_speciale = [1, 28, 29, 30, 31]
+    perechi = []
+    for _ in range(n):
+        start = datetime.date(2018, 1, 1) + datetime.timedelta(days=rng.randint(0, 3650))
+        if rng.random() < 0.3:
+            try:
+                start = start.replace(day=rng.choice(zile_speciale))
+            except ValueError:
+                pass
+        if rng.random() < 0.2:
+            sfarsit = None
+        else:
+            sfarsit = start + datetime.timedelta(days=rng.randint(0, 1500))
+        perechi.append((start, sfarsit))
+    return perechi
+
+
+CONTRACTE = _contracte_aleatoare(5000)
+ANI = range(2018, 2030)
+
+
+@pytest.mark.parametrize("an_fiscal", ANI)
+def test_luni_active_ca_relativedelta(an_fiscal):
+    for start, sfarsit in CONTRACTE:
+        assert motor_fiscal.luni_active(start, sfarsit, an_fiscal) == luni_active_initial(start, sfarsit, an_fiscal), \
+            (start, sfarsit, an_fiscal)
+
+
+@pytest.mark.parametrize("an_fiscal", ANI)
+def test_luni_active_vector_ca_relativedelta(an_fiscal):
+    starturi = [s for s, _ in CONTRACTE]
+    sfarsituri = [e for _, e in CONTRACTE]
+    asteptat = [luni_active_initial(s, e, an_fiscal) for s, e in CONTRACTE]
+
+    rezultat = motor_fiscal.luni_active_vector(starturi, sfarsituri, an_fiscal)
+
+    assert rezultat.dtype == np.int64
+    assert rezultat.tolist() == asteptat
+
+
+@pytest.mark.parametrize("start, sfarsit, an_fiscal, asteptat", [
+    (datetime.date(2026, 1, 31), datetime.date(2026, 2, 28), 2026, 1),
+    (datetime.date(2026, 1, 31), datetime.date(2026, 3, 1), 2026, 2),
+    (datetime.date(2024, 1, 31), datetime.date(2024, 2, 29), 2024, 1),
+    (datetime.date(2025, 6, 15), None, 2026, 12),
+    (datetime.date(2026, 3, 1), datetime.date(2026, 3, 1), 2026, 0),
+    (datetime.date(2026, 3, 1), datetime.date(2026, 3, 2), 2026, 1),
+    (datetime.date(2027, 1, 1), None, 2026, 0),
+    (datetime.date(2026, 12, 31), datetime.date(2027, 5, 1), 2026, 0),
+    (datetime.date(2020, 8, 29), datetime.date(2023, 3, 7), 2020, 5),
+    (datetime.date(2020, 8, 29), datetime.date(2023, 3, 7), 2023, 3),
+])
+def test_luni_active_capete(start, sfarsit, an_fiscal, asteptat):
+    assert motor_fiscal.luni_active(start, sfarsit, an_fiscal) == asteptat
+    assert motor_fiscal.luni_active_vector([start], [sfarsit], an_fiscal).tolist() == [asteptat]
+    assert luni_active_initial(start, sfarsit, an_fiscal) == asteptat
+
+
+def _venituri_test():
+    # Sub, pe și peste fiecare prag (venitul net = 80% din brut)
+    praguri_brut = [n * SALARIU_MINIM_INITIAL / 0.8 for n in (6, 12, 24)]
+    venituri = [0.0, 1.0, 1234.56, 250_000.0, 1_000_000.0]
+    for prag in praguri_brut:
+        venituri += [prag - 0.01, prag, prag + 0.01]
+    rng = random.Random(7)
+    venituri += [round(rng.uniform(0, 200_000), 2) for _ in range(500)]
+    return venituri
+
+
+@pytest.mark.parametrize("venit", _venituri_test())
+def test_calculeaza_taxe_ca_formula_initiala(venit):
+    nou = motor_fiscal.calculeaza_taxe(venit)
+    vechi = calculeaza_taxe_initial(venit)
+
+    assert nou["prag"] == vechi["prag"]
+    assert nou["explicatie"] == vechi["explicatie"]
+    for camp in ("brut", "net", "impozit", "cass", "total_taxe"):
+        assert nou[camp] == pytest.approx(vechi[camp], abs=1e-9), camp
+
+
+def test_calculeaza_taxe_vector_ca_scalar():
+    venituri = _venituri_test()
+    vector = motor_fiscal.calculeaza_taxe_vector(venituri)
+
+    for i, venit in enumerate(venituri):
+        scalar = motor_fiscal.calculeaza_taxe(venit)
+        assert int(vector["prag"][i]) == scalar["prag"]
+        assert float(vector["total_taxe"][i]) == pytest.approx(scalar["total_taxe"])
+
+
+def test_coloane_contracte_procent_implicit():
+    baza = {"user_id": "u", "data_inceput": "2026-01-01", "data_sfarsit": None, "chirie_lunara": 1000, "moneda": "RON"}
+    coloane = motor_fiscal.coloane_contracte([
+        baza,
+        {**baza, "procent_proprietate": None},
+        {**baza, "procent_proprietate": 50},
+    ])
+    assert coloane["procent"].tolist() == [100.0, 100.0, 50.0]
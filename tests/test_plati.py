@@ -0,0 +1,113 @@
+"""
+Scadențarul plăților: ferestre, ancorarea scadențelor, ultima perioadă
+"""
+
+import datetime
+import random
+
+import pytest
+
+import motor_fiscal
+import plati
+
+D = datetime.date
+
+
+def _contract(start, sfarsit=None, frecventa=None, chirie=100):
+    return {
+        "id": 1,
+        "imobil_id": 2,
+        "user_id": "u",
+        "chirie_lunara": chirie,
+        "moneda": None,
+        "frecventa_plata": frecventa,
+        "data_inceput": start,
+        "data_sfarsit": sfarsit,
+    }
+
+
+def test_ancorare_sfarsit_de_luna():
+    plati_ = list(plati.plati_contract(_contract("2026-01-31"), D(2026, 1, 1), D(2026, 5, 31)))
+
+    assert [p["data"] for p in plati_] == [D(2026, 1, 31), D(2026, 2, 28), D(2026, 3, 31), D(2026, 4, 30), D(2026, 5, 31)]
+    assert all(p["suma"] == 100.0 and p["moneda"] == "RON" for p in plati_)
+
+
+@pytest.mark.parametrize("frecventa", [None, *plati.LUNI_FRECVENTA])
+def test_frecventa(frecventa):
+    luni_perioada = plati.LUNI_FRECVENTA.get(frecventa or "lunar")
+    plati_ = list(plati.plati_contract(_contract("2025-03-15", frecventa=frecventa), D(2025, 1, 1), D(2027, 12, 31)))
+
+    assert [p["data"] for p in plati_] == [
+        motor_fiscal.adauga_luni(D(2025, 3, 15), k * luni_perioada) for k in range(len(plati_))
+    ]
+    assert plati_[-1]["data"] > motor_fiscal.adauga_luni(D(2027, 12, 31), -luni_perioada)
+    assert all(p["luni"] == luni_perioada and p["suma"] == 100.0 * luni_perioada for p in plati_)
+
+
+def test_ultima_perioada_trunchiata():
+    # Trimestrial, contractul se încheie la o lună și o zi după ultima scadență
+    plati_ = list(plati.plati_contract(
+        _contract("2026-01-10", "2026-05-11", "trimestrial"), D(2026, 1, 1), D(2026, 12, 31)
+    ))
+
+    assert [(p["data"], p["luni"], p["suma"]) for p in plati_] == [
+        (D(2026, 1, 10), 3, 300.0),
+        (D(2026, 4, 10), 2, 200.0),
+    ]
+
+
+def test_fara_plata_dupa_sfarsit():
+    plati_ = list(plati.plati_contract(_contract("2026-01-10", "2026-03-10"), D(2026, 1, 1), D(2026, 12, 31)))
+    assert [p["data"] for p in plati_] == [D(2026, 1, 10), D(2026, 2, 10)]
+
+
+def test_ferestre_concatenate_ca_scadentarul_complet():
+    rng = random.Random(2026)
+    for _ in range(300):
+        start = D(2019, 1, 1) + datetime.timedelta(days=rng.randint(0, 2000))
+        if rng.random() < 0.5:
+            # Ultima zi a lunii (28-31), unde ancorarea scadențelor contează
+            start = motor_fiscal.adauga_luni(start.replace(day=1), 1) - datetime.timedelta(days=1)
+        sfarsit = None if rng.random() < 0.3 else start + datetime.timedelta(days=rng.randint(0, 1500))
+        contract = _contract(start.isoformat(), sfarsit and sfarsit.isoformat(), rng.choice([None, *plati.LUNI_FRECVENTA]))
+
+        de_la, pana_la = D(2018, 6, 1), D(2025, 12, 31)
+        complet = list(plati.plati_contract(contract, de_la, pana_la))
+
+        taieturi = sorted(de_la + datetime.timedelta(days=rng.randint(1, 2700)) for _ in range(rng.randint(1, 5)))
+        capete = [de_la, *taieturi, pana_la + datetime.timedelta(days=1)]
+        pe_ferestre = []
+        for a, b in zip(capete, capete[1:]):
+            pe_ferestre += plati.plati_contract(contract, a, b - datetime.timedelta(days=1))
+
+        assert pe_ferestre == complet, (contract, taieturi)
+
+
+def test_plati_asteptate_ordonate():
+    contracte = [_contract("2026-01-31"), _contract("2026-01-15", frecventa="trimestrial")]
+    date = [p["data"] for p in plati.plati_asteptate(contracte, D(2026, 1, 1), D(2026, 6, 30))]
+    assert date == sorted(date) and len(date) == 6 + 2
+
+
+@pytest.mark.parametrize("start, sfarsit, luni_plati, luni_pe_ani", [
+    (D(2020, 8, 29), D(2023, 3, 7), 31, 32),
+    (D(2026, 1, 31), D(2026, 3, 1), 2, 2),
+    (D(2026, 1, 15), D(2026, 1, 15), 0, 0),
+])
+def test_durata_fata_de_luni_active(start, sfarsit, luni_plati, luni_pe_ani):
+    plati_ = list(plati.plati_contract(_contract(start, sfarsit), D(2000, 1, 1), D(2100, 1, 1)))
+    pe_ani = sum(motor_fiscal.luni_active(start, sfarsit, an) for an in range(start.year, sfarsit.year + 1))
+
+    assert sum(p["luni"] for p in plati_) == luni_plati
+    assert pe_ani == luni_pe_ani
+
+
+def test_durata_difera_cu_cel_mult_o_luna():
+    rng = random.Random(7)
+    for _ in range(2000):
+        start = D(2018, 1, 1) + datetime.timedelta(days=rng.randint(0, 3000))
+        sfarsit = start + datetime.timedelta(days=rng.randint(1, 2000))
+        luni_plati = sum(p["luni"] for p in plati.plati_contract(_contract(start, sfarsit), start, sfarsit))
+        pe_ani = sum(motor_fiscal.luni_active(start, sfarsit, an) for an in range(start.year, sfarsit.year + 1))
+        assert abs(luni_plati - pe_ani) <= 1, (start, sfarsit)
@@ -0,0 +1,96 @@
+"""
+Validările în masă față de validările pentru un singur rând: același
+rezultat și același mesaj pentru fiecare valoare
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+import validari
+from benchmarks.generator import genereaza_cnp
+
+
+def _altereaza(rng, text):
+    """O greșeală tipică de introducere a datelor"""
+    pozitie = rng.randrange(len(text) + 1)
+    return rng.choice([
+        text[:pozitie] + text[pozitie + 1:],                          # caracter lipsă
+        text[:pozitie] + rng.choice("0123456789") + text[pozitie:],   # caracter în plus
+        text[:pozitie] + rng.choice(" -x.") + text[pozitie + 1:],     # caracter greșit
+        text[:-1] + str((int(text[-1]) + 1) % 10) if text[-1:].isdigit() else text,
+        f"  {text}  ",
+    ])
+
+
+def _cnp_uri(n, seed=2026):
+    rng = random.Random(seed)
+    valori = [None, "", " ", "0" * 13, "1" * 13, "1901300123456", "1903200123456", "19012a0123456", "１２３"]
+    for _ in range(n):
+        cnp = genereaza_cnp(rng)
+        valori.append(cnp if rng.random() < 0.5 else _altereaza(rng, cnp))
+    return valori
+
+
+def _telefoane(n, seed=2026):
+    rng = random.Random(seed)
+    valori = [None, "", "+40", "0", "0040 712 345 678", "(0721) 123-456", "0812345678", "07２1234567", "7" * 70]
+    for _ in range(n):
+        numar = rng.choice("723") + "".join(rng.choices("0123456789", k=8))
+        prefix = rng.choice(["", "0", "+40", "0040", "+40 ", "(0"])
+        separat = " ".join([numar[:3], numar[3:6], numar[6:]]) if rng.random() < 0.5 else numar
+        text = prefix + separat
+        valori.append(text if rng.random() < 0.6 else _altereaza(rng, text))
+    return valori
+
+
+def _cui_uri(n, seed=2026):
+    rng = random.Random(seed)
+    valori = [None, "", "RO", "ro 1", "R-O123", "12345678901"]
+    for _ in range(n):
+        text = rng.choice(["", "RO", "ro ", "RO-"]) + str(rng.randint(1, 10**10))
+        valori.append(text if rng.random() < 0.6 else _altereaza(rng, text))
+    return valori
+
+
+def _emailuri(n, seed=2026):
+    rng = random.Random(seed)
+    valori = [None, "", "a@b.ro\n", "a@b.ro\n\n", "@b.ro", "a@.ro", "a@b.r", "a@@b.ro", "ă@b.ro"]
+    for i in range(n):
+        text = f"locatar.{i}@exemplu{rng.choice(['', '-2'])}.{rng.choice(['ro', 'com', 'c0m'])}"
+        valori.append(text if rng.random() < 0.6 else _altereaza(rng, text))
+    return valori
+
+
+@pytest.mark.parametrize("bulk, scalar, mesaje, valori", [
+    (validari.valideaza_cnp_bulk, validari.valideaza_cnp, validari.MESAJE_CNP, _cnp_uri(5000)),
+    (validari.valideaza_telefon_bulk, validari.valideaza_telefon, validari.MESAJE_TELEFON, _telefoane(5000)),
+    (validari.valideaza_cui_bulk, validari.valideaza_cui, validari.MESAJE_CUI, _cui_uri(5000)),
+    (validari.valideaza_email_bulk, validari.valideaza_email, validari.MESAJE_EMAIL, _emailuri(5000)),
+], ids=["cnp", "telefon", "cui", "email"])
+def test_bulk_ca_scalar(bulk, scalar, mesaje, valori):
+    valid, coduri = bulk(valori)
+
+    assert valid.dtype == bool and coduri.dtype == np.int8
+    assert len(valid) == len(coduri) == len(valori)
+    for valoare, v, mesaj in zip(valori, valid.tolist(), validari.mesaje_erori(coduri, mesaje)):
+        assert (v, mesaj) == scalar(valoare), repr(valoare)
+
+
+@pytest.mark.parametrize("bulk", [
+    validari.valideaza_cnp_bulk,
+    validari.valideaza_telefon_bulk,
+    validari.valideaza_cui_bulk,
+    validari.valideaza_email_bulk,
+])
+def test_bulk_coloana_goala(bulk):
+    valid, coduri = bulk([])
+    assert valid.shape == coduri.shape == (0,)
+
+
+def test_cnp_bulk_accepta_generator():
+    rng = random.Random(1)
+    cnp_uri = [genereaza_cnp(rng) for _ in range(10)]
+    valid, _ = validari.valideaza_cnp_bulk(c for c in cnp_uri)
+    assert valid.all()
@@ -4,6 +4,45 @@ Validări pentru CNP, CUI, și alte date necesare pentru declarația D212
 """
 
 import re
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+GREUTATI_CNP = np.array([2, 7, 9, 1, 4, 6, 3, 5, 8, 2, 7, 9])
+_GREUTATI_CNP_LISTA = GREUTATI_CNP.tolist()
+
+# Tiparul folosit la fiecare rând dintr-un import, compilat o singură dată
+_PATTERN_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Codurile de eroare ale validărilor în masă (indice în tabelul de mesaje)
+MESAJE_CNP = (
+    "",
+    "CNP-ul este obligatoriu",
+    "CNP-ul trebuie să aibă 13 cifre",
+    "CNP-ul trebuie să conțină doar cifre",
+    "Prima cifră (sex) nu este validă",
+    "Luna din CNP nu este validă (01-12)",
+    "Ziua din CNP nu este validă (01-31)",
+    "Cifra de control a CNP-ului nu este validă",
+)
+MESAJE_CUI = (
+    "",
+    "CUI-ul este obligatoriu",
+    "CUI-ul trebuie să conțină doar cifre (sau RO + cifre)",
+    "CUI-ul trebuie să aibă între 2 și 10 cifre",
+)
+MESAJE_TELEFON = (
+    "",
+    "Numărul de telefon este obligatoriu",
+    "Numărul de telefon trebuie să conțină doar cifre",
+    "Numărul de telefon trebuie să aibă 9 cifre (fără prefix)",
+    "Numărul de telefon trebuie să înceapă cu 7 (mobil) sau 2/3 (fix)",
+)
+MESAJE_EMAIL = (
+    "",
+    "Adresa de email este obligatorie",
+    "Adresa de email nu este validă",
+)
 
 
 def valideaza_cnp(cnp: str) -> tuple[bool, str]:
@@ -45,8 +84,7 @@ def valideaza_cnp(cnp: str) -> tuple[bool, str]:
         return False, "Ziua din CNP nu este validă (01-31)"
 
     # Verifică cifra de control (ultima cifră)
-    greutati = [2, 7, 9, 1, 4, 6, 3, 5, 8, 2, 7, 9]
-    suma_control = sum(int(cnp[i]) * greutati[i] for i in range(12))
+    suma_control = sum(int(c) * g for c, g in zip(cnp, _GREUTATI_CNP_LISTA))
     cifra_control = suma_control % 11
     if cifra_control == 10:
         cifra_control = 1
@@ -85,6 +123,22 @@ def valideaza_cui(cui: str) -> tuple[bool, str]:
     return True, ""
 
 
+def _numar_national(telefon: str) -> str:
+    """Numărul fără separatori și fără prefixul +40 / 0040 / 0"""
+    # Elimină spații, paranteze, cratimă (split() fără argumente = același
+    # set de spații ca \s, dar mult mai rapid decât re.sub la importuri mari)
+    telefon_curatat = "".join(telefon.split()).replace('-', '').replace('(', '').replace(')', '')
+
+    # Verifică dacă începe cu +40, 0040, sau 0
+    if telefon_curatat.startswith('+40'):
+        return telefon_curatat[3:]
+    if telefon_curatat.startswith('0040'):
+        return telefon_curatat[4:]
+    if telefon_curatat.startswith('0'):
+        return telefon_curatat[1:]
+    return telefon_curatat
+
+
 def valideaza_telefon(telefon: str) -> tuple[bool, str]:
     """
     Validează numărul de telefon românesc
@@ -98,16 +152,7 @@ def valideaza_telefon(telefon: str) -> tuple[bool, str]:
     if not telefon:
         return False, "Numărul de telefon este obligatoriu"
 
-    # Elimină spații, paranteze, cratimă
-    telefon_curatat = re.sub(r'[\s\-\(\)]', '', telefon)
-
-    # Verifică dacă începe cu +40, 0040, sau 0
-    if telefon_curatat.startswith('+40'):
-        telefon_curatat = telefon_curatat[3:]
-    elif telefon_curatat.startswith('0040'):
-        telefon_curatat = telefon_curatat[4:]
-    elif telefon_curatat.startswith('0'):
-        telefon_curatat = telefon_curatat[1:]
+    telefon_curatat = _numar_national(telefon)
 
     # Verifică dacă are 9 cifre (format românesc)
     if not telefon_curatat.isdigit():
@@ -136,10 +181,7 @@ def valideaza_email(email: str) -> tuple[bool, str]:
     if not email:
         return False, "Adresa de email este obligatorie"
 
-    # Pattern regex pentru email
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-
-    if not re.match(pattern, email):
+    if not _PATTERN_EMAIL.match(email):
         return False, "Adresa de email nu este validă"
 
     return True, ""
@@ -216,16 +258,7 @@ def formateaza_telefon(telefon: str) -> str:
     if not telefon:
         return telefon
 
-    # Elimină spații, paranteze, cratimă
-    telefon_curatat = re.sub(r'[\s\-\(\)]', '', telefon)
-
-    # Verifică dacă începe cu +40, 0040, sau 0
-    if telefon_curatat.startswith('+40'):
-        telefon_curatat = telefon_curatat[3:]
-    elif telefon_curatat.startswith('0040'):
-        telefon_curatat = telefon_curatat[4:]
-    elif telefon_curatat.startswith('0'):
-        telefon_curatat = telefon_curatat[1:]
+    telefon_curatat = _numar_national(telefon)
 
     # Verifică dacă are 9 cifre
     if len(telefon_curatat) == 9:
@@ -303,6 +336,237 @@ def formateaza_adresa_completa(
     return ", ".join(parti_adresa)
 
 
+# ==================== VALIDĂRI ÎN MASĂ ====================
+# Pentru importuri de locatari / proprietari: o coloană întreagă odată.
+# Fiecare funcție întoarce (valid, coduri): doi vectori NumPy cu câte un
+# element per rând; codul 0 = valid, altfel indicele mesajului din MESAJE_*.
+#
+# CNP și telefon sunt vectorizate (matrice de octeți). CUI și email rămân pe
+# rând: verificările lor sunt deja metode str / un regex compilat, mai rapide
+# decât aceleași reguli scrise cu NumPy (vezi benchmarks/run.py).
+
+def _coduri_per_rand(valori: Iterable[Optional[str]], cod_rand) -> tuple[np.ndarray, np.ndarray]:
+    coduri = np.array(list(map(cod_rand, valori)), dtype=np.int8)
+    return coduri == 0, coduri
+
+
+# Clase de caractere ASCII (tabele de căutare indexate cu octetul)
+def _clasa(caractere: bytes) -> np.ndarray:
+    tabel = np.zeros(256, dtype=bool)
+    tabel[np.frombuffer(caractere, dtype=np.uint8)] = True
+    return tabel
+
+_CIFRE = _clasa(b"0123456789")
+_SEPARATORI_TELEFON = _clasa(b" \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f-()")  # str.split() pe ASCII + -()
+_PREFIXE_TELEFON = _clasa(b"723")
+
+# Textele mai lungi nu încap în matrice (o singură celulă uriașă ar lărgi
+# toate rândurile); sunt validate cu funcția pentru un singur rând
+LATIME_MAXIMA = 64
+
+
+def _texte(valori: Iterable[Optional[str]]) -> List[str]:
+    """Valorile ca text; lipsa (None / NaN) devine "" """
+    texte = list(valori)
+    if set(map(type, texte)) <= {str}:
+        return texte
+    return ["" if v is None or v != v else str(v) for v in texte]
+
+
+def _in_clasa(octeti: np.ndarray, clasa: np.ndarray) -> np.ndarray:
+    return np.take(clasa, octeti)
+
+
+class _Matrice:
+    """
+    Textele ASCII de cel mult LATIME_MAXIMA caractere, ca matrice de octeți
+    transpusă: rândul i = al i-lea caracter al fiecărui text (completat cu
+    0), deci reducerile pe text (all, sum, max) parcurg memoria continuu.
+    `rest` = indicii celorlalte texte.
+    """
+
+    def __init__(self, texte: List[str]):
+        lungimi = np.fromiter(map(len, texte), dtype=np.int64, count=len(texte))
+        self.lipsa = lungimi == 0
+        incap = lungimi <= LATIME_MAXIMA
+        if not "".join(texte).isascii():
+            incap &= np.fromiter(map(str.isascii, texte), dtype=bool, count=len(texte))
+
+        self.randuri = np.flatnonzero(incap)
+        self.rest = np.flatnonzero(~incap).tolist()
+        self.lungimi = lungimi[self.randuri]
+        # Cel puțin 4 poziții: prefixul 0040 se citește fără verificări de margine
+        latime = max(4, int(self.lungimi.max(initial=0)))
+        selectate = texte if not self.rest else [texte[i] for i in self.randuri.tolist()]
+        octeti = np.array(selectate, dtype=f"S{latime}").view(np.uint8).reshape(-1, latime)
+        self.octeti = np.ascontiguousarray(octeti.T)
+        self.pozitii = np.arange(latime, dtype=np.int8)[:, None]
+
+    def in_text(self, lungimi: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.pozitii < (self.lungimi if lungimi is None else lungimi)
+
+    def compacteaza(self, octeti: np.ndarray, pastrat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Doar caracterele păstrate, mutate la începutul textului; (octeti, lungimi)"""
+        rang = np.cumsum(pastrat, axis=0, dtype=np.int16) - 1
+        pozitie, text = np.nonzero(pastrat)
+        compact = np.zeros_like(octeti)
+        compact[rang[pozitie, text], text] = octeti[pozitie, text]
+        return compact, pastrat.sum(axis=0)
+
+
+def _coduri(
+    texte: List[str],
+    matrice: _Matrice,
+    coduri_matrice: np.ndarray,
+    validare,
+    mesaje: Sequence[str]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Asamblează codurile: matricea, restul (validarea per rând) și lipsurile (codul 1)"""
+    coduri = np.zeros(len(texte), dtype=np.int8)
+    coduri[matrice.randuri] = coduri_matrice
+    for i in matrice.rest:
+        coduri[i] = mesaje.index(validare(texte[i])[1])
+    coduri[matrice.lipsa] = 1
+    return coduri == 0, coduri
+
+
+def valideaza_cnp_bulk(cnp_uri: Iterable[Optional[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validează o coloană de CNP-uri (aceleași reguli ca valideaza_cnp)
+
+    Cifrele CNP-urilor de 13 caractere sunt puse într-o matrice (n, 13), iar
+    cifra de control se calculează pentru toate rândurile cu un singur
+    produs matrice-vector. Sunt acceptate doar cifrele ASCII 0-9.
+
+    Args:
+        cnp_uri: CNP-urile de validat (None / "" = lipsă)
+
+    Returns:
+        Tuple (valid, coduri) - coduri indexează MESAJE_CNP
+    """
+    originale = list(cnp_uri)
+    curatate = [c.strip().replace(" ", "").replace("-", "") if c else "" for c in originale]
+    n = len(curatate)
+
+    coduri = np.full(n, 2, dtype=np.int8)
+    coduri[np.fromiter((not c for c in originale), dtype=bool, count=n)] = 1
+
+    lungimi = np.fromiter(map(len, curatate), dtype=np.int64, count=n)
+    randuri = np.flatnonzero(lungimi == 13)
+    if len(randuri):
+        # Caracterele non-ASCII devin '?', deci rămân 13 octeți per CNP
+        selectate = curatate if len(randuri) == n else [curatate[i] for i in randuri.tolist()]
+        octeti = "".join(selectate).encode("ascii", "replace")
+        # Pe uint8, caracterele sub '0' dau peste cap, deci tot ce nu e cifră iese > 9
+        cifre = np.frombuffer(octeti, dtype=np.uint8).reshape(-1, 13) - np.uint8(48)
+        doar_cifre = (cifre <= 9).all(axis=1)
+        cifre = cifre.astype(np.int64)
+
+        luna = cifre[:, 3] * 10 + cifre[:, 4]
+        zi = cifre[:, 5] * 10 + cifre[:, 6]
+        control = (cifre[:, :12] @ GREUTATI_CNP) % 11
+        control[control == 10] = 1
+
+        coduri[randuri] = np.select(
+            [
+                ~doar_cifre,
+                cifre[:, 0] == 0,
+                (luna < 1) | (luna > 12),
+                (zi < 1) | (zi > 31),
+                control != cifre[:, 12],
+            ],
+            [3, 4, 5, 6, 7],
+            default=0,
+        )
+
+    return coduri == 0, coduri
+
+
+def _cod_cui(cui: Optional[str]) -> int:
+    if not cui:
+        return 1
+    cui_curatat = cui.strip().upper().replace(" ", "").replace("-", "").replace("RO", "")
+    if not cui_curatat.isdigit():
+        return 2
+    if len(cui_curatat) < 2 or len(cui_curatat) > 10:
+        return 3
+    return 0
+
+
+def valideaza_cui_bulk(cui_uri: Iterable[Optional[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validează o coloană de CUI-uri (aceleași reguli ca valideaza_cui)
+
+    Pe rând: curățarea și verificările sunt metode str, deja mai rapide
+    decât o matrice de octeți.
+
+    Returns:
+        Tuple (valid, coduri) - coduri indexează MESAJE_CUI
+    """
+    return _coduri_per_rand(cui_uri, _cod_cui)
+
+
+def valideaza_telefon_bulk(telefoane: Iterable[Optional[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validează o coloană de numere de telefon (aceleași reguli ca valideaza_telefon)
+
+    Separatorii sunt eliminați și prefixul (+40 / 0040 / 0) e recunoscut pe
+    matricea de octeți a coloanei, ca la valideaza_cnp_bulk.
+
+    Returns:
+        Tuple (valid, coduri) - coduri indexează MESAJE_TELEFON
+    """
+    texte = _texte(telefoane)
+    m = _Matrice(texte)
+    compact, lungimi = m.compacteaza(m.octeti, m.in_text() & ~_in_clasa(m.octeti, _SEPARATORI_TELEFON))
+
+    def incepe_cu(prefix: bytes) -> np.ndarray:
+        caractere = np.frombuffer(prefix, dtype=np.uint8)[:, None]
+        return (lungimi >= len(prefix)) & (compact[:len(prefix)] == caractere).all(axis=0)
+
+    prefix = np.select([incepe_cu(b"+40"), incepe_cu(b"0040"), incepe_cu(b"0")], [3, 4, 1], default=0)
+    national = (m.pozitii >= prefix) & m.in_text(lungimi)
+    doar_cifre = (_in_clasa(compact, _CIFRE) | ~national).all(axis=0) & (lungimi > prefix)
+    prima = compact[np.minimum(prefix, len(compact) - 1), np.arange(compact.shape[1])]
+
+    coduri = np.select(
+        [~doar_cifre, lungimi - prefix != 9, ~_in_clasa(prima, _PREFIXE_TELEFON)],
+        [2, 3, 4],
+        default=0,
+    )
+    return _coduri(texte, m, coduri, valideaza_telefon, MESAJE_TELEFON)
+
+
+def _cod_email(email: Optional[str]) -> int:
+    if not email:
+        return 1
+    return 0 if _PATTERN_EMAIL.match(email) else 2
+
+
+def valideaza_email_bulk(emailuri: Iterable[Optional[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validează o coloană de adrese de email (aceleași reguli ca valideaza_email)
+
+    Pe rând: _PATTERN_EMAIL compilat rulează deja în C, mai rapid decât
+    aceeași regulă scrisă cu NumPy.
+
+    Returns:
+        Tuple (valid, coduri) - coduri indexează MESAJE_EMAIL
+    """
+    return _coduri_per_rand(emailuri, _cod_email)
+
+
+def mesaje_erori(coduri: np.ndarray, mesaje: Sequence[str]) -> List[str]:
+    """
+    Transformă codurile unei validări în masă în mesaje ("" pentru rândurile valide)
+
+    Exemplu:
+        valid, coduri = valideaza_cnp_bulk(coloana)
+        erori = mesaje_erori(coduri, MESAJE_CNP)
+    """
+    return [mesaje[c] for c in coduri.tolist()]
+
+
 # Lista județelor din România pentru dropdown
 JUDETE_ROMANIA = [
     "Alba", "Arad", "Argeș", "Bacău", "Bihor", "Bistrița-Năsăud",